@@ -0,0 +1,406 @@
+"""Bot decision logic as an explicit asyncio state machine"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from enum import Enum
+
+from utils import (
+    NAV_MIN_CONFIDENCE,
+    SEARCH_GRACE,
+    class_names
+)
+from cursor_detection.cursor_detection import CURSOR_STATES
+from flight_recorder import recorder
+from timing import frame_signature, frame_changed
+
+# Flight recorder events
+recorder.register_codes("state", CURSOR_STATES)
+recorder.register_codes("bot_state", ("SEARCH", "ACQUIRE", "ATTACK", "LOOT", "EXPLORE"))
+EV_TRANSITION = recorder.register("transition", ("bot_state",))
+EV_INVALID_TARGET = recorder.register("invalid_target", ("cx", "cy", "width", "height"))
+EV_CURSOR_STATE = recorder.register("cursor_state", ("cx", "cy", "state", "confidence", "samples"))
+EV_PROHIBITED = recorder.register("prohibited", ("cx", "cy"))
+EV_LOOT = recorder.register("loot", ("cx", "cy"))
+EV_CURSOR_AFTER_ATTACK = recorder.register("cursor_after_attack", ("cx", "cy", "state"))
+EV_TARGET_MOVED = recorder.register("target_moved", ("old_x", "old_y", "new_x", "new_y"))
+EV_NEW_TARGET = recorder.register("new_target", ("cx", "cy", "score"))
+EV_STEER = recorder.register("steer", ("angle", "confidence"))
+EV_EXPLORE_TURN = recorder.register("explore_turn", ("heading", "turn"))
+EV_TIME_TO_TARGET = recorder.register("time_to_target", ("seconds",))
+
+
+def state_code(state):
+    """Cursor state as its recorder code, -1 for an unexpected state"""
+    try:
+        return CURSOR_STATES.index(state)
+    except ValueError:
+        return -1
+
+
+# Camera sweep in mouse pixels when the spawn memory has no suggestion
+SWEEP_DX = 200
+
+# Turns smaller than this many degrees are not worth a camera move
+STEER_DEADBAND = 10.0
+
+
+class BotState(Enum):
+    SEARCH = 0
+    ACQUIRE = 1
+    ATTACK = 2
+    LOOT = 3
+    EXPLORE = 4
+
+
+class MonotonicClock:
+    """Real time: time.monotonic() and asyncio.sleep()"""
+
+    def now(self):
+        return time.monotonic()
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(max(0.0, seconds))
+
+    async def wait(self, event, timeout):
+        """Wait for an asyncio.Event; returns False on timeout"""
+        try:
+            await asyncio.wait_for(event.wait(), max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class FakeClock:
+    """
+    Manually advanced clock for testing state transitions.
+
+    Sleeps complete only when advance() moves time past their deadline, so
+    a test controls exactly what the state machine sees between waits.
+    """
+
+    def __init__(self, start=0.0):
+        self.time = start
+        self._timers = []
+        self._seq = itertools.count()
+
+    def now(self):
+        return self.time
+
+    async def sleep(self, seconds):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._timers, (self.time + max(0.0, seconds), next(self._seq), future))
+        await future
+
+    async def wait(self, event, timeout):
+        waiter = asyncio.ensure_future(event.wait())
+        sleeper = asyncio.ensure_future(self.sleep(timeout))
+        done, pending = await asyncio.wait({waiter, sleeper}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        return waiter in done
+
+    async def advance(self, seconds):
+        """Move time forward, waking every sleep that is now due"""
+        target = self.time + seconds
+        await self._settle()
+        while self._timers and self._timers[0][0] <= target:
+            deadline, _, future = heapq.heappop(self._timers)
+            self.time = deadline
+            if not future.done():
+                future.set_result(None)
+            await self._settle()
+        self.time = target
+
+    @staticmethod
+    async def _settle(rounds=5):
+        """Let runnable coroutines proceed up to their next wait"""
+        for _ in range(rounds):
+            await asyncio.sleep(0)
+
+
+class BotStateMachine:
+    """
+    SEARCH -> ACQUIRE -> ATTACK -> (LOOT) -> SEARCH, with EXPLORE when no
+    target shows up.
+
+    All waits are awaitables on ``clock``, so perception keeps updating
+    ``bot.dets`` while the machine waits.
+
+    Intervals come from ``bot.timing``, which learns the game response
+    latency from probes started on the first move onto a target and on
+    camera turns.
+
+    The bot must provide: dets, frame, frame_captured_at, bbox, running,
+    current_target, last_attack_time, attack_count, target_cursor_state,
+    dead_zones, prohibited_zones, inputs, timing, explorer, target_track,
+    is_in_dead_zone(), camera_shift_since(captured_at),
+    start_cursor_tracking(), stop_cursor_tracking(), smooth_move(),
+    aim_point(move_time), cursor_state_in_frame(cx, cy), wait_for_perception(timeout),
+    confirm_cursor_state(cx, cy) and cursor_state(cx, cy) (both awaitable)
+    and explore_direction(frame).
+    """
+
+    def __init__(self, bot, clock=None):
+        self.bot = bot
+        self.clock = clock or MonotonicClock()
+        self.state = BotState.SEARCH
+        self.last_target_time = None
+        # Time from losing a target to acquiring the next one
+        self.searching_since = None
+        self.search_times = deque(maxlen=256)
+        # Capture time of the frame the current step acts on, None when its
+        # inputs do not react to a frame (sweeps, turns from memory)
+        self.decided_on = None
+        self.handlers = {
+            BotState.SEARCH: self.search,
+            BotState.ACQUIRE: self.acquire,
+            BotState.ATTACK: self.attack,
+            BotState.LOOT: self.loot,
+            BotState.EXPLORE: self.explore,
+        }
+
+    async def run(self):
+        """Step the machine until the bot stops"""
+        while self.bot.running:
+            await self.step()
+
+    async def step(self):
+        """Run the handler of the current state and apply its transition"""
+        self.decided_on = None
+        next_state = await self.handlers[self.state]()
+        if next_state is not self.state:
+            recorder.record(EV_TRANSITION, next_state.value)
+        self.state = next_state
+        return next_state
+
+    def decision_age(self):
+        """Seconds since the frame the current step acts on was captured, or None"""
+        if self.decided_on is None:
+            return None
+        return self.clock.now() - self.decided_on
+
+    def candidate_targets(self):
+        bot = self.bot
+        return [d for d in bot.dets if d.class_name in class_names and not bot.is_in_dead_zone(d.cx, d.cy)]
+
+    def drop_target(self):
+        bot = self.bot
+        bot.current_target = None
+        bot.target_track.reset()
+        bot.attack_count = 0
+        bot.target_cursor_state = None
+        bot.stop_cursor_tracking()
+        bot.timing.cancel()
+        self.last_target_time = self.searching_since = self.clock.now()
+
+    async def search(self):
+        """Pick the first live target, wait briefly after a kill, else explore"""
+        if self.candidate_targets():
+            return BotState.ACQUIRE
+
+        # Right after a kill the next target is usually close, keep looking
+        # at fresh frames for a moment before turning the camera
+        if self.last_target_time is not None:
+            remaining = SEARCH_GRACE - (self.clock.now() - self.last_target_time)
+            if remaining > 0:
+                await self.bot.wait_for_perception(min(remaining, 0.05))
+                return BotState.SEARCH
+        return BotState.EXPLORE
+
+    async def acquire(self):
+        bot = self.bot
+        targets = self.candidate_targets()
+        if not targets:
+            return BotState.SEARCH
+        now = self.clock.now()
+        # Targets still in view since an earlier acquisition are not logged again
+        bot.explorer.observe(targets, bot.bbox['width'], now)
+        if self.searching_since is not None:
+            self.search_times.append(now - self.searching_since)
+            recorder.record(EV_TIME_TO_TARGET, now - self.searching_since)
+            self.searching_since = None
+        bot.current_target = targets[0]
+        bot.target_track.reset(bot.current_target)
+        bot.attack_count = 0
+        bot.last_attack_time = self.clock.now() - bot.timing.post_click_delay
+        recorder.record(EV_NEW_TARGET, bot.current_target.cx, bot.current_target.cy, bot.current_target.score)
+        # Cursor tracking starts with the first move in ATTACK, so that move
+        # can probe the response time
+        return BotState.ATTACK
+
+    async def attack(self):
+        bot = self.bot
+        timing = bot.timing
+
+        # Give the game time to react to the previous click
+        remaining = timing.post_click_delay - (self.clock.now() - bot.last_attack_time)
+        if remaining > 0:
+            await self.clock.sleep(remaining)
+            return BotState.ATTACK
+
+        # Check if target still exists in detections
+        same_class = [d for d in bot.dets if d.class_name == bot.current_target.class_name]
+        if not same_class:
+            # Target no longer visible, it may reappear shortly
+            if self.clock.now() - bot.last_attack_time < timing.post_click_delay * 3:
+                await bot.wait_for_perception(0.1)
+                return BotState.ATTACK
+            self.drop_target()
+            return BotState.SEARCH
+
+        # Update to closest detection of same class
+        closest = min(
+            same_class,
+            key=lambda d: (d.cx - bot.current_target.cx) ** 2 + (d.cy - bot.current_target.cy) ** 2
+        )
+        old_x, old_y = bot.current_target.cx, bot.current_target.cy
+        if (closest.cx - old_x) ** 2 + (closest.cy - old_y) ** 2 > 25:  # 5px distance threshold squared
+            bot.current_target = closest
+            recorder.record(EV_TARGET_MOVED, old_x, old_y, closest.cx, closest.cy)
+        if not bot.target_track.follows(closest):
+            # Switched to another detection, its motion is unknown
+            bot.target_track.reset(closest)
+        self.decided_on = closest.captured_at
+
+        cx, cy = bot.current_target.cx, bot.current_target.cy
+        if cx < 0 or cx >= bot.bbox['width'] or cy < 0 or cy >= bot.bbox['height']:
+            recorder.record(EV_INVALID_TARGET, cx, cy, bot.bbox['width'], bot.bbox['height'])
+            self.drop_target()
+            return BotState.SEARCH
+
+        # Make sure the cursor is on the target before checking its state,
+        # leading a moving target by the capture-to-input latency
+        ax, ay = bot.aim_point(move_time=0.01)
+        # The first move onto a target changes the cursor sprite, which is
+        # a direct measure of the game's input response. Only probe when
+        # the last frame shows no cursor there yet.
+        probe = (bot.target_cursor_state is None and not timing.probes
+                 and bot.cursor_state_in_frame(ax, ay) == "NONE")
+        moved_at = self.clock.now()
+        bot.smooth_move(int(ax + bot.bbox['left']), int(ay + bot.bbox['top']))
+        if probe:
+            timing.expect(moved_at, lambda: bot.cursor_state_in_frame(ax, ay) != "NONE")
+        if not bot.target_tracking_active:
+            bot.start_cursor_tracking()
+
+        state, confidence, num_samples = await bot.confirm_cursor_state(ax, ay)
+        bot.target_cursor_state = state
+        recorder.record(EV_CURSOR_STATE, ax, ay, state_code(state), confidence, num_samples)
+
+        if state == "PROHIBITED":
+            return self.mark_prohibited()
+        if state == "HAND":
+            return BotState.LOOT
+
+        # Alive or unknown: attack
+        bot.inputs.click_mouse('left')
+        bot.last_attack_time = self.clock.now()
+        bot.attack_count += 1
+        await self.clock.sleep(timing.click_settle)
+
+        if state == "NONE":
+            # Check whether the click changed the cursor
+            new_state = await bot.cursor_state(ax, ay)
+            recorder.record(EV_CURSOR_AFTER_ATTACK, ax, ay, state_code(new_state))
+            if new_state == "HAND":
+                return BotState.LOOT
+            if new_state == "PROHIBITED":
+                return self.mark_prohibited()
+            # Can't determine state, assume target is still alive
+
+        await self.clock.sleep(timing.click_interval)
+        return BotState.ATTACK
+
+    def add_zone(self, zones, det):
+        """Zone around a detection, moved from its frame to the latest one"""
+        dx, dy = self.bot.camera_shift_since(det.captured_at)
+        zones.add(det.cx + dx, det.cy + dy, self.clock.now())
+
+    def mark_prohibited(self):
+        """Remember a dead or unattackable target and move on"""
+        target = self.bot.current_target
+        recorder.record(EV_PROHIBITED, target.cx, target.cy)
+        self.add_zone(self.bot.prohibited_zones, target)
+        self.drop_target()
+        return BotState.SEARCH
+
+    async def loot(self):
+        """Pick up the loot of a dead target"""
+        bot = self.bot
+        target = bot.current_target
+        self.decided_on = target.captured_at
+        bot.inputs.click_mouse('left')
+        await self.clock.sleep(bot.timing.loot_settle)
+        recorder.record(EV_LOOT, target.cx, target.cy)
+        self.add_zone(bot.dead_zones, target)
+        self.drop_target()
+        return BotState.SEARCH
+
+    async def walk(self, seconds=0.2):
+        self.bot.inputs.press_key(ord('W'))
+        await self.clock.sleep(seconds)
+        self.bot.inputs.release_key(ord('W'))
+
+    def drag_camera(self, dx):
+        """Turn the camera in one drag"""
+        inputs = self.bot.inputs
+        inputs.press_mouse('right')
+        inputs.move_mouse_rel(dx, 0)
+        inputs.release_mouse('right')
+        self.bot.explorer.rotated(dx)
+
+    async def rotate_camera(self, total_dx=SWEEP_DX, steps=5, delay=0.03):
+        bot = self.bot
+        inputs = bot.inputs
+        if bot.frame is not None and not bot.timing.probes:
+            # The first frame that looks different shows the turn took effect
+            before = frame_signature(bot.frame)
+            bot.timing.expect(self.clock.now(), lambda: frame_changed(before, bot.frame))
+        inputs.press_mouse('right')
+        step_dx = total_dx // steps
+        try:
+            for _ in range(steps):
+                inputs.move_mouse_rel(step_dx, 0)
+                bot.explorer.rotated(step_dx)
+                await self.clock.sleep(delay)
+        finally:
+            inputs.release_mouse('right')
+
+    async def explore(self):
+        """No targets: turn towards past spawns or sweep, then walk towards free ground"""
+        bot = self.bot
+        explorer = bot.explorer
+        self.last_target_time = None
+        now = self.clock.now()
+        explorer.searched(now)
+        turn = explorer.suggest_turn(now)
+        # Perception measures the turn on the frames until end_turn()
+        explorer.begin_turn()
+        if turn is None:
+            await self.rotate_camera()
+        else:
+            recorder.record(EV_EXPLORE_TURN, explorer.heading, turn)
+            await self.rotate_camera(int(round(turn * explorer.pixels_per_degree)))
+        await self.clock.sleep(0.1)
+
+        # Steer from a frame captured after the rotation
+        await bot.wait_for_perception(0.1)
+        explorer.end_turn()
+        self.decided_on = bot.frame_captured_at
+        steering = bot.explore_direction(bot.frame)
+        if steering is None:
+            await self.walk()
+        else:
+            recorder.record(EV_STEER, steering.angle, steering.confidence)
+            if abs(steering.angle) >= STEER_DEADBAND:
+                self.drag_camera(int(steering.angle * explorer.pixels_per_degree))
+            # Nothing walkable in view: only turn, the next explore looks again
+            if steering.confidence >= NAV_MIN_CONFIDENCE:
+                await self.walk()
+
+        await self.clock.sleep(0.05)
+        # Look at a frame captured after the move
+        await bot.wait_for_perception(0.2)
+        return BotState.SEARCH
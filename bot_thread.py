@@ -1,85 +1,174 @@
 """Main bot logic thread"""
+import asyncio
 import threading
 import time
-import cv2
-import numpy as np
-import win32gui
-from PIL import Image
-from mss import mss
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import os
 import sys
 
 # Add parent directory to path to make imports work
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from input_controller import (
-    smooth_move as input_smooth_move, 
-    click_mouse, 
-    press_mouse, 
-    release_mouse, 
-    move_mouse_rel,
-    press_key,
-    release_key
-)
+import utils
 from utils import (
-    detect_obstacle_direction, 
-    DEBUG, 
-    DEAD_TIMEOUT, 
+    OBSTACLE_THRESHOLD,
+    NAV_PIXELS_PER_DEGREE,
+    CAMERA_FOV,
+    EXPLORE_HALF_LIFE,
+    AIM_LEAD,
     CLICK_INTERVAL,
     POST_CLICK_DELAY,
+    DEAD_TIMEOUT, 
     CURSOR_UPDATE_INTERVAL,
-    class_names
+    CURSOR_WORKERS,
+    CURSOR_CONFIRM_CONFIDENCE,
+    CURSOR_SAMPLE_ACCURACY,
+    CURSOR_MAX_SAMPLES,
+    CURSOR_CACHE_THRESHOLD,
+    CURSOR_CACHE_MAX_AGE,
+    CURSOR_MODEL,
+    CURSOR_TEMPLATE_MATCHING
 )
 # Import the cursor detection modules from the cursor_detection package
-from cursor_detection.cursor_detection import detect_cursor_state, load_templates
-from detection.yolo_detector import YOLODetector
+from cursor_detection.cursor_detection import (
+    load_templates,
+    load_cursor_model,
+    set_template_matching,
+    confirm_cursor_state
+)
+from cursor_detection.cursor_pool import CursorClassifierPool, classify_frame
+from cursor_detection.cursor_cache import CursorStateCache
+from flight_recorder import recorder
+from frame_source import ScreenFrameSource
+from navigation import Navigator
+from exploration import Explorer
+from zones import CameraMotion, ZoneStore
+from timing import AdaptiveTiming
+from target_motion import TargetTrack
+from bot_fsm import BotStateMachine, MonotonicClock
+
+# Flight recorder events
+EV_TRACKING_ERROR = recorder.register("tracking_error")
+EV_TRACKING_START = recorder.register("tracking_start")
+EV_TRACKING_STOP = recorder.register("tracking_stop")
 
 
 class BotThread(threading.Thread):
-    def __init__(self, window, detector):
-        super().__init__(daemon=True)
+    def __init__(self, window, detector, frame_source=None, inputs=None, max_frames=None, clock=None):
+        """
+        Args:
+            window: Game window; may be None when frame_source is given
+            detector: BaseDetector used on every frame
+            frame_source: Frame source, defaults to capturing the window
+            inputs: Input sink with the input_controller functions,
+                defaults to the input_controller module
+            max_frames: Stop after this many perceived frames (benchmarks)
+            clock: Clock for all waits and timestamps, a FakeClock in tests
+        """
+        super().__init__(daemon=True, name="BotThread")
         self.window = window
         self.detector = detector
+        self.frame_source = frame_source
+        if inputs is None:
+            import input_controller as inputs
+        self.inputs = inputs
+        self.max_frames = max_frames
+        self.frame_count = 0
+        self.frame_time = 0.0
+        self.frame = None
+        # clock.now() when the published frame was captured
+        self.frame_captured_at = None
+        self.dets = []
         self.running = False
         self.current_target = None
-        self.attacking = False
+        self.target_track = TargetTrack()
         self.last_click_time = 0
-        self.dead_zones = []
-        self.prohibited_zones = []
-        self.sct = None
+        # Prohibited zones are kept for 9 seconds
+        self.dead_zones = ZoneStore(DEAD_TIMEOUT)
+        self.prohibited_zones = ZoneStore(9.0)
+        self.camera_motion = CameraMotion()
         self.bbox = None
         self.last_attack_time = 0
         self.attack_count = 0
         self.target_cursor_state = None
         self.target_tracking_active = False
         self.cursor_tracking_thread = None
+        # Where the bot last moved the mouse, in frame coordinates
+        self.cursor_pos = None
+        if CURSOR_MODEL:
+            # In-process classification, and the fallback when the pool fails
+            load_cursor_model(CURSOR_MODEL)
+        set_template_matching(CURSOR_TEMPLATE_MATCHING)
+        self.cursor_pool = CursorClassifierPool(CURSOR_WORKERS, CURSOR_MODEL, CURSOR_TEMPLATE_MATCHING)
+        self.clock = clock or MonotonicClock()
+        self.cursor_cache = CursorStateCache(CURSOR_CACHE_THRESHOLD, CURSOR_CACHE_MAX_AGE, clock=self.clock.now)
+        self.navigator = Navigator(OBSTACLE_THRESHOLD, CAMERA_FOV)
+        self.explorer = Explorer(NAV_PIXELS_PER_DEGREE, CAMERA_FOV, half_life=EXPLORE_HALF_LIFE)
+        self.timing = AdaptiveTiming.from_config({
+            'click_interval': CLICK_INTERVAL,
+            'post_click_delay': POST_CLICK_DELAY,
+            'cursor_update_interval': CURSOR_UPDATE_INTERVAL,
+            'click_settle': 0.1,
+            'loot_settle': 0.2,
+        }, utils.CFG.get('timing'))
+        self.fsm = BotStateMachine(self, self.clock)
+        self.capture_executor = None
+        self.inference_executor = None
+        # Cursor samples are grabbed here; see run_async()
+        self.cursor_executor = None
+        self.cursor_source = None
+        self._perception_event = None
         
-        # Load cursor templates at initialization
-        # Make sure to use the correct path to templates
+        # Load cursor templates at initialization (cached process-wide)
         load_templates()
         
     def is_in_dead_zone(self, cx, cy):
-        now = time.time()
-        # Clean up expired dead zones
-        self.dead_zones = [(x, y, t) for (x, y, t) in self.dead_zones if now - t < DEAD_TIMEOUT]
-        # Clean up expired prohibited zones - using 9 seconds for these
-        self.prohibited_zones = [(x, y, t) for (x, y, t) in self.prohibited_zones if now - t < 9.0]
-        
-        # Check both lists
-        for dx, dy, _ in self.dead_zones:
-            if abs(cx - dx) < 50 and abs(cy - dy) < 30:
-                return True
-                
-        for px, py, _ in self.prohibited_zones:
-            if abs(cx - px) < 50 and abs(cy - py) < 30:
-                return True
-                
-        return False
+        now = self.clock.now()
+        return self.dead_zones.contains(cx, cy, now) or self.prohibited_zones.contains(cx, cy, now)
+
+    def track_zones(self, frame, captured_at):
+        """Keep the zones on their objects and measure turns while the camera moves"""
+        # Always measured: a zone can be added later from a detection on this frame
+        motion = self.camera_motion.estimate(frame, captured_at=captured_at)
+        h, w = frame.shape[:2]
+        self.explorer.camera_moved(motion[0] if motion is not None else None, w)
+        if motion is not None:
+            for zones in (self.dead_zones, self.prohibited_zones):
+                zones.shift(motion[0], motion[1], w, h)
+
+    def camera_shift_since(self, captured_at):
+        """Picture shift in frame pixels from a capture time to the latest frame"""
+        return self.camera_motion.since(captured_at)
 
     def smooth_move(self, tx, ty, steps=5, delay=0.002):
         """Wrapper for input controller smooth move"""
-        input_smooth_move(tx, ty, steps, delay)
+        self.inputs.smooth_move(tx, ty, steps, delay)
+        # Cursor checks anchor the sprite here, it may be off the detection
+        self.cursor_pos = (tx - self.bbox['left'], ty - self.bbox['top'])
+
+    def aim_point(self, move_time=0.0):
+        """
+        Where the current target will be when a mouse move started now lands.
+
+        Args:
+            move_time: Duration of the move itself
+
+        Returns:
+            tuple: Integer (x, y) in frame coordinates, extrapolated from the target
+                track, or the last detection while there is no track; clamped
+                to the frame. None once the target was dropped.
+        """
+        # The state machine may drop the target while the tracking thread aims
+        target = self.current_target
+        if target is None:
+            return None
+        aim = self.target_track.aim(self.clock.now() + move_time + AIM_LEAD)
+        x, y = (target.cx, target.cy) if aim is None else aim
+        # Extrapolation must not lead the cursor out of the game window
+        x = min(max(int(round(x)), 0), self.bbox['width'] - 1)
+        y = min(max(int(round(y)), 0), self.bbox['height'] - 1)
+        return x, y
 
     def cursor_tracking_loop(self):
         """Thread function for continuously keeping cursor on target"""
@@ -89,19 +178,20 @@ class BotThread(threading.Thread):
                 if not self.running:
                     break
                 
-                # Get fresh target coordinates
-                if self.current_target:
-                    target_x = int(self.current_target.cx + self.bbox['left'])
-                    target_y = int(self.current_target.cy + self.bbox['top'])
+                # Get fresh target coordinates, extrapolated to when the move lands
+                aim = self.aim_point(move_time=0.003)
+                if aim is not None:
+                    target_x = int(aim[0] + self.bbox['left'])
+                    target_y = int(aim[1] + self.bbox['top'])
                     
                     # Move cursor smoothly to updated target position
                     self.smooth_move(target_x, target_y, steps=3, delay=0.001)
                 
-                time.sleep(CURSOR_UPDATE_INTERVAL)
+                time.sleep(self.timing.cursor_update_interval)
                 
         except Exception as e:
-            if DEBUG:
-                print(f"Error in cursor tracking thread: {e}")
+            recorder.record(EV_TRACKING_ERROR)
+            print(f"Error in cursor tracking thread: {e}, flight record saved: {recorder.dump('tracking_error')}")
 
     def start_cursor_tracking(self):
         """Start continuous cursor tracking on a separate thread"""
@@ -109,257 +199,171 @@ class BotThread(threading.Thread):
         if self.cursor_tracking_thread is None or not self.cursor_tracking_thread.is_alive():
             self.cursor_tracking_thread = threading.Thread(
                 target=self.cursor_tracking_loop, 
+                name="CursorTracking",
                 daemon=True
             )
             self.cursor_tracking_thread.start()
-            if DEBUG:
-                print("Started cursor tracking thread")
+            recorder.record(EV_TRACKING_START)
 
     def stop_cursor_tracking(self):
         """Stop the cursor tracking thread"""
         self.target_tracking_active = False
         if self.cursor_tracking_thread and self.cursor_tracking_thread.is_alive():
-            if DEBUG:
-                print("Stopping cursor tracking thread")
+            recorder.record(EV_TRACKING_STOP)
 
-    def get_current_cursor_state(self, cx, cy):
-        """Get the current cursor state at target position"""
-        img = self.sct.grab(self.bbox)
-        frame = np.array(Image.frombytes('RGB', (img.width, img.height), img.rgb))
-        # Switch RGB to BGR for OpenCV
-        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        # Detect cursor state at target position
-        return detect_cursor_state(frame, cx, cy)
+    def cursor_state_in_frame(self, cx, cy):
+        """Classify the cursor in the latest perceived frame (response probes)"""
+        if self.frame is None:
+            return "NONE"
+        return classify_frame(self.frame, cx, cy, rgb=True, cursor=self.cursor_pos)
 
-    def attack_target(self):
-        """Attack current target with click and check cursor state"""
-        if not self.current_target:
-            return False
-        
-        # Ensure target coordinates are valid and within window
-        cx = self.current_target.cx
-        cy = self.current_target.cy
-        
-        # Get window dimensions from bbox
-        window_width = self.bbox['width']
-        window_height = self.bbox['height']
-        
-        # Check if coordinates are valid
-        if cx < 0 or cx >= window_width or cy < 0 or cy >= window_height:
-            if DEBUG: print(f"Invalid target coordinates: ({cx}, {cy}) outside window {window_width}x{window_height}")
-            return False
-        
-        tx = int(cx + self.bbox['left'])
-        ty = int(cy + self.bbox['top'])
-        
-        # Make sure we're actively tracking the cursor on the target
-        if not self.target_tracking_active:
-            self.start_cursor_tracking()
-        
-        # Move to target and stay there - done by tracking thread
-        # Just make sure we're there before checking cursor state
-        self.smooth_move(tx, ty)
-        
-        # Check cursor state before clicking
-        cursor_samples = []
-        for _ in range(3):  # Take 3 samples
-            cursor_state = self.get_current_cursor_state(cx, cy)
-            cursor_samples.append(cursor_state)
-            time.sleep(0.02)  # Short delay between samples
-        
-        # Use most common cursor state from samples
-        self.target_cursor_state = Counter(cursor_samples).most_common(1)[0][0]
-        
-        if DEBUG: print(f"Cursor state at ({cx}, {cy}): {self.target_cursor_state} (samples: {cursor_samples})")
+    def get_current_cursor_state(self, cx, cy, fresh=False):
+        """
+        Get the current cursor state at target position.
+
+        Args:
+            fresh: Classify even if the ROI is unchanged, for samples that
+                must be independent; the result still refreshes the cache
+        """
+        frame = (self.cursor_source or self.frame_source).grab()
+        # Reclassify only if the ROI changed; only the ROI is switched from
+        # RGB to BGR, possibly in a worker process
+        classify = partial(self.cursor_pool.classify, rgb=True, cursor=self.cursor_pos)
+        return self.cursor_cache.classify(frame, cx, cy, classify_fn=classify, refresh=fresh)
+
+    async def confirm_cursor_state(self, cx, cy):
+        """Confirm the cursor state from fresh frames on the cursor capture thread"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.cursor_executor,
+            partial(
+                confirm_cursor_state,
+                lambda: self.get_current_cursor_state(cx, cy, fresh=True),
+                confidence=CURSOR_CONFIRM_CONFIDENCE,
+                accuracy=CURSOR_SAMPLE_ACCURACY,
+                max_samples=CURSOR_MAX_SAMPLES
+            )
+        )
+
+    async def cursor_state(self, cx, cy):
+        """Classify the cursor once from a fresh frame on the cursor capture thread"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.cursor_executor, self.get_current_cursor_state, cx, cy
+        )
+
+    def explore_direction(self, frame):
+        """Steering for exploration from the latest frame, or None"""
+        return self.navigator.steer(frame)
+
+    async def wait_for_perception(self, timeout):
+        """Wait until a new frame has been perceived; False on timeout"""
+        return await self.clock.wait(self._perception_event, timeout)
+
+    async def perceive(self):
+        """Capture one frame, run detection and publish the results"""
+        loop = asyncio.get_running_loop()
+        frame = await loop.run_in_executor(self.capture_executor, self.frame_source.grab)
+        frame_time = time.perf_counter()
+        captured_at = self.clock.now()
+        dets = await loop.run_in_executor(self.inference_executor, self.detector.detect, frame)
+        for d in dets:
+            d.captured_at = captured_at
         
-        # Handle different cursor states
-        if self.target_cursor_state == "PROHIBITED":
-            # Target is dead or prohibited - add to prohibited zones
-            if DEBUG and self.current_target:
-                print(f"Target {self.current_target.class_name} has prohibition symbol - adding to prohibited zones")
-            self.prohibited_zones.append((cx, cy, time.time()))
-            self.stop_cursor_tracking()
-            return False
-            
-        elif self.target_cursor_state == "HAND":
-            # Target is dead but has loot - click to pick up item
-            click_mouse('left')
-            time.sleep(0.2)
-            if DEBUG and self.current_target:
-                print(f"Target {self.current_target.class_name} shows hand cursor - looting")
-            self.dead_zones.append((cx, cy, time.time()))
-            self.stop_cursor_tracking()
-            return False
+        # Zones were marked on the previous frame, move them to this one first
+        self.track_zones(frame, captured_at)
         
-        elif self.target_cursor_state == "RED_SWORD":
-            # Target is alive and attackable - continue attacking
-            click_mouse('left')
-            self.last_attack_time = time.time()
-            self.attack_count += 1
-            time.sleep(0.1)
-            return True
+        self.frame, self.frame_time, self.dets = frame, frame_time, dets
+        self.frame_captured_at = captured_at
+        if self.current_target is not None:
+            self.target_track.update(dets, captured_at)
+        self.frame_count += 1
+        self.timing.on_frame(captured_at)
+        if self.max_frames is not None and self.frame_count >= self.max_frames:
+            self.running = False
         
-        else:  # "NONE" or any other state
-            # Try clicking and check if cursor state changes
-            click_mouse('left')
-            self.last_attack_time = time.time()
-            self.attack_count += 1
-            time.sleep(0.1)
-            
-            # Check cursor state again after attack
-            new_cursor_state = self.get_current_cursor_state(cx, cy)
-            if DEBUG: print(f"Cursor state after attack: {new_cursor_state}")
+        # Wake everything waiting for this update
+        event, self._perception_event = self._perception_event, asyncio.Event()
+        event.set()
+
+    async def perception_loop(self):
+        """Keep perception running while the state machine waits"""
+        try:
+            while self.running:
+                await self.perceive()
+        except EOFError:
+            # Recorded frames ran out
+            self.running = False
+        except BaseException:
+            # Never leave the machine acting on the last detections
+            self.running = False
+            raise
+
+    async def run_async(self):
+        loop = asyncio.get_running_loop()
+        # mss handles are bound to their thread, so every grab runs on one
+        # capture thread; inference gets its own so it never blocks capture
+        self.capture_executor = ThreadPoolExecutor(1, thread_name_prefix="Capture")
+        self.inference_executor = ThreadPoolExecutor(1, thread_name_prefix="Inference")
+        # Live capture opens a second handle on its own thread for cursor
+        # samples, so confirmation never queues behind perception grabs.
+        # Recorded and synthetic sources are not thread-safe and share the
+        # capture thread; there a confirmation waits for up to one grab.
+        fork = getattr(self.frame_source, 'fork', None)
+        if fork is not None:
+            self.cursor_executor = ThreadPoolExecutor(1, thread_name_prefix="CursorCapture")
+            self.cursor_source = fork()
+        else:
+            self.cursor_executor, self.cursor_source = self.capture_executor, None
+        self._perception_event = asyncio.Event()
+        try:
+            await loop.run_in_executor(self.capture_executor, self.frame_source.__enter__)
+            if self.cursor_source is not None:
+                await loop.run_in_executor(self.cursor_executor, self.cursor_source.__enter__)
+            self.bbox = self.frame_source.bbox
+            self.running = True
             
-            if new_cursor_state == "RED_SWORD":
-                # Target is alive - continue attacking
-                return True
-            elif new_cursor_state == "HAND":
-                # Target died and has loot
-                click_mouse('left')  # Pick up the loot
-                time.sleep(0.2)
-                self.dead_zones.append((cx, cy, time.time()))
+            await self.perceive()
+            perception = asyncio.create_task(self.perception_loop())
+            machine = asyncio.create_task(self.fsm.run())
+            try:
+                # A perception failure stops the machine mid-step and is
+                # raised from here, so it reaches the thread excepthook
+                done, _ = await asyncio.wait((perception, machine), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            finally:
+                self.running = False
+                for task in (machine, perception):
+                    task.cancel()
+                # Errors were raised from the wait above already
+                await asyncio.gather(machine, perception, return_exceptions=True)
+                self.current_target = None
                 self.stop_cursor_tracking()
-                return False
-            elif new_cursor_state == "PROHIBITED":
-                # Target died or is prohibited
-                self.prohibited_zones.append((cx, cy, time.time()))
-                self.stop_cursor_tracking()
-                return False
-            else:
-                # Can't determine state, assume target is still alive
-                return True
-
-    def smooth_rotate_camera(self, total_dx=200, steps=5, delay=0.03):
-        press_mouse('right')
-        step_dx = total_dx // steps
-        for _ in range(steps):
-            move_mouse_rel(step_dx, 0)
-            time.sleep(delay)
-        release_mouse('right')
+        finally:
+            if self.cursor_source is not None and self.cursor_source.sct is not None:
+                await loop.run_in_executor(self.cursor_executor, self.cursor_source.__exit__, None, None, None)
+            await loop.run_in_executor(self.capture_executor, self.frame_source.__exit__, None, None, None)
+            if self.cursor_executor is not self.capture_executor:
+                self.cursor_executor.shutdown(wait=False)
+            self.capture_executor.shutdown(wait=False)
+            self.inference_executor.shutdown(wait=False)
 
     def run(self):
         hwnd = getattr(self.window, '_hWnd', None)
         if hwnd:
+            import win32gui
             win32gui.ShowWindow(hwnd, 5)
             win32gui.SetForegroundWindow(hwnd)
         
-        self.bbox = {
-            'left': self.window.left,
-            'top': self.window.top,
-            'width': self.window.width,
-            'height': self.window.height
-        }
+        if self.frame_source is None:
+            self.frame_source = ScreenFrameSource.from_window(self.window)
         
-        # Ensure cursor templates are loaded at startup
-        load_templates()
-        
-        with mss() as sct:
-            self.sct = sct
-            self.running = True
-            
-            while self.running:
-                # Get current frame
-                img = sct.grab(self.bbox)
-                frame = np.array(Image.frombytes('RGB', (img.width, img.height), img.rgb))
-                dets = self.detector.detect(frame)
-
-                # If we have a current target, attack it
-                if self.attacking and self.current_target:
-                    time_since_attack = time.time() - self.last_attack_time
-                    
-                    if time_since_attack < POST_CLICK_DELAY:
-                        time.sleep(0.05)
-                        continue
-                    
-                    # Check if target still exists in detections
-                    same_class = [d for d in dets if d.class_name == self.current_target.class_name]
-                    
-                    if same_class:
-                        # Update to closest detection of same class
-                        closest_target = min(
-                            same_class,
-                            key=lambda d: (d.cx - self.current_target.cx) ** 2 + (d.cy - self.current_target.cy) ** 2
-                        )
-                        
-                        # If target moved too far, allow cursor tracking to be updated
-                        old_x, old_y = self.current_target.cx, self.current_target.cy
-                        new_x, new_y = closest_target.cx, closest_target.cy
-                        dist_sq = (new_x - old_x) ** 2 + (new_y - old_y) ** 2
-                        
-                        if dist_sq > 25:  # 5px distance threshold squared  
-                            self.current_target = closest_target
-                            if DEBUG:
-                                print(f"Target moved: ({old_x},{old_y}) -> ({new_x},{new_y})")
-                        
-                        # Attack and check if still alive
-                        target_alive = self.attack_target()
-                        if not target_alive:
-                            self.current_target = None
-                            self.attack_count = 0
-                            self.target_cursor_state = None
-                            self.stop_cursor_tracking()
-                        else:
-                            time.sleep(CLICK_INTERVAL)
-                            continue
-                    else:
-                        # Target no longer visible
-                        if time_since_attack < POST_CLICK_DELAY * 3:
-                            time.sleep(0.1)
-                            continue
-                            
-                        self.current_target = None
-                        self.attack_count = 0
-                        self.target_cursor_state = None
-                        self.stop_cursor_tracking()
-                
-                # Find new target if we don't have one (but might still be in attacking state)
-                if self.attacking and self.current_target is None:
-                    targets = [d for d in dets if d.class_name in class_names and not self.is_in_dead_zone(d.cx, d.cy)]
-                    if targets:
-                        self.current_target = targets[0]
-                        self.attack_count = 0
-                        self.last_attack_time = time.time() - POST_CLICK_DELAY
-                        if DEBUG: print(f"New target: {self.current_target.class_name}")
-                        self.start_cursor_tracking()
-                        continue
-                    else:
-                        time.sleep(0.05)
-                
-                # Handle case when not attacking or need to start attacking
-                elif not self.attacking:
-                    targets = [d for d in dets if d.class_name in class_names and not self.is_in_dead_zone(d.cx, d.cy)]
-                    if targets:
-                        self.current_target = targets[0]
-                        self.attacking = True
-                        self.attack_count = 0
-                        self.last_attack_time = time.time() - POST_CLICK_DELAY
-                        if DEBUG: print(f"New target: {self.current_target.class_name}")
-                        self.start_cursor_tracking()
-                        continue
-                
-                    # No targets, rotate camera and move
-                    self.smooth_rotate_camera()
-                    time.sleep(0.1)
-                    
-                    # Check for obstacles and move
-                    dir = detect_obstacle_direction(frame)
-                    if dir == 'left':
-                        press_mouse('right')
-                        move_mouse_rel(-200, 0)
-                        release_mouse('right')
-                    elif dir == 'right':
-                        press_mouse('right')
-                        move_mouse_rel(200, 0)
-                        release_mouse('right')
-                    else:
-                        press_key(ord('W'))
-                        time.sleep(0.2)
-                        release_key(ord('W'))
-                    
-                    time.sleep(0.05)
+        try:
+            asyncio.run(self.run_async())
+        finally:
+            # Release worker processes and shared frame buffers
+            self.cursor_pool.shutdown()
 
     def stop(self):
+        # The state machine drops its target once the current step finishes
         self.running = False
-        self.attacking = False
-        self.current_target = None
-        self.stop_cursor_tracking()
\ No newline at end of file
+        self.stop_cursor_tracking()
@@ -2,7 +2,13 @@
 # This file makes the cursor_detection directory a Python package
 # It's necessary for proper imports between the modules
 
-from .cursor_detection import detect_cursor_state, load_templates, get_cursor_confidence
+from .cursor_detection import (
+    detect_cursor_state,
+    load_templates,
+    get_cursor_confidence,
+    confirm_cursor_state,
+    load_cursor_model
+)
 from .cursor_types import (
     detect_prohibited, 
     detect_red_sword, 
@@ -10,15 +16,31 @@ from .cursor_types import (
     load_cursor_templates, 
     detect_cursor_by_template
 )
+from .cursor_pool import CursorClassifierPool, classify_frame
+from .cursor_cache import CursorStateCache, roi_fingerprint
+from .cursor_dense import dense_cursor_states
+from .debug_writer import DebugWriter
+from .cursor_model import CursorModel, train_cursor_model, evaluate_classifiers
 
 # Explicitly define what gets imported with "from cursor_detection import *"
 __all__ = [
     'detect_cursor_state',
     'load_templates',
     'get_cursor_confidence',
+    'confirm_cursor_state',
+    'load_cursor_model',
     'detect_prohibited',
     'detect_red_sword',
     'detect_hand',
     'load_cursor_templates',
-    'detect_cursor_by_template'
+    'detect_cursor_by_template',
+    'CursorClassifierPool',
+    'classify_frame',
+    'CursorStateCache',
+    'roi_fingerprint',
+    'dense_cursor_states',
+    'DebugWriter',
+    'CursorModel',
+    'train_cursor_model',
+    'evaluate_classifiers'
 ]
\ No newline at end of file
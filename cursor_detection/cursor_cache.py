@@ -0,0 +1,130 @@
+"""Change-triggered cursor classification cache keyed by ROI fingerprints"""
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# Side of the downsampled fingerprint in pixels
+FINGERPRINT_SIZE = 16
+
+
+def roi_fingerprint(roi):
+    """
+    Compute a cheap fingerprint of an ROI.
+
+    The ROI is area-downsampled to a small thumbnail, so sensor noise and
+    sub-pixel jitter average out while a changed cursor sprite still moves
+    several cells.
+
+    Returns:
+        np.ndarray: int16 thumbnail of shape (FINGERPRINT_SIZE, FINGERPRINT_SIZE, C)
+    """
+    thumb = cv2.resize(roi, (FINGERPRINT_SIZE, FINGERPRINT_SIZE), interpolation=cv2.INTER_AREA)
+    return thumb.astype(np.int16)
+
+
+class CursorStateCache:
+    """
+    Cache of recent cursor classifications.
+
+    An entry is reused when the ROI at the same location still matches the
+    stored fingerprint, i.e. no thumbnail cell changed by more than
+    ``threshold`` intensity levels, and the entry is younger than ``max_age``
+    seconds of ``clock``.
+
+    Args:
+        threshold: Max per-cell thumbnail change to reuse a state
+        max_age: Seconds an entry stays valid
+        max_entries: Number of ROI locations remembered
+        clock: Callable returning the current time, the bot clock's now()
+    """
+
+    def __init__(self, threshold=12, max_age=0.25, max_entries=8, clock=time.monotonic):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def roi_bounds(frame, target_x, target_y, search_radius=50):
+        """Clip the search square around the target to the frame"""
+        h, w = frame.shape[:2]
+        return (max(0, target_x - search_radius), max(0, target_y - search_radius),
+                min(w, target_x + search_radius), min(h, target_y + search_radius))
+
+    def lookup(self, frame, target_x, target_y, search_radius=50):
+        """
+        Look up a cached cursor state for the ROI around the target.
+
+        Returns:
+            tuple: (state or None, token) where token is passed to store()
+                after a miss
+        """
+        key = self.roi_bounds(frame, target_x, target_y, search_radius)
+        x1, y1, x2, y2 = key
+        roi = frame[y1:y2, x1:x2]
+        if roi.size == 0:
+            return "NONE", None
+
+        fingerprint = roi_fingerprint(roi)
+        entry = self.entries.get(key)
+        if entry is not None:
+            state, stored, stamp = entry
+            if (self.clock() - stamp < self.max_age
+                    and np.abs(fingerprint - stored).max() <= self.threshold):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return state, None
+
+        self.misses += 1
+        return None, (key, fingerprint)
+
+    def store(self, token, state):
+        """Remember the state classified for a missed lookup"""
+        if token is None:
+            return
+        key, fingerprint = token
+        self.entries[key] = (state, fingerprint, self.clock())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def classify(self, frame, target_x, target_y, search_radius=50, classify_fn=None, refresh=False):
+        """
+        Return the cached state or classify the ROI and cache the result.
+
+        Args:
+            classify_fn: Callable (frame, target_x, target_y, search_radius)
+                returning a cursor state; defaults to detect_cursor_state
+            refresh: Always classify and only store the result. Sequential
+                confirmation needs this, a cache hit is not a new sample.
+        """
+        if refresh:
+            key = self.roi_bounds(frame, target_x, target_y, search_radius)
+            x1, y1, x2, y2 = key
+            roi = frame[y1:y2, x1:x2]
+            token = (key, roi_fingerprint(roi)) if roi.size else None
+        else:
+            state, token = self.lookup(frame, target_x, target_y, search_radius)
+            if state is not None:
+                return state
+
+        if classify_fn is None:
+            from .cursor_detection import detect_cursor_state
+            classify_fn = detect_cursor_state
+        state = classify_fn(frame, target_x, target_y, search_radius)
+        self.store(token, state)
+        return state
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups served from the cache, or None before any"""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def clear(self):
+        self.entries.clear()
@@ -4,76 +4,93 @@ import time
 import os
 import numpy as np
 from .cursor_detection import detect_cursor_state, DEBUG, DEBUG_FOLDER
+from .cursor_dense import PER_ROI_OPTIONS, dense_cursor_states
+from .cursor_types import red_mask, sword_mask, hand_mask
+from .debug_writer import DebugWriter
+
+# Defaults for the debug_writer section of config.yaml
+DEBUG_SAMPLE_RATES = {"roi": 1.0, "masks": 0.2, "sample": 1.0}
+DEBUG_ENCODING = "png"  # "png" or "npy"
+DEBUG_PNG_COMPRESSION = 1
+DEBUG_MAX_QUEUE = 64
+
+# Shared background writer, created on first use
+debug_writer = None
+
+
+def get_debug_writer():
+    """Return the shared debug writer, configured from config.yaml on first use"""
+    global debug_writer
+    if debug_writer is None:
+        import utils
+        cfg = utils.CFG.get('debug_writer') or {}
+        debug_writer = DebugWriter(
+            DEBUG_FOLDER,
+            sample_rates={**DEBUG_SAMPLE_RATES, **(cfg.get('sample_rates') or {})},
+            encoding=cfg.get('encoding', DEBUG_ENCODING),
+            png_compression=cfg.get('png_compression', DEBUG_PNG_COMPRESSION),
+            max_queue=cfg.get('max_queue', DEBUG_MAX_QUEUE)
+        )
+    return debug_writer
 
 
 def debug_save_roi(roi, prefix="roi"):
-    """Save ROI debug image if debugging is enabled"""
+    """Queue an ROI debug image if debugging is enabled"""
     if not DEBUG:
         return
         
+    writer = get_debug_writer()
+    if not writer.should_sample("roi"):
+        return
     timestamp = int(time.time() * 1000)
-    cv2.imwrite(f"{DEBUG_FOLDER}/{prefix}_{timestamp}.png", roi)
+    # ROIs are small, copy so the caller may reuse the frame
+    writer.queue_artifact(f"{prefix}_{timestamp}", roi.copy())
 
 
-def debug_save_masks(roi, hsv):
-    """Save all detection masks for debugging"""
+def debug_save_masks(roi, hsv=None, masks=None):
+    """
+    Queue all detection masks for debugging.
+    
+    Args:
+        roi: Region of interest in BGR format
+        hsv: ROI in HSV format, computed if missing
+        masks: Masks filled in by detect_cursor_state(..., masks=masks);
+            any mask missing from it is computed here
+    """
     if not DEBUG:
         return
         
+    writer = get_debug_writer()
+    if not writer.should_sample("masks"):
+        return
     timestamp = int(time.time() * 1000)
+    masks = dict(masks or {})
     
-    # Save different masks
-    # Red masks for prohibited sign
-    lower_red1 = np.array([0, 100, 100])
-    upper_red1 = np.array([10, 255, 255])
-    lower_red2 = np.array([160, 100, 100])
-    upper_red2 = np.array([180, 255, 255])
-    
-    mask_red1 = cv2.inRange(hsv, lower_red1, upper_red1)
-    mask_red2 = cv2.inRange(hsv, lower_red2, upper_red2)
-    mask_red = cv2.bitwise_or(mask_red1, mask_red2)
-    
-    # Sword masks
-    lower_sword_red1 = np.array([0, 140, 160])
-    upper_sword_red1 = np.array([10, 255, 255])
-    lower_sword_red2 = np.array([170, 140, 160])
-    upper_sword_red2 = np.array([180, 255, 255])
-    
-    mask_sword1 = cv2.inRange(hsv, lower_sword_red1, upper_sword_red1)
-    mask_sword2 = cv2.inRange(hsv, lower_sword_red2, upper_sword_red2)
-    mask_sword = cv2.bitwise_or(mask_sword1, mask_sword2)
+    if any(name not in masks for name in ("red", "sword", "hand")):
+        if hsv is None:
+            hsv = masks.get("hsv")
+        if hsv is None:
+            hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+        masks.setdefault("red", red_mask(hsv))
+        masks.setdefault("sword", sword_mask(hsv))
+        masks.setdefault("hand", hand_mask(hsv))
     
-    # Hand masks
-    lower_hand1 = np.array([10, 30, 80])
-    upper_hand1 = np.array([25, 140, 220])
-    lower_hand2 = np.array([20, 25, 100])
-    upper_hand2 = np.array([30, 130, 230])
+    # Queue all masks
+    writer.queue_artifact(f"mask_red_{timestamp}", masks["red"])
+    writer.queue_artifact(f"mask_sword_{timestamp}", masks["sword"])
+    writer.queue_artifact(f"mask_hand_{timestamp}", masks["hand"])
     
-    mask_hand1 = cv2.inRange(hsv, lower_hand1, upper_hand1)
-    mask_hand2 = cv2.inRange(hsv, lower_hand2, upper_hand2)
-    mask_hand = cv2.bitwise_or(mask_hand1, mask_hand2)
-    
-    # Save all masks
-    cv2.imwrite(f"{DEBUG_FOLDER}/mask_red_{timestamp}.png", mask_red)
-    cv2.imwrite(f"{DEBUG_FOLDER}/mask_sword_{timestamp}.png", mask_sword)
-    cv2.imwrite(f"{DEBUG_FOLDER}/mask_hand_{timestamp}.png", mask_hand)
-    
-    # Save pixel counts
-    with open(f"{DEBUG_FOLDER}/pixel_counts_{timestamp}.txt", "w") as f:
-        f.write(f"Sword pixels: {cv2.countNonZero(mask_sword)}\n")
-        f.write(f"Hand pixels: {cv2.countNonZero(mask_hand)}\n")
-        f.write(f"Red pixels: {cv2.countNonZero(mask_red)}\n")
+    # Queue pixel counts
+    writer.queue_artifact(
+        f"pixel_counts_{timestamp}",
+        f"Sword pixels: {cv2.countNonZero(masks['sword'])}\n"
+        f"Hand pixels: {cv2.countNonZero(masks['hand'])}\n"
+        f"Red pixels: {cv2.countNonZero(masks['red'])}\n"
+    )
 
 
-def debug_save_cursor_sample(frame, target_x, target_y, detected_state):
-    """Save a debug sample with the detected cursor state overlaid"""
-    if not DEBUG:
-        return
-        
-    timestamp = int(time.time() * 1000)
-    sample_radius = 50
-    
-    # Clone frame and draw debug info
+def _render_cursor_sample(frame, target_x, target_y, detected_state, sample_radius):
+    """Draw the cursor debug overlay on a copy of the frame"""
     debug_frame = frame.copy()
     
     # Draw target crosshair
@@ -90,14 +107,41 @@ def debug_save_cursor_sample(frame, target_x, target_y, detected_state):
     cv2.putText(debug_frame, f"State: {detected_state}", 
                (target_x - sample_radius, target_y - sample_radius - 10),
                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 2)
+    return debug_frame
+
+
+def debug_save_cursor_sample(frame, target_x, target_y, detected_state):
+    """
+    Queue a debug sample with the detected cursor state overlaid.
     
-    cv2.imwrite(f"{DEBUG_FOLDER}/debug_sample_{detected_state}_{timestamp}.png", debug_frame)
+    The clean ROI is queued as well, named cursor_roi_<state>_<timestamp>,
+    so samples can be labeled and used to train the cursor model.
+    The frame is copied and drawn on the writer thread, so it must not be
+    modified by the caller afterwards.
+    """
+    if not DEBUG:
+        return
+        
+    writer = get_debug_writer()
+    if not writer.should_sample("sample"):
+        return
+    timestamp = int(time.time() * 1000)
+    h, w = frame.shape[:2]
+    roi = frame[max(0, target_y - 50):min(h, target_y + 50), max(0, target_x - 50):min(w, target_x + 50)]
+    writer.queue_artifact(f"cursor_roi_{detected_state}_{timestamp}", roi.copy())
+    writer.queue_artifact(
+        f"debug_sample_{detected_state}_{timestamp}",
+        lambda: _render_cursor_sample(frame, target_x, target_y, detected_state, 50)
+    )
 
 
-def analyze_cursor_regions(frame):
+def analyze_cursor_regions(frame, dense=True):
     """
     Helper function to analyze cursor detection across the entire frame.
     Returns a visualization of detected cursor states.
+    
+    With dense=True masks and template responses are computed once for the
+    whole frame instead of re-running detect_cursor_state per grid point.
     """
     if not DEBUG:
         return None
@@ -107,22 +151,26 @@ def analyze_cursor_regions(frame):
     
     # Sample regions across the frame
     step = 50
-    for y in range(step, height, step):
-        for x in range(step, width, step):
-            state = detect_cursor_state(frame, x, y, search_radius=20)
+    if dense:
+        samples = dense_cursor_states(frame, step=step, search_radius=20)
+    else:
+        samples = [(x, y, detect_cursor_state(frame, x, y, search_radius=20, **PER_ROI_OPTIONS))
+                   for y in range(step, height, step)
+                   for x in range(step, width, step)]
+    
+    for x, y, state in samples:
+        # Draw different colors for different states
+        if state == "RED_SWORD":
+            color = (0, 0, 255)  # Red
+        elif state == "HAND":
+            color = (0, 255, 255)  # Yellow
+        elif state == "PROHIBITED":
+            color = (255, 0, 0)  # Blue
+        else:
+            continue  # Skip NONE
             
-            # Draw different colors for different states
-            if state == "RED_SWORD":
-                color = (0, 0, 255)  # Red
-            elif state == "HAND":
-                color = (0, 255, 255)  # Yellow
-            elif state == "PROHIBITED":
-                color = (255, 0, 0)  # Blue
-            else:
-                continue  # Skip NONE
-                
-            cv2.circle(vis_img, (x, y), 5, color, -1)
-            cv2.putText(vis_img, state[:1], (x-5, y-5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
+        cv2.circle(vis_img, (x, y), 5, color, -1)
+        cv2.putText(vis_img, state[:1], (x-5, y-5), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
     
     return vis_img
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""Dense whole-frame cursor classification for debug heatmaps"""
+import cv2
+import numpy as np
+
+from . import cursor_detection
+from .cursor_detection import load_templates, classify_pixel_counts, detect_cursor_state
+from .cursor_types import (
+    red_mask,
+    sword_mask,
+    hand_mask,
+    is_prohibited_contour,
+    template_gray_and_mask,
+    TEMPLATE_MATCH_THRESHOLD
+)
+
+# detect_cursor_state options the dense maps reproduce: the template and
+# color pipeline with a sliding-window search over the whole ROI
+PER_ROI_OPTIONS = {'method': "pipeline", 'anchored': False}
+
+# Fewest red pixels a prohibition sign can have: after the 3x3 opening in
+# red_mask strokes are at least 3 px thick, and the sign is over 10x10 px
+MIN_SIGN_PIXELS = 40
+
+
+def _prepare_templates(templates):
+    """
+    Precompute the zero-mean masked form of every template.
+
+    Returns:
+        list: (cursor_type, template_gray, mask, zero_mean_template, template_norm)
+            where the last three are None for templates without alpha
+    """
+    prepared = []
+    for cursor_type, template in templates.items():
+        if template is None:
+            continue
+        template_gray, template_mask = template_gray_and_mask(template)
+        if template_mask is None:
+            prepared.append((cursor_type, template_gray, None, None, None))
+            continue
+        mask = (template_mask > 0).astype(np.float32)
+        template_f = template_gray.astype(np.float32)
+        zero_mean = mask * (template_f - (template_f * mask).sum() / mask.sum())
+        prepared.append((cursor_type, template_gray, mask, zero_mean, float(np.sqrt((zero_mean ** 2).sum()))))
+    return prepared
+
+
+def _masked_ccoeff_normed(band, band_sq, mask, zero_mean, template_norm):
+    """
+    TM_CCOEFF_NORMED with a binary mask, built from three plain correlations.
+
+    The masked matcher in OpenCV is several times slower than plain
+    correlation; with a binary mask the same score is
+    corr(I, T') / (|T'| * sqrt(corr(I^2, M) - corr(I, M)^2 / n)),
+    where T' is the template made zero-mean inside the mask M.
+    """
+    numerator = cv2.matchTemplate(band, zero_mean, cv2.TM_CCORR)
+    sums = cv2.matchTemplate(band, mask, cv2.TM_CCORR)
+    sums_sq = cv2.matchTemplate(band_sq, mask, cv2.TM_CCORR)
+    variance = np.maximum(sums_sq - sums * sums / mask.sum(), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return numerator / (np.sqrt(variance) * template_norm)
+
+
+def _band_responses(gray, y1, y2, prepared):
+    """
+    Match every template against a horizontal band of the frame.
+
+    Only placements whose rows fall inside one grid row of ROIs are
+    computed, which is far cheaper than matching the whole frame.
+
+    Returns:
+        list: (cursor_type, response_map, template_h, template_w)
+    """
+    band = gray[y1:y2]
+    band_f = band.astype(np.float32)
+    band_sq = band_f * band_f
+    responses = []
+    for cursor_type, template_gray, mask, zero_mean, template_norm in prepared:
+        th, tw = template_gray.shape
+        if mask is not None:
+            result = _masked_ccoeff_normed(band_f, band_sq, mask, zero_mean, template_norm)
+        else:
+            result = cv2.matchTemplate(band, template_gray, cv2.TM_CCOEFF_NORMED)
+        # Flat patches give NaN/inf, never count them as matches
+        result = np.nan_to_num(result, nan=-1.0, posinf=-1.0, neginf=-1.0)
+        responses.append((cursor_type, result, th, tw))
+    return responses
+
+
+def _box_sum(integral, x1, y1, x2, y2):
+    """Sum of the source map over [y1:y2, x1:x2] from its integral image"""
+    return integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+
+
+def dense_cursor_states(frame, step=50, search_radius=20, templates=None):
+    """
+    Classify the cursor state on a regular grid over the whole frame.
+
+    Color masks are computed once for the frame and template response maps
+    once per grid row. Each grid point then reads its template score as a
+    window maximum of the response maps and its mask pixel counts from
+    integral images, so the cost per point is O(1) in the ROI size. Results
+    match detect_cursor_state with PER_ROI_OPTIONS except for blobs cut by
+    an ROI edge, where per-ROI morphology can differ slightly.
+
+    Args:
+        frame: Input frame (BGR format)
+        step: Grid spacing in pixels
+        search_radius: Search area radius around each grid point
+        templates: Cursor templates, defaults to the process-wide cache
+            (none while template matching is disabled)
+
+    Returns:
+        list: (x, y, state) for every grid point
+    """
+    height, width = frame.shape[:2]
+    if templates is None:
+        templates = (load_templates() or {}) if cursor_detection.template_matching else {}
+
+    # Templates that would not fit an ROI are resized by the per-ROI matcher
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    prepared = _prepare_templates(templates)
+    max_th = max((t[1].shape[0] for t in prepared), default=0)
+    max_tw = max((t[1].shape[1] for t in prepared), default=0)
+
+    # Color masks once for the frame, with 0/1 integral images for counting
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    mask_red = red_mask(hsv)
+    red_integral = cv2.integral((mask_red > 0).astype(np.uint8))
+    sword_integral = cv2.integral((sword_mask(hsv) > 0).astype(np.uint8))
+    hand_integral = cv2.integral((hand_mask(hsv) > 0).astype(np.uint8))
+
+    states = []
+    for y in range(step, height, step):
+        y1 = max(0, y - search_radius)
+        y2 = min(height, y + search_radius)
+        # Template response maps for this row of ROIs
+        responses = _band_responses(gray, y1, y2, prepared) if y2 - y1 >= max_th else None
+
+        for x in range(step, width, step):
+            x1 = max(0, x - search_radius)
+            x2 = min(width, x + search_radius)
+
+            if responses is None or x2 - x1 < max_tw:
+                states.append((x, y, detect_cursor_state(frame, x, y, search_radius, **PER_ROI_OPTIONS)))
+                continue
+
+            # Template matching: best placement fully inside the ROI
+            best_match, best_score = "NONE", 0
+            for cursor_type, result, th, tw in responses:
+                score = result[:y2 - y1 - th + 1, x1:x2 - tw + 1].max()
+                if score > best_score:
+                    best_match, best_score = cursor_type, score
+            if best_score >= TEMPLATE_MATCH_THRESHOLD:
+                states.append((x, y, best_match))
+                continue
+
+            # Prohibition sign: most ROIs are ruled out by the integral image
+            # alone, contours run only where enough red pixels are present
+            if _box_sum(red_integral, x1, y1, x2, y2) >= MIN_SIGN_PIXELS:
+                contours, _ = cv2.findContours(mask_red[y1:y2, x1:x2], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                if any(is_prohibited_contour(c) for c in contours):
+                    states.append((x, y, "PROHIBITED"))
+                    continue
+
+            sword_pixels = _box_sum(sword_integral, x1, y1, x2, y2)
+            hand_pixels = _box_sum(hand_integral, x1, y1, x2, y2)
+            states.append((x, y, classify_pixel_counts(sword_pixels, hand_pixels)))
+
+    return states
@@ -3,7 +3,7 @@ import cv2
 import numpy as np
 import time
 import os
-from collections import Counter
+import math
 
 # Debug settings
 DEBUG_FOLDER = "cursor_debug"
@@ -15,16 +15,59 @@ if DEBUG and not os.path.exists(DEBUG_FOLDER):
 # Global templates
 cursor_templates = None
 
-def load_templates():
-    """Load cursor templates at module level"""
+# Template matching before the color fallback. Off reproduces the bot
+# before the templates shipped in cursor_detection/templates were found
+template_matching = True
+
+# Learned classifier, used instead of the pipeline once loaded
+cursor_model = None
+
+# All states detect_cursor_state can return
+CURSOR_STATES = ("RED_SWORD", "HAND", "PROHIBITED", "NONE")
+
+# Allowed misalignment of the cursor sprite for hotspot-anchored matching
+HOTSPOT_TOLERANCE = 2
+
+# Minimum mask pixel counts for the color-based fallback
+SWORD_PIXEL_THRESHOLD = 35
+HAND_PIXEL_THRESHOLD = 25
+
+def set_template_matching(enabled):
+    """Enable or disable template matching in the pipeline for this process"""
+    global template_matching
+    template_matching = bool(enabled)
+
+
+def load_templates(force=False):
+    """Load cursor templates at module level, once per process unless forced"""
     global cursor_templates
+    if cursor_templates is not None and not force:
+        return cursor_templates
     # Modified to correctly import from the same package
     from cursor_detection.cursor_types import load_cursor_templates
-    # Templates directory is one level above the cursor_detection folder
-    templates_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+    # Templates ship inside the cursor_detection folder
+    templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
     cursor_templates = load_cursor_templates(templates_dir)
+    return cursor_templates
 
-def detect_cursor_state(frame, target_x, target_y, search_radius=50):
+def load_cursor_model(path):
+    """
+    Load a trained CursorModel and make it the default classifier.
+
+    Args:
+        path: Model file written by CursorModel.save(), or None to go back
+            to the template and color pipeline
+    """
+    global cursor_model
+    if path is None:
+        cursor_model = None
+        return None
+    from cursor_detection.cursor_model import CursorModel
+    cursor_model = CursorModel.load(path)
+    return cursor_model
+
+def detect_cursor_state(frame, target_x, target_y, search_radius=50, masks=None, method=None,
+                        anchored=True, cursor=None):
     """
     Accurately detect the cursor state around the target coordinates.
     
@@ -33,6 +76,14 @@ def detect_cursor_state(frame, target_x, target_y, search_radius=50):
         target_x: X coordinate of target
         target_y: Y coordinate of target
         search_radius: Search area radius around target
+        masks: Optional dict filled with the ROI, its HSV image and the color
+            masks computed on the way, so debug output can reuse them
+        method: "pipeline" for template and color matching, "model" for the
+            learned classifier; defaults to the model once one is loaded
+        anchored: The mouse position is known, so first match each template
+            only where its hotspot places it; the sliding-window search over
+            the ROI runs only if that finds nothing
+        cursor: (x, y) of the mouse in the frame, defaults to the target
         
     Returns:
         str: One of "RED_SWORD", "HAND", "PROHIBITED", "NONE"
@@ -49,62 +100,145 @@ def detect_cursor_state(frame, target_x, target_y, search_radius=50):
     if roi.size == 0 or roi.shape[0] == 0 or roi.shape[1] == 0:
         return "NONE"
     
+    if method is None:
+        method = "model" if cursor_model is not None else "pipeline"
+    if method == "model":
+        if cursor_model is None:
+            raise ValueError("No cursor model loaded, call load_cursor_model() first")
+        if masks is not None:
+            masks.update(roi=roi)
+        return cursor_model.classify(roi)
+    
     # Load templates if not already loaded
     global cursor_templates
     if cursor_templates is None:
         load_templates()
     
     # First try template matching if templates are available
-    if cursor_templates and any(template is not None for template in cursor_templates.values()):
-        from cursor_detection.cursor_types import detect_cursor_by_template
+    if template_matching and cursor_templates and any(t is not None for t in cursor_templates.values()):
+        from cursor_detection.cursor_types import detect_cursor_at_hotspot, detect_cursor_by_template
+        if anchored:
+            cursor_x, cursor_y = cursor if cursor is not None else (target_x, target_y)
+            anchored_result, _ = detect_cursor_at_hotspot(
+                frame, cursor_x, cursor_y, cursor_templates, HOTSPOT_TOLERANCE
+            )
+            if anchored_result != "NONE":
+                return anchored_result
+        
         template_result = detect_cursor_by_template(roi, cursor_templates)
         if template_result != "NONE":
             return template_result
     
     # Fall back to color-based detection if template matching fails
-    from cursor_detection.cursor_types import detect_prohibited, detect_red_sword, detect_hand
+    from cursor_detection.cursor_types import red_mask, sword_mask, hand_mask, is_prohibited_contour
+    
+    # Convert to HSV once for all color masks
+    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+    mask_red = red_mask(hsv)
+    if masks is not None:
+        masks.update(roi=roi, hsv=hsv, red=mask_red)
     
     # Check for prohibited sign first (highest priority)
-    if detect_prohibited(roi):
+    contours, _ = cv2.findContours(mask_red, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if any(is_prohibited_contour(contour) for contour in contours):
         return "PROHIBITED"
     
     # Get pixel counts for sword and hand
-    sword_pixels = detect_red_sword(roi)
-    hand_pixels = detect_hand(roi)
+    mask_sword = sword_mask(hsv)
+    mask_hand = hand_mask(hsv)
+    if masks is not None:
+        masks.update(sword=mask_sword, hand=mask_hand)
+    return classify_pixel_counts(cv2.countNonZero(mask_sword), cv2.countNonZero(mask_hand))
+
+
+def classify_pixel_counts(sword_pixels, hand_pixels):
+    """
+    Decide between sword and hand cursors from their mask pixel counts.
     
-    # Decision logic
-    if sword_pixels > 35:
-        if hand_pixels > 25:
+    Returns:
+        str: One of "RED_SWORD", "HAND", "NONE"
+    """
+    if sword_pixels > SWORD_PIXEL_THRESHOLD:
+        if hand_pixels > HAND_PIXEL_THRESHOLD:
             # If both detected, prioritize sword if more dominant
             if sword_pixels > hand_pixels * 0.6:
                 return "RED_SWORD"  
             else:
                 return "HAND"
         return "RED_SWORD"
-    elif hand_pixels > 25:
+    elif hand_pixels > HAND_PIXEL_THRESHOLD:
         return "HAND"
     else:
         return "NONE"
 
 
+def confirm_cursor_state(sample_state, confidence=0.95, accuracy=0.85,
+                         max_samples=6, ambiguous_delay=0.01):
+    """
+    Confirm the cursor state from a stream of fresh samples, stopping early.
+
+    Each sample is treated as a noisy vote that is right with probability
+    ``accuracy`` and otherwise lands on any other state. The posterior over
+    states is updated after every sample and sampling stops as soon as the
+    leading state reaches ``confidence``. Samples are taken back to back;
+    a short wait is inserted only once the signal has proven ambiguous.
+
+    Args:
+        sample_state: Callable returning the cursor state of a fresh frame
+        confidence: Posterior probability needed to accept a state
+        accuracy: Assumed probability that a single sample is correct
+        max_samples: Upper bound on the number of samples
+        ambiguous_delay: Wait before resampling while still unconfirmed
+
+    Returns:
+        tuple: (state, confidence, samples_used)
+    """
+    if max_samples < 1:
+        raise ValueError(f"max_samples must be at least 1, got {max_samples}")
+    hit = math.log(accuracy)
+    miss = math.log((1.0 - accuracy) / (len(CURSOR_STATES) - 1))
+    log_post = dict.fromkeys(CURSOR_STATES, 0.0)
+
+    best, best_conf = "NONE", 0.0
+    for n in range(1, max_samples + 1):
+        state = sample_state()
+        log_post.setdefault(state, miss * (n - 1))
+        for s in log_post:
+            log_post[s] += hit if s == state else miss
+
+        # Normalize in log space to get the posterior of the leader
+        top = max(log_post.values())
+        total = sum(math.exp(v - top) for v in log_post.values())
+        best = max(log_post, key=log_post.get)
+        best_conf = 1.0 / total
+
+        if best_conf >= confidence:
+            break
+        if n > 1 and n < max_samples:
+            # Still unconfirmed after a second look: the signal is ambiguous,
+            # give the game a moment to settle the cursor
+            time.sleep(ambiguous_delay)
+
+    return best, best_conf, n
+
+
 def get_cursor_confidence(frame, target_x, target_y, search_radius=50, num_samples=5):
     """
-    Get cursor state with confidence by taking multiple samples.
-    
+    Get cursor state with confidence by sampling fresh frames.
+
+    Args:
+        frame: Input frame, or a callable returning a fresh frame per sample.
+            A single frame always classifies the same way, so it is sampled once.
+        num_samples: Maximum number of samples when frame is a callable
+
     Returns:
         tuple: (state, confidence) where confidence is 0-1
     """
-    states = []
-    
-    for i in range(num_samples):
-        state = detect_cursor_state(frame, target_x, target_y, search_radius)
-        states.append(state)
-        if i < num_samples - 1:
-            time.sleep(0.01)  # Small delay between samples
-    
-    # Count occurrences
-    state_counts = Counter(states)
-    most_common = state_counts.most_common(1)[0]
-    confidence = most_common[1] / num_samples
-    
-    return most_common[0], confidence
\ No newline at end of file
+    if not callable(frame):
+        return detect_cursor_state(frame, target_x, target_y, search_radius), 1.0
+
+    state, confidence, _ = confirm_cursor_state(
+        lambda: detect_cursor_state(frame(), target_x, target_y, search_radius),
+        max_samples=num_samples
+    )
+    return state, confidence
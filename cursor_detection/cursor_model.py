@@ -0,0 +1,279 @@
+"""Learned cursor classifier: a softmax model on compact ROI features"""
+import argparse
+import os
+import re
+import time
+
+import cv2
+import numpy as np
+
+from .cursor_detection import CURSOR_STATES, detect_cursor_state
+
+# ROIs are reduced to a THUMB_SIZE x THUMB_SIZE color thumbnail
+THUMB_SIZE = 12
+# Hue/saturation histogram bins over the full ROI
+HUE_BINS = 12
+SAT_BINS = 4
+
+# Labeled ROI file names written by debug_save_cursor_sample
+ROI_NAME = re.compile(r"cursor_roi_([A-Z_]+)_\d+")
+
+
+def roi_features(roi):
+    """
+    Compact feature vector of a BGR cursor ROI.
+
+    A small color thumbnail keeps the sprite shape, a hue/saturation
+    histogram of the full ROI keeps the sprite colors independent of
+    position.
+
+    Returns:
+        np.ndarray: float32 vector of length feature_size()
+    """
+    thumb = cv2.resize(roi, (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [HUE_BINS, SAT_BINS], [0, 180, 0, 256])
+    hist /= max(1, roi.shape[0] * roi.shape[1])
+    return np.concatenate([thumb.reshape(-1).astype(np.float32) / 255.0, hist.reshape(-1)])
+
+
+def feature_size():
+    return THUMB_SIZE * THUMB_SIZE * 3 + HUE_BINS * SAT_BINS
+
+
+def batch_features(rois):
+    """Stack the features of several ROIs into one (N, F) array"""
+    features = np.empty((len(rois), feature_size()), dtype=np.float32)
+    for i, roi in enumerate(rois):
+        features[i] = roi_features(roi)
+    return features
+
+
+class CursorModel:
+    """
+    Linear softmax classifier over roi_features().
+
+    Inference is one matrix product for a whole batch, so it runs on any
+    CPU with NumPy alone.
+
+    Args:
+        weights: (F, C) weight matrix
+        bias: (C,) bias vector
+        mean: (F,) feature mean used for standardization
+        std: (F,) feature standard deviation
+        classes: Class names in column order
+    """
+
+    def __init__(self, weights, bias, mean, std, classes=CURSOR_STATES):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.classes = tuple(classes)
+
+    def predict_proba(self, features):
+        """Class probabilities for an (N, F) feature array"""
+        logits = ((features - self.mean) / self.std) @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def classify_batch(self, rois):
+        """
+        Classify several BGR ROIs in one call.
+
+        Returns:
+            list: Cursor state per ROI
+        """
+        if not rois:
+            return []
+        labels = self.predict_proba(batch_features(rois)).argmax(axis=1)
+        return [self.classes[i] for i in labels]
+
+    def classify(self, roi):
+        """Classify a single BGR ROI"""
+        return self.classify_batch([roi])[0]
+
+    def save(self, path):
+        np.savez(path, weights=self.weights, bias=self.bias, mean=self.mean,
+                 std=self.std, classes=np.array(self.classes))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        if data["weights"].shape[0] != feature_size():
+            raise ValueError(f"{path} was trained on different features")
+        return cls(data["weights"], data["bias"], data["mean"], data["std"],
+                   [str(c) for c in data["classes"]])
+
+
+def train_cursor_model(rois, labels, epochs=500, learning_rate=0.5, l2=1e-3):
+    """
+    Fit a CursorModel with full-batch gradient descent.
+
+    Args:
+        rois: BGR ROIs
+        labels: Cursor state per ROI
+        epochs: Gradient steps
+        learning_rate: Step size
+        l2: Weight decay
+
+    Returns:
+        CursorModel: The trained model
+    """
+    features = batch_features(rois)
+    mean = features.mean(axis=0)
+    std = features.std(axis=0) + 1e-3
+    x = (features - mean) / std
+    y = np.array([CURSOR_STATES.index(label) for label in labels])
+    onehot = np.eye(len(CURSOR_STATES), dtype=np.float32)[y]
+
+    model = CursorModel(
+        np.zeros((x.shape[1], len(CURSOR_STATES)), dtype=np.float32),
+        np.zeros(len(CURSOR_STATES), dtype=np.float32),
+        mean, std
+    )
+    for _ in range(epochs):
+        grad = (model.predict_proba(features) - onehot) / len(x)
+        model.weights -= learning_rate * (x.T @ grad + l2 * model.weights)
+        model.bias -= learning_rate * grad.sum(axis=0)
+    return model
+
+
+def load_labeled_rois(folder, trusted_only=False):
+    """
+    Load labeled ROIs from a folder.
+
+    Labels come from a subfolder named after the state (hand-corrected
+    sets), or from cursor_roi_<STATE>_<id> file names. Those names are
+    written by debug_save_cursor_sample with the state the pipeline
+    detected, so they are only as good as the pipeline, except in folders
+    with a labels.csv written by the synthetic scene generator.
+
+    Args:
+        folder: Root folder, searched recursively
+        trusted_only: Skip file-name labels outside synthetic datasets
+
+    Returns:
+        tuple: (rois, labels)
+    """
+    rois, labels = [], []
+    for root, _, names in os.walk(folder):
+        parent = os.path.basename(root)
+        synthetic = "labels.csv" in names
+        for name in sorted(names):
+            stem, ext = os.path.splitext(name)
+            match = ROI_NAME.fullmatch(stem)
+            if parent in CURSOR_STATES:
+                label = parent
+            elif match and (synthetic or not trusted_only):
+                label = match.group(1)
+            else:
+                continue
+            if label not in CURSOR_STATES:
+                continue
+            path = os.path.join(root, name)
+            roi = np.load(path) if ext == ".npy" else cv2.imread(path, cv2.IMREAD_COLOR)
+            if roi is not None and roi.size:
+                rois.append(roi)
+                labels.append(label)
+    return rois, labels
+
+
+def pipeline_classify_batch(rois):
+    """Classify ROIs one by one with the hand-tuned detect_cursor_state pipeline"""
+    return [
+        detect_cursor_state(roi, roi.shape[1] // 2, roi.shape[0] // 2,
+                            max(roi.shape[:2]), method="pipeline")
+        for roi in rois
+    ]
+
+
+def evaluate_classifiers(rois, labels, classifiers):
+    """
+    Measure accuracy, confusion and latency of batch classifiers.
+
+    Args:
+        rois: BGR ROIs
+        labels: True cursor state per ROI
+        classifiers: Mapping of name to a callable classifying a list of ROIs
+
+    Returns:
+        dict: name -> {'accuracy', 'confusion', 'us_per_roi'}; confusion rows
+            are true states and columns predicted states, in CURSOR_STATES order
+    """
+    truth = np.array([CURSOR_STATES.index(label) for label in labels])
+    results = {}
+    for name, classify in classifiers.items():
+        start = time.perf_counter()
+        predicted = classify(rois)
+        elapsed = time.perf_counter() - start
+        predicted = np.array([CURSOR_STATES.index(state) for state in predicted])
+
+        confusion = np.zeros((len(CURSOR_STATES), len(CURSOR_STATES)), dtype=np.int64)
+        np.add.at(confusion, (truth, predicted), 1)
+        results[name] = {
+            'accuracy': float((truth == predicted).mean()) if len(truth) else 0.0,
+            'confusion': confusion,
+            'us_per_roi': elapsed * 1e6 / max(1, len(rois)),
+        }
+    return results
+
+
+def format_evaluation(results):
+    """Format evaluate_classifiers() output as text tables"""
+    width = max(len(s) for s in CURSOR_STATES) + 1
+    lines = []
+    for name, result in results.items():
+        lines.append(f"{name}: accuracy {result['accuracy']:.3f}, {result['us_per_roi']:.1f} us/ROI")
+        lines.append(" " * width + "".join(f"{s:>{width}}" for s in CURSOR_STATES))
+        for state, row in zip(CURSOR_STATES, result['confusion']):
+            lines.append(f"{state:<{width}}" + "".join(f"{v:>{width}}" for v in row))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or evaluate the learned cursor classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="Train a model from labeled ROIs")
+    train.add_argument("folder", help="Folder of labeled ROIs")
+    train.add_argument("-o", "--output", default="cursor_model.npz")
+    train.add_argument("--holdout", type=float, default=0.2,
+                       help="Fraction of ROIs kept aside for the report")
+    train.add_argument("--pipeline-labels", action="store_true",
+                       help="Also train on debug samples labeled by the pipeline itself; "
+                            "the model then learns the pipeline's mistakes")
+    evaluate = sub.add_parser("evaluate", help="Compare a model with the pipeline")
+    evaluate.add_argument("folder", help="Folder of labeled ROIs")
+    evaluate.add_argument("model", help="Trained model (.npz)")
+    args = parser.parse_args(argv)
+
+    trusted_only = args.command == "train" and not args.pipeline_labels
+    rois, labels = load_labeled_rois(args.folder, trusted_only=trusted_only)
+    if not rois:
+        hint = (" (debug samples need hand-corrected <STATE>/ subfolders, "
+                "or pass --pipeline-labels)") if trusted_only else ""
+        parser.error(f"No labeled ROIs found in {args.folder}{hint}")
+
+    if args.command == "train":
+        order = np.random.default_rng(0).permutation(len(rois))
+        split = int(len(rois) * (1.0 - args.holdout))
+        train_idx, test_idx = order[:split], order[split:]
+        model = train_cursor_model([rois[i] for i in train_idx], [labels[i] for i in train_idx])
+        model.save(args.output)
+        print(f"Model saved: {args.output} ({len(train_idx)} ROIs)")
+        if len(test_idx) == 0:
+            return
+        rois, labels = [rois[i] for i in test_idx], [labels[i] for i in test_idx]
+    else:
+        model = CursorModel.load(args.model)
+
+    print(format_evaluation(evaluate_classifiers(rois, labels, {
+        "pipeline": pipeline_classify_batch,
+        "model": model.classify_batch,
+    })))
+
+
+if __name__ == "__main__":
+    main()
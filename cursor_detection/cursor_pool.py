@@ -0,0 +1,278 @@
+"""Process-pool offload for cursor classification and frame preprocessing"""
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from .cursor_detection import detect_cursor_state, load_templates, load_cursor_model, set_template_matching
+from .cursor_dense import dense_cursor_states
+
+# Shared memory segments attached inside a worker process, keyed by name
+_worker_segments = {}
+
+
+def _worker_init(model_path=None, template_matching=True):
+    """Load cursor templates and the optional model once per worker process"""
+    set_template_matching(template_matching)
+    load_templates()
+    if model_path:
+        load_cursor_model(model_path)
+
+
+def _attach_segment(name, retired=()):
+    """
+    Attach to a shared memory segment, reusing the handle across calls.
+
+    Args:
+        name: Segment to attach
+        retired: Segments the parent has replaced; their handles are closed
+    """
+    for old in retired:
+        shm = _worker_segments.pop(old, None)
+        if shm is not None:
+            shm.close()
+    shm = _worker_segments.get(name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_segments[name] = shm
+    return shm
+
+
+def preprocess_roi(frame, target_x, target_y, search_radius=50, rgb=False):
+    """
+    Cut the cursor ROI out of a frame and convert it to BGR if needed.
+
+    Only the ROI is converted, so a full-frame cvtColor is never needed
+    just to classify the cursor.
+
+    Returns:
+        tuple: (roi, x_offset, y_offset) where the ROI is in BGR format
+    """
+    h, w = frame.shape[:2]
+    x1 = max(0, target_x - search_radius)
+    y1 = max(0, target_y - search_radius)
+    x2 = min(w, target_x + search_radius)
+    y2 = min(h, target_y + search_radius)
+
+    roi = frame[y1:y2, x1:x2]
+    if rgb and roi.size:
+        roi = cv2.cvtColor(roi, cv2.COLOR_RGB2BGR)
+    return roi, x1, y1
+
+
+def classify_frame(frame, target_x, target_y, search_radius=50, rgb=False, cursor=None):
+    """
+    Classify the cursor in a frame, converting only the ROI.
+
+    Args:
+        cursor: (x, y) of the mouse in the frame when it is not on the
+            target, for hotspot-anchored matching
+    """
+    roi, x1, y1 = preprocess_roi(frame, target_x, target_y, search_radius, rgb)
+    if roi.size == 0:
+        return "NONE"
+    if cursor is not None:
+        cursor = (cursor[0] - x1, cursor[1] - y1)
+    # The ROI is already centered on the target, so search it whole
+    return detect_cursor_state(roi, target_x - x1, target_y - y1, search_radius, cursor=cursor)
+
+
+def dense_frame_states(frame, step=50, search_radius=20, rgb=False):
+    """Dense cursor states of a whole frame, converting it to BGR if needed"""
+    if rgb:
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    return dense_cursor_states(frame, step=step, search_radius=search_radius)
+
+
+def _roi_args(frame, target_x, target_y, search_radius, rgb, cursor):
+    """
+    classify_frame() arguments on the part of the frame it reads.
+
+    A 100x100 ROI pickles in a few KB, where copying a 1080p frame into
+    shared memory costs more than classifying it.
+    """
+    roi, x1, y1 = preprocess_roi(frame, target_x, target_y, search_radius)
+    if cursor is not None:
+        cursor = (cursor[0] - x1, cursor[1] - y1)
+    return np.ascontiguousarray(roi), target_x - x1, target_y - y1, search_radius, rgb, cursor
+
+
+def _run_shared(fn, name, shape, dtype, retired, args):
+    """Worker entry point: run fn on a frame stored in shared memory"""
+    shm = _attach_segment(name, retired)
+    frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return fn(frame, *args)
+
+
+class CursorClassifierPool:
+    """
+    Optional process pool for cursor classification.
+
+    Cursor classification sends only the ROI around the target to a
+    worker. Whole-frame work (the grid of dense cursor states) copies the
+    frame once into shared memory. Only small results come back. With
+    ``workers=0`` or when the pool cannot be started, everything runs
+    in-process.
+
+    Args:
+        workers: Number of worker processes
+        model_path: Learned cursor model loaded in every worker process.
+            The pool does not touch the classifier of the calling process,
+            call load_cursor_model() there for in-process classification.
+        template_matching: Template matching in the workers' pipeline, see
+            set_template_matching()
+    """
+
+    def __init__(self, workers=0, model_path=None, template_matching=True):
+        self.workers = max(0, int(workers))
+        self.executor = None
+        self._segments = queue.Queue()
+        self._all_segments = []
+        # Names of replaced segments, sent along so workers close their handles
+        self._retired = deque(maxlen=max(4, 4 * self.workers))
+        self._lock = threading.Lock()
+
+        if self.workers > 0:
+            try:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_worker_init,
+                    initargs=(model_path, template_matching)
+                )
+            except (OSError, ValueError) as e:
+                print(f"Cursor pool unavailable, running in-process: {e}")
+                self.executor = None
+            else:
+                # One segment per worker is enough to keep them all busy
+                for _ in range(self.workers):
+                    self._segments.put(None)
+
+    @property
+    def in_process(self):
+        return self.executor is None
+
+    def _acquire_segment(self, nbytes):
+        """Get a free shared memory segment of at least nbytes"""
+        shm = self._segments.get()
+        if shm is None or shm.size < nbytes:
+            if shm is not None:
+                self._release_segment(shm)
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            with self._lock:
+                self._all_segments.append(shm)
+        return shm
+
+    def _release_segment(self, shm):
+        with self._lock:
+            if shm in self._all_segments:
+                self._all_segments.remove(shm)
+            self._retired.append(shm.name)
+        shm.close()
+        shm.unlink()
+
+    def submit_frame(self, fn, frame, *args):
+        """
+        Schedule fn(frame, *args) on a worker.
+
+        fn must be a module-level function so it can be pickled by name,
+        and should return a small result.
+
+        Returns:
+            Future: resolves to the return value of fn
+        """
+        if self.executor is None:
+            future = Future()
+            future.set_result(fn(frame, *args))
+            return future
+
+        frame = np.ascontiguousarray(frame)
+        shm = self._acquire_segment(frame.nbytes)
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[...] = frame
+
+        try:
+            future = self.executor.submit(
+                _run_shared, fn, shm.name, frame.shape, frame.dtype.str, tuple(self._retired), args
+            )
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._segments.put(shm)
+            self._fallback(e)
+            return self.submit_frame(fn, frame, *args)
+
+        future.add_done_callback(lambda _: self._segments.put(shm))
+        return future
+
+    def run_frame(self, fn, frame, *args):
+        """Run fn(frame, *args) on a worker, blocking until the result is ready"""
+        future = self.submit_frame(fn, frame, *args)
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            self._fallback(e)
+            return fn(frame, *args)
+
+    def submit(self, frame, target_x, target_y, search_radius=50, rgb=False, cursor=None):
+        """
+        Schedule cursor classification for a frame.
+
+        Args:
+            frame: Input frame (BGR, or RGB with rgb=True)
+            target_x: X coordinate of target
+            target_y: Y coordinate of target
+            search_radius: Search area radius around target
+            rgb: Convert the ROI from RGB to BGR before classifying
+            cursor: (x, y) of the mouse in the frame, defaults to the target
+
+        Returns:
+            Future: resolves to one of "RED_SWORD", "HAND", "PROHIBITED", "NONE"
+        """
+        args = _roi_args(frame, target_x, target_y, search_radius, rgb, cursor)
+        if self.executor is None:
+            future = Future()
+            future.set_result(classify_frame(*args))
+            return future
+        try:
+            return self.executor.submit(classify_frame, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._fallback(e)
+            return self.submit(frame, target_x, target_y, search_radius, rgb, cursor)
+
+    def classify(self, frame, target_x, target_y, search_radius=50, rgb=False, cursor=None):
+        """Classify the cursor state, blocking until the result is ready"""
+        future = self.submit(frame, target_x, target_y, search_radius, rgb, cursor)
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            self._fallback(e)
+            return classify_frame(*_roi_args(frame, target_x, target_y, search_radius, rgb, cursor))
+
+    def dense_states(self, frame, step=50, search_radius=20, rgb=False):
+        """
+        Cursor states on a grid over the whole frame, computed on a worker.
+
+        Color conversion, masks and template response maps of the frame
+        are all computed in the worker; only the (x, y, state) list comes back.
+        """
+        return self.run_frame(dense_frame_states, frame, step, search_radius, rgb)
+
+    def _fallback(self, error):
+        """Switch to in-process classification after a pool failure"""
+        print(f"Cursor pool failed, falling back to in-process: {error}")
+        executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Stop the workers and free all shared memory"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        with self._lock:
+            segments, self._all_segments = self._all_segments, []
+        for shm in segments:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,218 @@
+"""Synthetic labeled cursor scenes for accuracy and latency benchmarks"""
+import argparse
+import csv
+import os
+
+import cv2
+import numpy as np
+
+from . import cursor_detection
+from .cursor_detection import CURSOR_STATES, detect_cursor_state, load_templates, set_template_matching
+from .cursor_types import TEMPLATE_HOTSPOTS
+
+# Size of the generated ROIs, matching the bot's 50 px search radius
+ROI_SIZE = 100
+
+# Ranges of the random scene variations
+SCALE_RANGE = (0.85, 1.2)
+BLUR_RANGE = (0.0, 1.2)      # Gaussian sigma in pixels
+GAIN_RANGE = (0.7, 1.3)      # Brightness multiplier of the whole scene
+BIAS_RANGE = (-20, 20)       # Brightness offset of the whole scene
+HOTSPOT_JITTER = 1           # Max cursor offset from the ROI center in pixels
+DISTRACTOR_RATE = 0.3        # Fraction of scenes with red/orange scenery
+
+
+def procedural_background(rng, size=ROI_SIZE):
+    """Smooth random texture, roughly like grass, rock and dirt"""
+    cells = int(rng.integers(3, 12))
+    noise = rng.integers(0, 256, (cells, cells, 3), dtype=np.uint8)
+    texture = cv2.resize(noise, (size, size), interpolation=cv2.INTER_CUBIC)
+    tint = rng.uniform(0.3, 1.0, 3)
+    grain = rng.normal(0, 6, (size, size, 3))
+    return np.clip(texture * tint + grain + rng.uniform(10, 80), 0, 255).astype(np.uint8)
+
+
+def crop_background(rng, frames, size=ROI_SIZE):
+    """Random crop of a random recorded frame (BGR)"""
+    frame = frames[int(rng.integers(len(frames)))]
+    h, w = frame.shape[:2]
+    y = int(rng.integers(0, h - size + 1))
+    x = int(rng.integers(0, w - size + 1))
+    return frame[y:y + size, x:x + size].copy()
+
+
+def add_distractor(rng, image):
+    """Draw a red or orange blob that is not a cursor"""
+    size = image.shape[0]
+    center = tuple(int(v) for v in rng.integers(10, size - 10, 2))
+    axes = tuple(int(v) for v in rng.integers(4, 18, 2))
+    color = (int(rng.integers(0, 60)), int(rng.integers(20, 140)), int(rng.integers(170, 256)))
+    cv2.ellipse(image, center, axes, float(rng.uniform(0, 180)), 0, 360, color, -1)
+
+
+def paste_sprite(image, sprite, x, y, hotspot=(0, 0), scale=1.0):
+    """
+    Alpha-blend a BGRA sprite so that its hotspot lands on (x, y).
+
+    Parts of the sprite outside the image are clipped.
+    """
+    if scale != 1.0:
+        size = (max(1, round(sprite.shape[1] * scale)), max(1, round(sprite.shape[0] * scale)))
+        sprite = cv2.resize(sprite, size, interpolation=cv2.INTER_LINEAR)
+    left = x - round(hotspot[0] * scale)
+    top = y - round(hotspot[1] * scale)
+
+    h, w = image.shape[:2]
+    sh, sw = sprite.shape[:2]
+    x1, y1 = max(0, left), max(0, top)
+    x2, y2 = min(w, left + sw), min(h, top + sh)
+    if x1 >= x2 or y1 >= y2:
+        return image
+    part = sprite[y1 - top:y2 - top, x1 - left:x2 - left]
+    alpha = part[:, :, 3:4].astype(np.float32) / 255.0
+    region = image[y1:y2, x1:x2].astype(np.float32)
+    image[y1:y2, x1:x2] = (part[:, :, :3] * alpha + region * (1.0 - alpha)).astype(np.uint8)
+    return image
+
+
+def generate_scene(rng, state, sprites, frames=None):
+    """
+    Render one labeled ROI with the mouse near its center.
+
+    Args:
+        rng: numpy Generator
+        state: Cursor state to draw; "NONE" draws no cursor
+        sprites: BGRA sprite per state
+        frames: Recorded BGR frames to crop backgrounds from, or None for
+            procedural backgrounds
+
+    Returns:
+        tuple: (BGR ROI, dict of the parameters used)
+    """
+    image = crop_background(rng, frames) if frames else procedural_background(rng)
+    params = {
+        'state': state,
+        'x': ROI_SIZE // 2 + int(rng.integers(-HOTSPOT_JITTER, HOTSPOT_JITTER + 1)),
+        'y': ROI_SIZE // 2 + int(rng.integers(-HOTSPOT_JITTER, HOTSPOT_JITTER + 1)),
+        'scale': float(rng.uniform(*SCALE_RANGE)),
+        'blur': float(rng.uniform(*BLUR_RANGE)),
+        'gain': float(rng.uniform(*GAIN_RANGE)),
+        'bias': float(rng.uniform(*BIAS_RANGE)),
+        'distractor': bool(rng.random() < DISTRACTOR_RATE),
+    }
+
+    if params['distractor']:
+        add_distractor(rng, image)
+    if state != "NONE":
+        paste_sprite(image, sprites[state], params['x'], params['y'],
+                     TEMPLATE_HOTSPOTS.get(state, (0, 0)), params['scale'])
+    if params['blur'] > 0.3:
+        image = cv2.GaussianBlur(image, (0, 0), params['blur'])
+    image = cv2.convertScaleAbs(image, alpha=params['gain'], beta=params['bias'])
+    return image, params
+
+
+def generate_dataset(folder, count, frames=None, seed=0):
+    """
+    Write ``count`` labeled ROIs per cursor state.
+
+    ROIs are named cursor_roi_<STATE>_<index>.png, the format read by
+    cursor_model.load_labeled_rois(), and labels.csv lists the cursor
+    position and variation parameters of every file.
+
+    Returns:
+        int: Number of ROIs written
+    """
+    sprites = load_templates()
+    missing = [s for s in CURSOR_STATES if s != "NONE" and sprites.get(s) is None]
+    if missing:
+        raise FileNotFoundError(f"Cursor templates missing for: {', '.join(missing)}")
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    written = 0
+    with open(os.path.join(folder, "labels.csv"), "w", newline="") as f:
+        writer = None
+        for state in CURSOR_STATES:
+            for i in range(count):
+                image, params = generate_scene(rng, state, sprites, frames)
+                name = f"cursor_roi_{state}_{i:05d}.png"
+                cv2.imwrite(os.path.join(folder, name), image)
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=["file"] + list(params))
+                    writer.writeheader()
+                writer.writerow({"file": name, **params})
+                written += 1
+    return written
+
+
+def candidate_classifiers(model_path=None):
+    """
+    Cursor classifiers to compare, each taking a list of ROIs.
+
+    The mouse is at the ROI center, as when the bot checks its target.
+    """
+    def pipeline(anchored):
+        def classify(rois):
+            return [
+                detect_cursor_state(roi, roi.shape[1] // 2, roi.shape[0] // 2, ROI_SIZE // 2,
+                                    method="pipeline", anchored=anchored)
+                for roi in rois
+            ]
+        return classify
+
+    def colors_only(rois):
+        # The pipeline as it ran before the templates were found
+        previous = cursor_detection.template_matching
+        set_template_matching(False)
+        try:
+            return pipeline(False)(rois)
+        finally:
+            set_template_matching(previous)
+
+    candidates = {
+        "anchored": pipeline(True),
+        "sliding": pipeline(False),
+        "colors": colors_only,
+    }
+    if model_path:
+        from .cursor_model import CursorModel
+        candidates["model"] = CursorModel.load(model_path).classify_batch
+    return candidates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic cursor ROIs and benchmark classifiers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    generate = sub.add_parser("generate", help="Write a labeled synthetic dataset")
+    generate.add_argument("folder")
+    generate.add_argument("--count", type=int, default=200, help="ROIs per cursor state")
+    generate.add_argument("--backgrounds", default=None,
+                          help="Recorded frames (folder, video or .npy) to crop backgrounds from")
+    generate.add_argument("--seed", type=int, default=0)
+    evaluate = sub.add_parser("evaluate", help="Report confusion matrices and latency")
+    evaluate.add_argument("folder")
+    evaluate.add_argument("--model", default=None, help="Also evaluate a trained cursor model")
+    args = parser.parse_args(argv)
+
+    from .cursor_model import evaluate_classifiers, format_evaluation, load_labeled_rois
+
+    if args.command == "generate":
+        frames = None
+        if args.backgrounds:
+            from frame_source import RecordedFrameSource
+            # Recordings are RGB, scenes are BGR like the classifier input
+            frames = [cv2.cvtColor(f, cv2.COLOR_RGB2BGR) for f in RecordedFrameSource._load(args.backgrounds)]
+        written = generate_dataset(args.folder, args.count, frames, args.seed)
+        print(f"Wrote {written} ROIs to {args.folder}")
+        return
+
+    rois, labels = load_labeled_rois(args.folder)
+    if not rois:
+        parser.error(f"No labeled ROIs found in {args.folder}")
+    load_templates()
+    print(format_evaluation(evaluate_classifiers(rois, labels, candidate_classifiers(args.model))))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,24 @@ import cv2
 import numpy as np
 import os
 
+# Minimum normalized correlation for a template match to count
+TEMPLATE_MATCH_THRESHOLD = 0.6
+
+# Cursor sprite file per state, in cursor_detection/templates
+TEMPLATE_FILES = {
+    "RED_SWORD": "unfriendlyattack.png",
+    "PROHIBITED": "dead.png",
+    "HAND": "item_pickup.png"
+}
+
+# Click point of each cursor sprite in template pixels (x, y); the game
+# draws the sprite so that this pixel sits at the mouse position
+TEMPLATE_HOTSPOTS = {
+    "RED_SWORD": (0, 0),
+    "PROHIBITED": (0, 0),
+    "HAND": (0, 0)
+}
+
 
 def detect_prohibited(roi):
     """
@@ -16,7 +34,42 @@ def detect_prohibited(roi):
     """
     # Convert to HSV
     hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+    mask_red = red_mask(hsv)
+    
+    # Find contours
+    contours, _ = cv2.findContours(mask_red, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    return any(is_prohibited_contour(contour) for contour in contours)
+
+
+def is_prohibited_contour(contour):
+    """Check whether a red contour looks like the round prohibition sign"""
+    area = cv2.contourArea(contour)
+    if area > 80:  # Minimum area threshold
+        # Check circularity
+        perimeter = cv2.arcLength(contour, True)
+        if perimeter > 0:
+            circularity = 4 * np.pi * area / (perimeter * perimeter)
+            if circularity > 0.6:
+                # Check aspect ratio
+                x, y, w, h = cv2.boundingRect(contour)
+                aspect_ratio = float(w) / h
+                if 0.7 < aspect_ratio < 1.3 and w > 10 and h > 10:
+                    return True
     
+    return False
+
+
+def red_mask(hsv):
+    """
+    Build the cleaned red mask used for the prohibition sign.
+    
+    Args:
+        hsv: Image in HSV format
+        
+    Returns:
+        np.ndarray: Binary mask (0/255)
+    """
     # Red color ranges
     lower_red1 = np.array([0, 100, 100])
     upper_red1 = np.array([10, 255, 255])
@@ -32,25 +85,7 @@ def detect_prohibited(roi):
     kernel = np.ones((3,3), np.uint8)
     mask_red = cv2.morphologyEx(mask_red, cv2.MORPH_CLOSE, kernel)
     mask_red = cv2.morphologyEx(mask_red, cv2.MORPH_OPEN, kernel)
-    
-    # Find contours
-    contours, _ = cv2.findContours(mask_red, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    for contour in contours:
-        area = cv2.contourArea(contour)
-        if area > 80:  # Minimum area threshold
-            # Check circularity
-            perimeter = cv2.arcLength(contour, True)
-            if perimeter > 0:
-                circularity = 4 * np.pi * area / (perimeter * perimeter)
-                if circularity > 0.6:
-                    # Check aspect ratio
-                    x, y, w, h = cv2.boundingRect(contour)
-                    aspect_ratio = float(w) / h
-                    if 0.7 < aspect_ratio < 1.3 and w > 10 and h > 10:
-                        return True
-    
-    return False
+    return mask_red
 
 
 def detect_red_sword(roi):
@@ -65,7 +100,19 @@ def detect_red_sword(roi):
     """
     # Convert to HSV
     hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+    return cv2.countNonZero(sword_mask(hsv))
+
+
+def sword_mask(hsv):
+    """
+    Build the cleaned bright red mask used for the sword cursor.
     
+    Args:
+        hsv: Image in HSV format
+        
+    Returns:
+        np.ndarray: Binary mask (0/255)
+    """
     # Bright red color ranges for sword
     lower_sword_red1 = np.array([0, 140, 160])
     upper_sword_red1 = np.array([10, 255, 255])
@@ -81,8 +128,7 @@ def detect_red_sword(roi):
     sword_kernel = np.ones((2,2), np.uint8)
     mask_sword = cv2.morphologyEx(mask_sword, cv2.MORPH_CLOSE, sword_kernel)
     mask_sword = cv2.morphologyEx(mask_sword, cv2.MORPH_OPEN, sword_kernel)
-    
-    return cv2.countNonZero(mask_sword)
+    return mask_sword
 
 
 def detect_hand(roi):
@@ -97,7 +143,19 @@ def detect_hand(roi):
     """
     # Convert to HSV
     hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+    return cv2.countNonZero(hand_mask(hsv))
+
+
+def hand_mask(hsv):
+    """
+    Build the cleaned skin tone mask used for the hand cursor.
     
+    Args:
+        hsv: Image in HSV format
+        
+    Returns:
+        np.ndarray: Binary mask (0/255)
+    """
     # Skin tone color ranges
     lower_hand1 = np.array([10, 30, 80])   # Orange tones
     upper_hand1 = np.array([25, 140, 220])
@@ -113,8 +171,7 @@ def detect_hand(roi):
     hand_kernel = np.ones((2,2), np.uint8)
     mask_hand = cv2.morphologyEx(mask_hand, cv2.MORPH_CLOSE, hand_kernel)
     mask_hand = cv2.morphologyEx(mask_hand, cv2.MORPH_OPEN, hand_kernel)
-    
-    return cv2.countNonZero(mask_hand)
+    return mask_hand
 
 
 def load_cursor_templates(templates_dir=None):
@@ -131,18 +188,12 @@ def load_cursor_templates(templates_dir=None):
     
     # Default templates directory if not provided
     if templates_dir is None:
-        # Try to resolve from current file location
+        # Templates ship inside the cursor_detection package
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        templates_dir = os.path.join(os.path.dirname(current_dir), "templates")
+        templates_dir = os.path.join(current_dir, "templates")
     
     if os.path.exists(templates_dir):
-        template_files = {
-            "RED_SWORD": "unfriendlyattack.png",
-            "PROHIBITED": "dead.png",
-            "HAND": "itempickup.png"
-        }
-        
-        for cursor_type, filename in template_files.items():
+        for cursor_type, filename in TEMPLATE_FILES.items():
             path = os.path.join(templates_dir, filename)
             if os.path.exists(path):
                 templates[cursor_type] = cv2.imread(path, cv2.IMREAD_UNCHANGED)
@@ -156,6 +207,72 @@ def load_cursor_templates(templates_dir=None):
     return templates
 
 
+def template_gray_and_mask(template):
+    """
+    Split a cursor template into a grayscale image and an optional mask.
+    
+    Args:
+        template: Template image, BGR or BGRA
+        
+    Returns:
+        tuple: (template_gray, template_mask) where the mask is the alpha
+            channel or None for templates without one
+    """
+    if template.shape[2] == 4:
+        return cv2.cvtColor(template[:,:,:3], cv2.COLOR_BGR2GRAY), template[:,:,3]
+    return cv2.cvtColor(template, cv2.COLOR_BGR2GRAY), None
+
+
+def detect_cursor_at_hotspot(image, cursor_x, cursor_y, templates, tolerance=2):
+    """
+    Detect the cursor by matching each template at its known position.
+    
+    The cursor sits at (cursor_x, cursor_y), so each template is compared
+    only against the patch where its hotspot puts it, shifted by up to
+    ``tolerance`` pixels, instead of sliding it over a whole ROI.
+    
+    Args:
+        image: Frame or ROI in BGR format
+        cursor_x: X coordinate of the mouse in the image
+        cursor_y: Y coordinate of the mouse in the image
+        templates: Dictionary of template images
+        tolerance: Maximum misalignment in pixels
+        
+    Returns:
+        tuple: (cursor type or "NONE", best score); the score is None when
+            no template fits inside the image at the cursor position
+    """
+    h, w = image.shape[:2]
+    best_match = "NONE"
+    best_score = None
+    
+    for cursor_type, template in templates.items():
+        if template is None:
+            continue
+        hx, hy = TEMPLATE_HOTSPOTS.get(cursor_type, (0, 0))
+        th, tw = template.shape[:2]
+        x1 = cursor_x - hx - tolerance
+        y1 = cursor_y - hy - tolerance
+        x2 = x1 + tw + 2 * tolerance
+        y2 = y1 + th + 2 * tolerance
+        if x1 < 0 or y1 < 0 or x2 > w or y2 > h:
+            continue
+        
+        template_gray, template_mask = template_gray_and_mask(template)
+        patch = cv2.cvtColor(image[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+        result = cv2.matchTemplate(patch, template_gray, cv2.TM_CCOEFF_NORMED, mask=template_mask)
+        result = np.nan_to_num(result, nan=-1.0, posinf=-1.0, neginf=-1.0)
+        
+        score = float(result.max())
+        if best_score is None or score > best_score:
+            best_score = score
+            best_match = cursor_type
+    
+    if best_score is None or best_score < TEMPLATE_MATCH_THRESHOLD:
+        return "NONE", best_score
+    return best_match, best_score
+
+
 def detect_cursor_by_template(roi, templates):
     """
     Detect cursor by template matching.
@@ -209,6 +326,9 @@ def detect_cursor_by_template(roi, templates):
             # Template matching
             result = cv2.matchTemplate(roi_gray, template_gray, cv2.TM_CCOEFF_NORMED)
         
+        # Flat patches give NaN/inf scores, never count them as matches
+        result = np.nan_to_num(result, nan=-1.0, posinf=-1.0, neginf=-1.0)
+        
         # Get best match
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
         
@@ -217,8 +337,7 @@ def detect_cursor_by_template(roi, templates):
             best_match = cursor_type
     
     # Add threshold for more confidence
-    threshold = 0.6
-    if best_score < threshold:
+    if best_score < TEMPLATE_MATCH_THRESHOLD:
         return "NONE"
         
     return best_match
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""Background writer for debug artifacts"""
+import os
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+
+class DebugWriter:
+    """
+    Write debug images on a background thread.
+
+    Artifacts are queued as (name, payload). The queue is bounded and
+    queueing never blocks: when the writer falls behind, new artifacts are
+    dropped and counted. Each kind can be sampled at its own rate, so e.g.
+    only every tenth mask set is written; callers check should_sample()
+    once per set and then queue all its artifacts.
+
+    Args:
+        folder: Output directory
+        sample_rates: Fraction of artifacts to keep per kind (default 1.0)
+        encoding: "png" or "npy" (raw arrays, no compression cost)
+        png_compression: cv2.IMWRITE_PNG_COMPRESSION level 0-9
+        max_queue: Maximum number of pending artifacts
+    """
+
+    def __init__(self, folder, sample_rates=None, encoding="png",
+                 png_compression=1, max_queue=64):
+        if encoding not in ("png", "npy"):
+            raise ValueError(f"Unknown debug encoding: {encoding}")
+        self.folder = folder
+        self.sample_rates = dict(sample_rates or {})
+        self.encoding = encoding
+        self.png_compression = png_compression
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        self._credit = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def should_sample(self, kind):
+        """
+        Decide whether the next artifact of a kind is kept.
+
+        Sampling is deterministic: a rate of 0.25 keeps every fourth one.
+        """
+        rate = self.sample_rates.get(kind, 1.0)
+        if rate >= 1.0:
+            return True
+        with self._lock:
+            credit = self._credit.get(kind, 0.0) + rate
+            keep = credit >= 1.0
+            self._credit[kind] = credit - 1.0 if keep else credit
+        return keep
+
+    def queue_artifact(self, name, payload):
+        """
+        Queue an artifact without sampling or blocking.
+
+        Args:
+            name: File name without extension
+            payload: Image array, text, or a callable returning either that
+                runs on the writer thread (for expensive rendering)
+
+        Returns:
+            bool: True if the artifact was queued, False if it was dropped
+        """
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait((name, payload))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    os.makedirs(self.folder, exist_ok=True)
+                    self._thread = threading.Thread(target=self._run, name="DebugWriter", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            name, payload = self.queue.get()
+            try:
+                if callable(payload):
+                    payload = payload()
+                self._write(name, payload)
+                self.written += 1
+            except Exception as e:
+                print(f"Debug writer error for {name}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write(self, name, image):
+        path = os.path.join(self.folder, name)
+        if isinstance(image, str):
+            with open(path + ".txt", "w") as f:
+                f.write(image)
+        elif self.encoding == "npy":
+            np.save(path + ".npy", image)
+        else:
+            cv2.imwrite(path + ".png", image, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression])
+
+    def flush(self):
+        """Block until every queued artifact has been written"""
+        if self._thread is not None:
+            self.queue.join()
@@ -2,9 +2,11 @@
 
 from .detector import BaseDetector, DetectionResult
 from .yolo_detector import YOLODetector
+from .ground_truth_detector import GroundTruthDetector
 
 __all__ = [
     "BaseDetector",
     "DetectionResult",
     "YOLODetector",
+    "GroundTruthDetector",
 ]
\ No newline at end of file
@@ -2,11 +2,13 @@
 from abc import ABC, abstractmethod
 
 class DetectionResult:
-    def __init__(self, class_name: str, cx: int, cy: int, score: float):
+    def __init__(self, class_name: str, cx: int, cy: int, score: float, captured_at: float = None):
         self.class_name = class_name
         self.cx = cx
         self.cy = cy
         self.score = score
+        # Время захвата кадра (clock.now() бота), проставляется при восприятии
+        self.captured_at = captured_at
 
 class BaseDetector(ABC):
     @abstractmethod
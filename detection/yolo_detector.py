@@ -1,13 +1,21 @@
 # detection/yolo_detector.py
 import numpy as np
-from ultralytics import YOLO
 from .detector import BaseDetector, DetectionResult
 
 class YOLODetector(BaseDetector):
     def __init__(self, weights_path: str, class_names: list[str]):
+        # ultralytics pulls in torch, import it only when a model is built
+        from ultralytics import YOLO
         self.model = YOLO(weights_path)
         self.class_names = class_names
 
+    def warmup(self, shape: tuple[int, int, int] = (640, 640, 3)) -> None:
+        """
+        Прогоняет модель на пустом кадре, чтобы первый реальный кадр
+        не платил за инициализацию
+        """
+        self.model(np.zeros(shape, dtype=np.uint8), verbose=False)
+
     def detect(self, frame: np.ndarray) -> list[DetectionResult]:
         results = self.model(frame)[0]
         dets = []
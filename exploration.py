@@ -0,0 +1,207 @@
+"""Spawn-density memory: steer exploration towards where targets appeared"""
+import math
+
+import numpy as np
+
+from flight_recorder import recorder
+
+EV_HEADING_DRIFT = recorder.register("heading_drift", ("expected", "measured", "pixels_per_degree"))
+
+
+class HeadingHistogram:
+    """
+    Decaying histogram of target sightings over camera heading.
+
+    Counts live in one float array of ``bins`` cells covering 360 degrees.
+    Decay is applied lazily with the elapsed time, so old spawns fade out
+    with a half-life instead of pinning the bot to an emptied area.
+
+    Args:
+        bins: Number of heading cells
+        half_life: Seconds after which a sighting counts half
+    """
+
+    def __init__(self, bins=36, half_life=300.0):
+        self.bins = bins
+        self.half_life = half_life
+        self.counts = np.zeros(bins, dtype=np.float32)
+        self.updated = None
+
+    def _decay(self, now):
+        if self.updated is not None and now > self.updated:
+            self.counts *= 0.5 ** ((now - self.updated) / self.half_life)
+        self.updated = now
+
+    def add(self, heading, now, weight=1.0):
+        self._decay(now)
+        self.counts[int(heading % 360.0 / 360.0 * self.bins) % self.bins] += weight
+
+    def density(self, now):
+        """Counts smoothed over neighbouring cells (circular)"""
+        self._decay(now)
+        c = self.counts
+        return 0.5 * c + 0.25 * (np.roll(c, 1) + np.roll(c, -1))
+
+    def densest(self, now):
+        """
+        Returns:
+            tuple: (heading in degrees at the cell center, density), or None
+                when nothing has been seen
+        """
+        density = self.density(now)
+        best = int(np.argmax(density))
+        if density[best] <= 0:
+            return None
+        return (best + 0.5) * 360.0 / self.bins, float(density[best])
+
+
+class Explorer:
+    """
+    Track the camera heading and pick exploration turns.
+
+    The game does not report the heading, so it is dead-reckoned from the
+    camera drags the bot sends. Between begin_turn() and end_turn() the
+    picture shift measured on every frame is summed as well; at the end the
+    heading is corrected to the measured turn and ``pixels_per_degree`` is
+    recalibrated from it, so the dead reckoning does not drift over a
+    session. Targets are logged once, at their own heading (camera heading
+    plus their angle in the view), and exploration turns towards the
+    densest heading unless the memory there has faded below
+    ``min_density``.
+
+    Args:
+        pixels_per_degree: Initial mouse pixels per degree of camera turn
+        fov: Horizontal field of view in degrees
+        bins: Heading histogram cells
+        half_life: Seconds after which a sighting counts half
+        min_density: Density below which the memory is ignored
+        min_turn: Turns smaller than this many degrees are not measured
+        calibration_gain: Weight of each measured turn in pixels_per_degree
+        match_degrees: A detection within this many degrees of a recent
+            sighting is the same target
+        seen_timeout: Seconds after which an unmatched sighting is forgotten
+    """
+
+    def __init__(self, pixels_per_degree, fov=90.0, bins=36, half_life=300.0, min_density=0.5,
+                 min_turn=5.0, calibration_gain=0.3, match_degrees=4.0, seen_timeout=5.0):
+        self.pixels_per_degree = pixels_per_degree
+        self.fov = fov
+        self.min_density = min_density
+        self.min_turn = min_turn
+        self.calibration_gain = calibration_gain
+        self.match_degrees = match_degrees
+        self.seen_timeout = seen_timeout
+        self.histogram = HeadingHistogram(bins, half_life)
+        self.heading = 0.0
+        # [mouse pixels sent, degrees measured, frames measured, no frame failed]
+        self._turn = None
+        # (heading, last seen) of recently observed targets
+        self._seen = []
+
+    @property
+    def turning(self):
+        return self._turn is not None
+
+    def rotated(self, dx):
+        """Account for a camera drag of dx mouse pixels"""
+        self.heading = (self.heading + dx / self.pixels_per_degree) % 360.0
+        if self._turn is not None:
+            self._turn[0] += dx
+
+    def begin_turn(self):
+        """Start measuring the camera turn from the frames"""
+        self._turn = [0.0, 0.0, 0, True]
+
+    def camera_moved(self, dx, width):
+        """
+        Feed the horizontal picture shift between two frames during a turn.
+
+        Args:
+            dx: Shift in frame pixels, positive when the picture moved right,
+                or None when it could not be measured
+            width: Frame width
+        """
+        if self._turn is None:
+            return
+        if dx is None:
+            self._turn[3] = False
+            return
+        # The picture moves left when the camera turns right
+        focal = width / 2 / math.tan(math.radians(self.fov / 2))
+        self._turn[1] -= math.degrees(math.atan(dx / focal))
+        self._turn[2] += 1
+
+    def end_turn(self):
+        """
+        Correct the heading to the measured turn.
+
+        Returns:
+            float: Measured minus dead-reckoned turn in degrees, or None when
+                the turn was too small, no frame was perceived or a frame
+                could not be measured
+        """
+        turn, self._turn = self._turn, None
+        if turn is None:
+            return None
+        sent, measured, frames, complete = turn
+        expected = sent / self.pixels_per_degree
+        if not frames or not complete or abs(expected) < self.min_turn:
+            return None
+        drift = measured - expected
+        self.heading = (self.heading + drift) % 360.0
+        # A turn measured the wrong way is a bad estimate, not a calibration
+        if measured * sent > 0:
+            self.pixels_per_degree += self.calibration_gain * (sent / measured - self.pixels_per_degree)
+        recorder.record(EV_HEADING_DRIFT, expected, measured, self.pixels_per_degree)
+        return drift
+
+    def target_heading(self, cx, width):
+        return self.heading + (cx / width - 0.5) * self.fov
+
+    def observe(self, dets, width, now):
+        """
+        Log the heading of the detections not seen recently.
+
+        Returns:
+            int: Number of newly logged targets
+        """
+        seen = [s for s in self._seen if now - s[1] < self.seen_timeout]
+        new = 0
+        for d in dets:
+            heading = self.target_heading(d.cx, width)
+            for i, (h, _) in enumerate(seen):
+                if abs((heading - h + 180.0) % 360.0 - 180.0) <= self.match_degrees:
+                    seen[i] = (heading, now)
+                    break
+            else:
+                seen.append((heading, now))
+                self.histogram.add(heading, now)
+                new += 1
+        self._seen = seen
+        return new
+
+    def searched(self, now, factor=0.5):
+        """Nothing is in view: weaken the memory of the headings on screen"""
+        histogram = self.histogram
+        histogram._decay(now)
+        centers = (np.arange(histogram.bins) + 0.5) * 360.0 / histogram.bins
+        offset = np.abs((centers - self.heading + 180.0) % 360.0 - 180.0)
+        histogram.counts[offset <= self.fov / 2] *= factor
+
+    def suggest_turn(self, now):
+        """
+        Turn towards the densest remembered heading.
+
+        Returns:
+            float: Signed turn in degrees (positive = right), or None when
+                the memory is too weak or the camera already faces it
+        """
+        densest = self.histogram.densest(now)
+        if densest is None or densest[1] < self.min_density:
+            return None
+        turn = (densest[0] - self.heading + 180.0) % 360.0 - 180.0
+        # Already in view, and nothing is there: sweep instead
+        if abs(turn) < self.fov / 2:
+            return None
+        return turn
+
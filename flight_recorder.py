@@ -0,0 +1,153 @@
+"""In-memory flight recorder for bot diagnostics"""
+import itertools
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Default location for dumps, relative to the working directory
+DUMP_FOLDER = "flight_records"
+
+
+class FlightRecorder:
+    """
+    Fixed-size ring buffer of structured events.
+
+    All storage is preallocated: an event is an id, a timestamp and a few
+    numeric fields written into numpy arrays, so recording costs no string
+    formatting, allocation or I/O. The newest ``capacity`` events are kept
+    and written out as text only when dump() is called.
+
+    Args:
+        capacity: Number of events kept
+        num_fields: Numeric fields per event
+    """
+
+    def __init__(self, capacity=8192, num_fields=5):
+        self.capacity = capacity
+        self.num_fields = num_fields
+        self.seqs = np.full(capacity, -1, dtype=np.int64)
+        self.events = np.zeros(capacity, dtype=np.int16)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((capacity, num_fields), dtype=np.float64)
+        self._counter = itertools.count()
+        self._names = []
+        self._fields = []
+        self._codes = {}
+        self._dump_lock = threading.Lock()
+        # Map perf_counter timestamps back to wall-clock time in dumps
+        self._wall_offset = time.time() - time.perf_counter()
+
+    def register(self, name, fields=()):
+        """
+        Register an event type.
+
+        Args:
+            name: Event name shown in dumps
+            fields: Names of the numeric fields, in record() order
+
+        Returns:
+            int: Event id to pass to record()
+        """
+        if len(fields) > self.num_fields:
+            raise ValueError(f"Event {name} has more than {self.num_fields} fields")
+        self._names.append(name)
+        self._fields.append(tuple(fields))
+        return len(self._names) - 1
+
+    def register_codes(self, field, labels):
+        """Decode a numeric field into labels in dumps, e.g. cursor states"""
+        self._codes[field] = tuple(labels)
+
+    def record(self, event, *values):
+        """Record an event; values are numbers matching the registered fields"""
+        # next() on itertools.count is atomic under the GIL
+        seq = next(self._counter)
+        i = seq % self.capacity
+        self.seqs[i] = -1
+        self.events[i] = event
+        self.times[i] = time.perf_counter()
+        row = self.values[i]
+        n = len(values)
+        row[:n] = values
+        row[n:] = 0.0
+        self.seqs[i] = seq
+
+    def snapshot(self):
+        """
+        Return the recorded events in chronological order.
+
+        Returns:
+            list: (timestamp, event name, {field: value}) tuples
+        """
+        valid = np.flatnonzero(self.seqs >= 0)
+        order = valid[np.argsort(self.seqs[valid])]
+        records = []
+        for i in order:
+            event = int(self.events[i])
+            fields = self._fields[event]
+            values = {}
+            for name, value in zip(fields, self.values[i]):
+                labels = self._codes.get(name)
+                if labels is not None and 0 <= value < len(labels):
+                    values[name] = labels[int(value)]
+                else:
+                    values[name] = float(value)
+            records.append((float(self.times[i]) + self._wall_offset, self._names[event], values))
+        return records
+
+    def dump(self, reason="manual", folder=None):
+        """
+        Write the buffer to a text file.
+
+        Returns:
+            str: Path of the written file
+        """
+        folder = folder or DUMP_FOLDER
+        with self._dump_lock:
+            records = self.snapshot()
+            os.makedirs(folder, exist_ok=True)
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(folder, f"flight_{stamp}_{reason}.log")
+            with open(path, "w") as f:
+                f.write(f"# reason: {reason}, events: {len(records)}\n")
+                for t, name, values in records:
+                    ms = int((t % 1) * 1000)
+                    fields = " ".join(
+                        f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}"
+                        for k, v in values.items()
+                    )
+                    f.write(f"{time.strftime('%H:%M:%S', time.localtime(t))}.{ms:03d} {name} {fields}\n")
+        return path
+
+
+# Process-wide recorder
+recorder = FlightRecorder()
+EV_EXCEPTION = recorder.register("exception")
+
+
+def install_excepthook():
+    """Dump the recorder when any thread dies with an unhandled exception"""
+    previous_thread_hook = threading.excepthook
+    previous_hook = sys.excepthook
+
+    def save():
+        recorder.record(EV_EXCEPTION)
+        print(f"Flight record saved: {recorder.dump('exception')}")
+
+    def thread_hook(args):
+        try:
+            save()
+        finally:
+            previous_thread_hook(args)
+
+    def hook(exc_type, exc, tb):
+        try:
+            save()
+        finally:
+            previous_hook(exc_type, exc, tb)
+
+    threading.excepthook = thread_hook
+    sys.excepthook = hook
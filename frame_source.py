@@ -0,0 +1,183 @@
+"""Frame sources for the bot loop: live screen capture or recorded frames"""
+import os
+
+import numpy as np
+
+# Extensions read as single images from a recording directory
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class ScreenFrameSource:
+    """
+    Capture frames of a screen region with mss.
+
+    mss handles are bound to the thread that opened them, so the source is
+    opened with ``with`` on the thread that grabs.
+    """
+
+    def __init__(self, bbox):
+        self.bbox = bbox
+        self.sct = None
+
+    @classmethod
+    def from_window(cls, window):
+        return cls({
+            'left': window.left,
+            'top': window.top,
+            'width': window.width,
+            'height': window.height
+        })
+
+    def __enter__(self):
+        from mss import mss
+        self.sct = mss()
+        return self
+
+    def fork(self):
+        """Independent source of the same region, to be opened on another thread"""
+        return ScreenFrameSource(dict(self.bbox))
+
+    def __exit__(self, *exc):
+        self.sct.close()
+        self.sct = None
+
+    def grab(self):
+        """Return the current frame as an RGB array"""
+        from PIL import Image
+        img = self.sct.grab(self.bbox)
+        return np.array(Image.frombytes('RGB', (img.width, img.height), img.rgb))
+
+
+class RecordedFrameSource:
+    """
+    Replay recorded frames as if they were captured live.
+
+    Args:
+        path: Directory of images, a video file, or a .npy array of shape
+            (N, H, W, 3) in RGB order
+        loop: Restart from the first frame after the last one
+    """
+
+    def __init__(self, path, loop=True):
+        self.path = path
+        self.loop = loop
+        self.frames = None
+        self.index = 0
+        self.bbox = None
+
+    def __enter__(self):
+        if self.frames is None:
+            # Decode everything up front so decoding does not count as capture time
+            self.frames = self._load(self.path)
+            if not self.frames:
+                raise ValueError(f"No frames found in {self.path}")
+            h, w = self.frames[0].shape[:2]
+            self.bbox = {'left': 0, 'top': 0, 'width': w, 'height': h}
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    @staticmethod
+    def _load(path):
+        import cv2
+        if os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTENSIONS))
+            frames = [cv2.imread(os.path.join(path, n), cv2.IMREAD_COLOR) for n in names]
+            return [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames if f is not None]
+        if path.endswith('.npy'):
+            return list(np.load(path))
+
+        frames = []
+        capture = cv2.VideoCapture(path)
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        capture.release()
+        return frames
+
+    def grab(self):
+        """Return the next recorded frame as an RGB array"""
+        if self.index >= len(self.frames):
+            if not self.loop:
+                raise EOFError("Recorded frames exhausted")
+            self.index = 0
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+
+class SyntheticFrameSource:
+    """
+    Procedural frames with moving targets, for soak tests without a game.
+
+    Targets are dark blobs drifting over a textured background. Each one
+    lives for a few seconds of frames and then respawns elsewhere, so the
+    bot keeps acquiring, losing and re-acquiring targets. Every grab()
+    renders a new frame, as a live capture would.
+
+    Args:
+        width: Frame width
+        height: Frame height
+        targets: Number of targets on screen
+        lifetime: Frames a target lives before respawning
+        speed: Maximum target speed in pixels per frame
+        seed: Random seed, for reproducible runs
+    """
+
+    def __init__(self, width=1280, height=720, targets=2, lifetime=150, speed=3.0, seed=0):
+        self.width = width
+        self.height = height
+        self.num_targets = targets
+        self.lifetime = lifetime
+        self.speed = speed
+        self.rng = np.random.default_rng(seed)
+        self.bbox = {'left': 0, 'top': 0, 'width': width, 'height': height}
+        self.background = None
+        self.targets = []
+        self.frame_index = 0
+
+    def __enter__(self):
+        if self.background is None:
+            import cv2
+            noise = self.rng.integers(0, 255, (self.height // 8, self.width // 8, 3), dtype=np.uint8)
+            texture = cv2.resize(noise, (self.width, self.height), interpolation=cv2.INTER_LINEAR)
+            ramp = np.linspace(0.6, 1.0, self.height, dtype=np.float32)[:, None, None]
+            self.background = (texture * ramp * 0.5 + 90).astype(np.uint8)
+            self.targets = [self._spawn() for _ in range(self.num_targets)]
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def _spawn(self):
+        """New target as [x, y, vx, vy, frames left]"""
+        return [
+            self.rng.uniform(50, self.width - 50),
+            self.rng.uniform(self.height / 3, self.height - 50),
+            self.rng.uniform(-self.speed, self.speed),
+            self.rng.uniform(-self.speed, self.speed),
+            int(self.rng.integers(self.lifetime // 2, self.lifetime + 1))
+        ]
+
+    def positions(self):
+        """Integer (x, y) centers of the targets in the last grabbed frame"""
+        return [(int(t[0]), int(t[1])) for t in self.targets]
+
+    def grab(self):
+        """Render the next frame as an RGB array"""
+        import cv2
+        for i, t in enumerate(self.targets):
+            t[0] = min(max(t[0] + t[2], 20), self.width - 20)
+            t[1] = min(max(t[1] + t[3], 20), self.height - 20)
+            t[4] -= 1
+            if t[4] <= 0:
+                self.targets[i] = self._spawn()
+
+        frame = self.background.copy()
+        for x, y in self.positions():
+            cv2.ellipse(frame, (x, y), (24, 14), 0, 0, 360, (70, 45, 30), -1)
+        self.frame_index += 1
+        return frame
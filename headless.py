@@ -0,0 +1,215 @@
+"""Headless runner: run the bot loop without a GUI, optionally as a benchmark"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import utils
+from frame_source import RecordedFrameSource
+
+
+class NullInput:
+    """
+    Input sink that performs no input and records when actions happen.
+
+    Implements the input_controller functions used by BotThread. Each
+    click, press or relative move records ``decision_age()``, the time since
+    the frame the decision was based on was captured.
+
+    Args:
+        decision_age: Callable returning that time in seconds, or None when
+            the input does not react to a frame; None skips latency tracking
+    """
+
+    def __init__(self, decision_age=None):
+        self.decision_age = decision_age
+        self.actions = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def _action(self):
+        with self._lock:
+            self.actions += 1
+            if self.decision_age is not None:
+                age = self.decision_age()
+                if age is not None:
+                    self.latencies.append(age)
+
+    def drain_latencies(self):
+        """Return the latencies recorded so far and start a new list"""
+        with self._lock:
+            latencies, self.latencies = self.latencies, []
+        return latencies
+
+    def smooth_move(self, tx, ty, steps=5, delay=0.002):
+        pass
+
+    def move_mouse(self, x, y):
+        pass
+
+    def move_mouse_rel(self, dx, dy):
+        self._action()
+
+    def click_mouse(self, button):
+        self._action()
+
+    def press_mouse(self, btn):
+        self._action()
+
+    def release_mouse(self, btn):
+        pass
+
+    def press_key(self, vk):
+        self._action()
+
+    def release_key(self, vk):
+        pass
+
+
+def resource_usage():
+    """
+    Return process CPU time and resident memory.
+
+    psutil is used when installed; otherwise RSS falls back to the peak
+    value from the resource module where available.
+
+    Returns:
+        tuple: (cpu_seconds, rss_bytes or None)
+    """
+    cpu = time.process_time()
+    try:
+        import psutil
+        return cpu, psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        import resource
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return cpu, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    except ImportError:
+        return cpu, None
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list, or None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def run_bench(bot, sink):
+    """
+    Run a BotThread to completion and measure it.
+
+    Returns:
+        dict: Loop FPS, detection-to-action latency, aim error and resource usage
+    """
+    cpu_start, _ = resource_usage()
+    start = time.perf_counter()
+    bot.start()
+    bot.join()
+    elapsed = time.perf_counter() - start
+    cpu_end, rss = resource_usage()
+    aim = bot.target_track.error_stats() or {}
+
+    return {
+        'frames': bot.frame_count,
+        'seconds': elapsed,
+        'fps': bot.frame_count / elapsed if elapsed > 0 else 0.0,
+        'actions': sink.actions,
+        'time_to_target_s': percentile(list(bot.fsm.search_times), 50),
+        'cursor_cache_hit_rate': bot.cursor_cache.hit_rate,
+        'aim_error_p50_px': aim.get('aim_error_p50_px'),
+        'aim_error_p95_px': aim.get('aim_error_p95_px'),
+        'naive_error_p50_px': aim.get('naive_error_p50_px'),
+        'naive_error_p95_px': aim.get('naive_error_p95_px'),
+        'latency_p50_ms': _ms(percentile(sink.latencies, 50)),
+        'latency_p95_ms': _ms(percentile(sink.latencies, 95)),
+        'cpu_percent': 100.0 * (cpu_end - cpu_start) / elapsed if elapsed > 0 else 0.0,
+        'rss_mb': rss / (1024 * 1024) if rss is not None else None,
+    }
+
+
+def _ms(seconds):
+    return seconds * 1000 if seconds is not None else None
+
+
+def format_report(stats):
+    """Format benchmark stats as aligned text"""
+    lines = ["Benchmark:"]
+    width = max(map(len, stats), default=0)
+    for key, value in stats.items():
+        if value is None:
+            value = 'n/a'
+        elif isinstance(value, float):
+            value = f"{value:.2f}"
+        lines.append(f"  {key:<{width}} {value}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    cfg = utils.CFG.get('headless') or {}
+    parser = argparse.ArgumentParser(description="Run the game bot without a GUI")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--window', default=cfg.get('window_title'),
+                        help="Title of the game window to capture")
+    source.add_argument('--frames', default=cfg.get('frames'),
+                        help="Recorded frames: image folder, video file or .npy")
+    parser.add_argument('--bench', nargs='?', type=int, const=cfg.get('bench_frames', 300),
+                        metavar='N', help="Run N frames with a null input sink and report throughput")
+    parser.add_argument('--weights', default=None, help="Model weights, defaults to config.yaml")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.window and not args.frames:
+        sys.exit("Give --window or --frames (or set headless.window_title / headless.frames in config.yaml)")
+
+    from detection.yolo_detector import YOLODetector
+    from bot_thread import BotThread
+
+    detector = YOLODetector(args.weights or utils.weights_path, utils.class_names)
+
+    window = None
+    frame_source = None
+    if args.frames:
+        if not os.path.exists(args.frames):
+            sys.exit(f"Recording not found: {args.frames}")
+        frame_source = RecordedFrameSource(args.frames)
+        with frame_source:
+            h, w = frame_source.bbox['height'], frame_source.bbox['width']
+    else:
+        import pygetwindow as gw
+        matches = gw.getWindowsWithTitle(args.window)
+        if not matches:
+            sys.exit(f"Window not found: {args.window}")
+        window = matches[0]
+        h, w = window.height, window.width
+
+    # Warm up so the first measured frame does not include model setup
+    detector.warmup((h, w, 3))
+
+    if args.bench:
+        sink = NullInput(lambda: bot.fsm.decision_age())
+        bot = BotThread(window, detector, frame_source=frame_source, inputs=sink, max_frames=args.bench)
+        print(format_report(run_bench(bot, sink)))
+        return
+
+    # Replayed frames have no game to send input to
+    inputs = NullInput() if frame_source is not None else None
+    bot = BotThread(window, detector, frame_source=frame_source, inputs=inputs)
+    bot.start()
+    try:
+        while bot.is_alive():
+            bot.join(0.5)
+    except KeyboardInterrupt:
+        bot.stop()
+        bot.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,15 @@
 """Main GUI application"""
+import startup_profile
+import threading
 import tkinter as tk
 from pynput import keyboard
 
-from bot_thread import BotThread
-from utils import choose_window, weights_path, class_names
-from detection.yolo_detector import YOLODetector
+import utils
+from utils import choose_window
+from flight_recorder import recorder, install_excepthook
+from sampling_profiler import SamplingProfiler
+
+startup_profile.mark("core imports")
 
 
 class GameBotApp:
@@ -12,12 +17,13 @@ class GameBotApp:
         self.window = window
         self.root = root
         self.bot = None
+        self.profiler = SamplingProfiler(utils.PROFILER_RATE, output_format=utils.PROFILER_FORMAT)
         
-        # Initialize detector
-        self.detector = YOLODetector(weights_path, class_names)
+        # Detector is loaded in the background so the window appears at once
+        self.detector = None
         
         # Setup GUI
-        root.geometry('300x200')
+        root.geometry('300x240')
         root.configure(bg='#1e1e1e')
         root.title('Game Bot')
         
@@ -30,14 +36,59 @@ class GameBotApp:
         tk.Button(root, text='⏹ Stop', width=20, command=self.stop, 
                  bg='#dc3545', fg='white').pack(pady=5)
                  
-        self.status = tk.Label(root, text='⏳ Idle', bg='#1e1e1e', fg='gray')
+        self.profile_button = tk.Button(root, text='⏺ Profile', width=20, command=self.toggle_profiler, 
+                                        bg='#6c757d', fg='white')
+        self.profile_button.pack(pady=5)
+                 
+        self.status = tk.Label(root, text='⏳ Loading...', bg='#1e1e1e', fg='gray')
         self.status.pack(pady=10)
         
         # Start keyboard listener for hotkeys
         keyboard.Listener(on_press=self.handle_hotkey).start()
+        
+        threading.Thread(target=self.load_detector, name='ModelLoader', daemon=True).start()
+        startup_profile.mark("GUI built")
+        root.after_idle(startup_profile.mark, "GUI interactive")
+
+    def set_status(self, text, fg='gray'):
+        """Update the status label from any thread"""
+        self.root.after(0, lambda: self.status.config(text=text, fg=fg))
+
+    def load_detector(self):
+        """Import heavy modules, load the model and warm it up off the GUI thread"""
+        try:
+            self.set_status('⏳ Loading model...')
+            from detection.yolo_detector import YOLODetector
+            startup_profile.mark("detector imports")
+            
+            detector = YOLODetector(utils.weights_path, utils.class_names)
+            startup_profile.mark("model loaded")
+            
+            self.set_status('⏳ Warming up...')
+            detector.warmup((self.window.height, self.window.width, 3))
+            startup_profile.mark("model warm-up")
+            
+            # Import the bot thread too, so Start does not pay for cv2/mss
+            import bot_thread
+            from cursor_detection import load_templates
+            load_templates()
+            startup_profile.mark("bot modules and templates")
+            
+            self.detector = detector
+            self.set_status('⏳ Idle')
+        except Exception as e:
+            print(f"Model loading error: {e}")
+            self.set_status('❌ Model error', fg='red')
+        finally:
+            if utils.DEBUG:
+                print(startup_profile.report())
 
     def start(self):
         """Start the bot thread"""
+        if self.detector is None:
+            self.status.config(text='⏳ Model is still loading', fg='gray')
+            return
+        from bot_thread import BotThread
         if not self.bot or not self.bot.is_alive():
             self.bot = BotThread(self.window, self.detector)
             self.bot.start()
@@ -49,20 +100,36 @@ class GameBotApp:
             self.bot.stop()
         self.status.config(text='🔴 Stopped', fg='red')
 
+    def toggle_profiler(self):
+        """Start or stop the sampling profiler"""
+        path = self.profiler.toggle()
+        if self.profiler.running:
+            self.root.after(0, lambda: self.profile_button.config(text='⏹ Stop profiling', bg='#fd7e14'))
+        else:
+            self.root.after(0, lambda: self.profile_button.config(text='⏺ Profile', bg='#6c757d'))
+            if path:
+                print(f"Profile saved: {path}")
+
     def handle_hotkey(self, key):
-        """Handle keyboard hotkeys (Home=start, End=stop)"""
+        """Handle keyboard hotkeys (Home=start, End=stop, F8=dump flight record, F9=profiler)"""
         try:
             if key == keyboard.Key.home:
                 self.start()
             elif key == keyboard.Key.end:
                 self.stop()
+            elif key == keyboard.Key.f8:
+                print(f"Flight record saved: {recorder.dump('hotkey')}")
+            elif key == keyboard.Key.f9:
+                self.toggle_profiler()
         except Exception as e:
             print(f"Hotkey error: {e}")
 
 
 if __name__ == '__main__':
     # Choose window and start application
+    install_excepthook()
     window = choose_window()
+    startup_profile.mark("window chosen")
     root = tk.Tk()
     app = GameBotApp(root, window)
     root.mainloop()
\ No newline at end of file
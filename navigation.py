@@ -0,0 +1,123 @@
+"""Free-space navigation map for exploration"""
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Steering decision: angle in degrees (negative = left), confidence 0-1 and
+# the score of every sector
+Steering = namedtuple("Steering", ["angle", "confidence", "scores"])
+
+
+class Navigator:
+    """
+    Score walkable directions from the lower half of a frame.
+
+    The ground in front of the character is the lower half of the frame.
+    Every call subsamples it once, builds integral images of brightness and
+    edge strength, and reads the mean of every (sector, depth) cell in O(1).
+    Sectors fan out from the bottom center of the frame; depths run from
+    near the character towards the horizon. Dark or cluttered cells count
+    as obstacles, and near cells weigh most because they block first.
+
+    Args:
+        threshold: Brightness below which a cell is treated as an obstacle
+            (the former obstacle_threshold)
+        fov: Angular range covered by the sectors, in degrees. Use the
+            camera's horizontal field of view, so a sector angle is the
+            camera turn that faces it
+        sectors: Number of angular sectors
+        depths: Cell distances as fractions of the lower half height
+        depth_weights: Weight of each depth in the sector score
+        stride: Subsampling step of the frame in pixels
+        edge_weight: Penalty for edge strength (walls, fences, foliage)
+        edge_scale: Mean brightness step between neighbouring samples that
+            counts as fully cluttered
+        cell_height: Half height of a cell as a fraction of the lower half
+        turn_cost: Score penalty per degree of turn, so ties go straight
+    """
+
+    def __init__(self, threshold, fov=90.0, sectors=9, depths=(0.2, 0.45, 0.75),
+                 depth_weights=(0.5, 0.3, 0.2), stride=16, edge_weight=0.5, edge_scale=64.0,
+                 cell_height=0.08, turn_cost=0.002):
+        self.threshold = float(threshold)
+        self.angles = np.linspace(-fov / 2, fov / 2, sectors)
+        self.sector_width = np.radians(fov / sectors)
+        self.depths = np.asarray(depths, dtype=np.float64)
+        self.depth_weights = np.asarray(depth_weights, dtype=np.float64)
+        self.stride = stride
+        self.edge_weight = edge_weight
+        self.edge_scale = edge_scale
+        self.cell_height = cell_height
+        self.turn_cost = turn_cost
+        self._boxes = None
+        self._boxes_shape = None
+
+    def _cell_boxes(self, h, w):
+        """Flat integral image indices of all cell corners, cached per image size"""
+        if self._boxes_shape == (h, w):
+            return self._boxes
+        theta = np.radians(self.angles)[:, None]
+        reach = self.depths[None, :] * h
+        cx = w / 2 + np.sin(theta) * reach
+        cy = h - np.cos(theta) * reach
+        # Cells widen with distance to cover the whole sector
+        half_w = np.maximum(1.0, reach * np.tan(self.sector_width / 2))
+        half_h = np.maximum(1.0, h * self.cell_height)
+
+        x1 = np.clip(np.round(cx - half_w), 0, w - 1).astype(np.intp)
+        x2 = np.clip(np.round(cx + half_w), x1 + 1, w).astype(np.intp)
+        y1 = np.clip(np.round(cy - half_h), 0, h - 1).astype(np.intp)
+        y2 = np.clip(np.round(cy + half_h), y1 + 1, h).astype(np.intp)
+        area = ((x2 - x1) * (y2 - y1)).astype(np.float64)
+
+        # Corners in the order they enter the box sum: + - - +
+        stride = w + 1
+        corners = np.stack([y2 * stride + x2, y1 * stride + x2, y2 * stride + x1, y1 * stride + x1])
+        self._boxes = (corners.reshape(4, -1), area)
+        self._boxes_shape = (h, w)
+        return self._boxes
+
+    @staticmethod
+    def _cell_means(integral, boxes):
+        """Mean of every channel in every cell, shape (sectors, depths, channels)"""
+        corners, area = boxes
+        v = integral.reshape(-1, integral.shape[-1])[corners]
+        total = (v[0] - v[1] - v[2] + v[3]).reshape(area.shape + (-1,))
+        return total / area[..., None]
+
+    def steer(self, frame):
+        """
+        Pick the most walkable direction.
+
+        Args:
+            frame: Current frame (RGB), the same buffer used for detection
+
+        Returns:
+            Steering: angle, confidence (fraction of the chosen sector that
+                is bright enough to walk on) and per-sector scores; None for
+                frames too small to judge
+        """
+        h = frame.shape[0]
+        if h < 4 * self.stride or frame.shape[1] < 2 * self.stride:
+            return None
+
+        # Subsample the ground half straight from the frame buffer; green
+        # carries most of the luminance, so no color conversion is needed
+        ground = frame[h // 2::self.stride, ::self.stride]
+        gray = np.ascontiguousarray(ground[..., 1] if ground.ndim == 3 else ground)
+        edges = cv2.absdiff(gray[:, 1:], gray[:, :-1])
+        edges = cv2.copyMakeBorder(edges, 0, 0, 0, 1, cv2.BORDER_REPLICATE)
+
+        # One two-channel integral image serves both maps
+        means = self._cell_means(cv2.integral(cv2.merge((gray, edges))), self._cell_boxes(*gray.shape))
+        brightness, clutter = means[..., 0], means[..., 1]
+
+        # Positive for walkable cells, negative for dark or cluttered ones
+        cells = np.clip((brightness - self.threshold) / max(self.threshold, 1.0), -1.0, 1.0)
+        cells -= self.edge_weight * clutter / self.edge_scale
+        scores = cells @ self.depth_weights - self.turn_cost * np.abs(self.angles)
+
+        best = int(np.argmax(scores))
+        confidence = float(np.count_nonzero(brightness[best] >= self.threshold)) / len(self.depths)
+        return Steering(float(self.angles[best]), confidence, scores)
@@ -0,0 +1,148 @@
+"""On-demand sampling profiler for the bot threads"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Default location for profiles, relative to the working directory
+PROFILE_FOLDER = "profiles"
+
+# Threads sampled by default, matched by name prefix
+DEFAULT_THREADS = ("BotThread", "CursorTracking", "CursorCapture", "Capture", "Inference", "ModelLoader")
+
+
+class SamplingProfiler:
+    """
+    Periodically sample the Python stacks of selected threads.
+
+    A daemon thread reads sys._current_frames() at a fixed rate, so the
+    profiled threads are never instrumented or paused. Identical stacks are
+    aggregated while sampling and written out when the session stops.
+
+    Args:
+        rate: Samples per second
+        thread_names: Name prefixes of threads to sample
+        output_format: "collapsed" (flamegraph.pl / speedscope import) or
+            "speedscope" (speedscope JSON)
+        folder: Output directory
+    """
+
+    def __init__(self, rate=100, thread_names=DEFAULT_THREADS,
+                 output_format="collapsed", folder=None):
+        if output_format not in ("collapsed", "speedscope"):
+            raise ValueError(f"Unknown profile format: {output_format}")
+        self.interval = 1.0 / rate
+        self.thread_names = tuple(thread_names)
+        self.output_format = output_format
+        self.folder = folder or PROFILE_FOLDER
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start a new profiling session"""
+        if self.running:
+            return
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop.clear()
+        self._started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the session and write its profile.
+
+        Returns:
+            str: Path of the written profile, or None if nothing was sampled
+        """
+        if not self.running:
+            return None
+        self._stop.set()
+        self._thread.join()
+        if not self.stacks:
+            return None
+        return self.write()
+
+    def toggle(self):
+        """Start or stop profiling; returns the profile path after a stop"""
+        if self.running:
+            return self.stop()
+        self.start()
+        return None
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                name = names.get(ident, "")
+                if not name.startswith(self.thread_names):
+                    continue
+                self.stacks[(name,) + self._stack(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _stack(frame):
+        """Root-first tuple of "function (file:line)" entries"""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def write(self):
+        """Write the aggregated stacks in the configured format"""
+        os.makedirs(self.folder, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self._started_at))
+        if self.output_format == "speedscope":
+            path = os.path.join(self.folder, f"profile_{stamp}.speedscope.json")
+            with open(path, "w") as f:
+                json.dump(self._speedscope(), f)
+        else:
+            path = os.path.join(self.folder, f"profile_{stamp}.collapsed")
+            with open(path, "w") as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{';'.join(stack)} {count}\n")
+        return path
+
+    def _speedscope(self):
+        """Build a speedscope document with one sampled profile per thread"""
+        frames = []
+        frame_index = {}
+        profiles = {}
+        for (thread, *stack), count in self.stacks.items():
+            indices = []
+            for entry in stack:
+                if entry not in frame_index:
+                    frame_index[entry] = len(frames)
+                    frames.append({"name": entry})
+                indices.append(frame_index[entry])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled", "name": thread, "unit": "seconds",
+                "startValue": 0, "endValue": 0, "samples": [], "weights": []
+            })
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+            profile["endValue"] += count * self.interval
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+            "name": f"Game Bot {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._started_at))}",
+            "exporter": "sampling_profiler"
+        }
@@ -0,0 +1,207 @@
+"""Soak test: run the bot for a long time and fail on resource or latency drift"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+import utils
+from frame_source import RecordedFrameSource, SyntheticFrameSource
+from headless import NullInput, percentile, resource_usage
+
+
+def take_sample(bot, sink, started, last):
+    """
+    Measure the running bot.
+
+    Args:
+        bot: Running BotThread
+        sink: Its NullInput
+        started: perf_counter time the run started
+        last: Previous sample, or None
+
+    Returns:
+        dict: One row of soak measurements
+    """
+    now = time.perf_counter()
+    _, rss = resource_usage()
+    traced, _ = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+
+    latencies = sink.drain_latencies()
+    frames = bot.frame_count - (last['frames'] if last else 0)
+    elapsed = now - (last['time'] if last else started)
+
+    return {
+        'time': now,
+        'elapsed': now - started,
+        'frames': bot.frame_count,
+        'frame_ms': 1000 * elapsed / frames if frames else None,
+        'latency_p95_ms': _ms(percentile(latencies, 95)),
+        'rss_mb': rss / (1024 * 1024) if rss is not None else None,
+        'traced_mb': traced / (1024 * 1024) if traced is not None else None,
+        'threads': threading.active_count(),
+        'zones': len(bot.dead_zones) + len(bot.prohibited_zones),
+    }
+
+
+def _ms(seconds):
+    return seconds * 1000 if seconds is not None else None
+
+
+def top_allocators(baseline, limit=10):
+    """Source lines whose traced memory grew the most since the baseline"""
+    if baseline is None or not tracemalloc.is_tracing():
+        return []
+    stats = tracemalloc.take_snapshot().compare_to(baseline, 'lineno')
+    return [s for s in stats if s.size_diff > 0][:limit]
+
+
+def _window_median(samples, key, first):
+    """Median of a field over the first or last quarter of the samples"""
+    quarter = max(1, len(samples) // 4)
+    window = samples[:quarter] if first else samples[-quarter:]
+    values = [s[key] for s in window if s[key] is not None]
+    return statistics.median(values) if values else None
+
+
+def check_drift(samples, limits):
+    """
+    Compare the last quarter of the run with the first one.
+
+    Args:
+        samples: take_sample() rows after warm-up
+        limits: Dict with max_rss_growth_mb, max_traced_growth_mb,
+            max_thread_growth and max_latency_drift (relative)
+
+    Returns:
+        list: Failure messages, empty when the run is stable
+    """
+    failures = []
+    if len(samples) < 2:
+        return ["Not enough samples to judge drift, run longer or sample more often"]
+
+    absolute = (
+        ('rss_mb', 'max_rss_growth_mb', "RSS grew {:.1f} MB"),
+        ('traced_mb', 'max_traced_growth_mb', "Traced Python memory grew {:.1f} MB"),
+        ('threads', 'max_thread_growth', "Thread count grew by {:.0f}"),
+    )
+    for key, limit, message in absolute:
+        start, end = _window_median(samples, key, True), _window_median(samples, key, False)
+        if start is not None and end is not None and end - start > limits[limit]:
+            failures.append(message.format(end - start))
+
+    for key in ('frame_ms', 'latency_p95_ms'):
+        start, end = _window_median(samples, key, True), _window_median(samples, key, False)
+        if start and end is not None and (end - start) / start > limits['max_latency_drift']:
+            failures.append(f"{key} drifted from {start:.1f} to {end:.1f}")
+    return failures
+
+
+def format_sample(sample):
+    fields = []
+    for key in ('elapsed', 'frames', 'frame_ms', 'latency_p95_ms', 'rss_mb', 'traced_mb', 'threads', 'zones'):
+        value = sample[key]
+        if value is None:
+            value = 'n/a'
+        elif isinstance(value, float):
+            value = f"{value:.1f}"
+        fields.append(f"{key}={value}")
+    return " ".join(fields)
+
+
+def run_soak(bot, sink, duration, interval, warmup, trace=True, top=10):
+    """
+    Run a BotThread for ``duration`` seconds and sample it every ``interval``.
+
+    Returns:
+        tuple: (samples after warm-up, top allocators at the end)
+    """
+    if trace:
+        tracemalloc.start()
+    baseline = None
+    samples = []
+    started = time.perf_counter()
+    last = None
+    bot.start()
+    try:
+        while bot.is_alive() and time.perf_counter() - started < duration:
+            bot.join(interval)
+            last = take_sample(bot, sink, started, last)
+            print(format_sample(last), flush=True)
+            if last['elapsed'] < warmup:
+                continue
+            if baseline is None and trace:
+                baseline = tracemalloc.take_snapshot()
+            samples.append(last)
+        allocators = top_allocators(baseline, top)
+    finally:
+        bot.stop()
+        bot.join()
+        if trace:
+            tracemalloc.stop()
+    return samples, allocators
+
+
+def parse_args(argv=None):
+    cfg = utils.CFG.get('soak') or {}
+    parser = argparse.ArgumentParser(description="Run the bot for a long time and check for drift")
+    parser.add_argument('--frames', default=None,
+                        help="Recorded frames to replay; synthetic frames when omitted")
+    parser.add_argument('--weights', default=None,
+                        help="YOLO weights; recordings default to config.yaml, synthetic runs use ground truth")
+    parser.add_argument('--duration', type=float, default=cfg.get('duration', 3600))
+    parser.add_argument('--interval', type=float, default=cfg.get('interval', 30))
+    parser.add_argument('--warmup', type=float, default=cfg.get('warmup', 60))
+    parser.add_argument('--top', type=int, default=10, help="Top allocators to report")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="Skip allocation tracing (it slows Python code down)")
+    for key, default in (('max_rss_growth_mb', 50), ('max_traced_growth_mb', 20),
+                         ('max_thread_growth', 2), ('max_latency_drift', 0.5)):
+        parser.add_argument('--' + key.replace('_', '-'), dest=key, type=float, default=cfg.get(key, default))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from bot_thread import BotThread
+    if args.frames:
+        if not os.path.exists(args.frames):
+            sys.exit(f"Recording not found: {args.frames}")
+        from detection.yolo_detector import YOLODetector
+        frame_source = RecordedFrameSource(args.frames)
+        detector = YOLODetector(args.weights or utils.weights_path, utils.class_names)
+    else:
+        frame_source = SyntheticFrameSource()
+        if args.weights:
+            from detection.yolo_detector import YOLODetector
+            detector = YOLODetector(args.weights, utils.class_names)
+        else:
+            from detection.ground_truth_detector import GroundTruthDetector
+            detector = GroundTruthDetector(frame_source, utils.class_names[0])
+
+    sink = NullInput(lambda: bot.fsm.decision_age())
+    bot = BotThread(None, detector, frame_source=frame_source, inputs=sink)
+    samples, allocators = run_soak(
+        bot, sink, args.duration, args.interval, args.warmup,
+        trace=not args.no_tracemalloc, top=args.top
+    )
+
+    if allocators:
+        print("\nTop allocators since warm-up:")
+        for stat in allocators:
+            print(f"  {stat}")
+
+    failures = check_drift(samples, vars(args))
+    if failures:
+        print("\nSoak FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nSoak passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""Startup profiling: timestamped milestones from process start to a ready bot"""
+import threading
+import time
+
+# Reference point for all marks; taken when this module is first imported
+_T0 = time.perf_counter()
+_marks = []
+_lock = threading.Lock()
+
+
+def mark(label):
+    """Record a startup milestone with the time elapsed since process start"""
+    with _lock:
+        _marks.append((label, time.perf_counter() - _T0, threading.current_thread().name))
+
+
+def report():
+    """
+    Format the recorded milestones as a text table.
+
+    Returns:
+        str: One line per milestone with total and delta times in ms
+    """
+    with _lock:
+        marks = list(_marks)
+
+    lines = ["Startup profile:"]
+    prev = 0.0
+    for label, t, thread in marks:
+        lines.append(f"  {t * 1000:8.1f} ms  (+{(t - prev) * 1000:7.1f})  [{thread}] {label}")
+        prev = t
+    return "\n".join(lines)
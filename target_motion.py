@@ -0,0 +1,157 @@
+"""Target motion tracking and aim extrapolation"""
+import threading
+from collections import deque
+
+from flight_recorder import recorder
+
+EV_AIM_ERROR = recorder.register("aim_error", ("predicted_px", "naive_px", "horizon_ms"))
+
+
+class TargetTrack:
+    """
+    Alpha-beta filter over the detections of the current target.
+
+    Every perceived frame updates position and velocity at the frame's
+    capture time, so aim() can extrapolate to the moment the input lands
+    instead of aiming where the target was when the frame was captured.
+    Each aim is later checked against the observed track and the error is
+    reported next to the error of aiming at the last detection.
+
+    Args:
+        alpha: Position gain
+        beta: Velocity gain; the default follows Benedict-Bordner,
+            alpha ** 2 / (2 - alpha)
+        gate: Maximum distance in pixels between prediction and detection
+            for the detection to belong to this target
+        max_horizon: Extrapolate at most this many seconds ahead
+        max_speed: Velocity clamp in pixels per second
+        history: Number of aim errors kept for reporting
+    """
+
+    def __init__(self, alpha=0.7, beta=0.38, gate=80.0, max_horizon=0.3, max_speed=1500.0, history=512):
+        self.alpha = alpha
+        self.beta = beta
+        self.gate = gate
+        self.max_horizon = max_horizon
+        self.max_speed = max_speed
+        self.errors = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, det=None):
+        """Start tracking a detection, or stop tracking with None"""
+        with self._lock:
+            self.class_name = det.class_name if det is not None else None
+            self.x = self.y = None
+            self.vx = self.vy = 0.0
+            self.t = None
+            self.last = None
+            self._aims = deque(maxlen=64)
+            if det is not None and det.captured_at is not None:
+                self.x, self.y, self.t = float(det.cx), float(det.cy), det.captured_at
+                self.last = (self.t, self.x, self.y)
+
+    @property
+    def active(self):
+        return self.t is not None
+
+    def follows(self, det):
+        """Whether det is the latest detection of this track"""
+        return self.last is not None and self.last == (det.captured_at, det.cx, det.cy)
+
+    def _predict(self, t):
+        dt = min(max(0.0, t - self.t), self.max_horizon)
+        return self.x + self.vx * dt, self.y + self.vy * dt
+
+    def predict(self, t):
+        """Extrapolated (x, y) at clock time t, or None when not tracking"""
+        with self._lock:
+            if self.t is None:
+                return None
+            return self._predict(t)
+
+    def aim(self, t):
+        """
+        Position to aim at for an input landing at clock time t.
+
+        The aim is remembered and scored once the track passes t.
+
+        Returns:
+            tuple: (x, y), or None when not tracking
+        """
+        with self._lock:
+            if self.t is None:
+                return None
+            x, y = self._predict(t)
+            self._aims.append((t, x, y, self.last[1], self.last[2]))
+            return x, y
+
+    def update(self, dets, captured_at):
+        """
+        Feed the detections of a newly perceived frame.
+
+        Returns:
+            DetectionResult: The detection matched to the target, or None
+        """
+        with self._lock:
+            if self.t is None or captured_at <= self.t:
+                return None
+            px, py = self._predict(captured_at)
+            best, best_d2 = None, self.gate ** 2
+            for d in dets:
+                if d.class_name != self.class_name:
+                    continue
+                d2 = (d.cx - px) ** 2 + (d.cy - py) ** 2
+                if d2 < best_d2:
+                    best, best_d2 = d, d2
+            if best is None:
+                return None
+
+            previous = self.last
+            dt = captured_at - self.t
+            rx, ry = best.cx - px, best.cy - py
+            self.x, self.y = px + self.alpha * rx, py + self.alpha * ry
+            self.vx = _clamp(self.vx + self.beta * rx / dt, self.max_speed)
+            self.vy = _clamp(self.vy + self.beta * ry / dt, self.max_speed)
+            self.t = captured_at
+            self.last = (captured_at, float(best.cx), float(best.cy))
+            self._score_aims(previous, self.last)
+            return best
+
+    def _score_aims(self, previous, current):
+        """Compare aims that fall between two observations with the observed path"""
+        t0, x0, y0 = previous
+        t1, x1, y1 = current
+        while self._aims and self._aims[0][0] <= t1:
+            t, ax, ay, nx, ny = self._aims.popleft()
+            if t < t0:
+                continue
+            f = (t - t0) / (t1 - t0)
+            ox, oy = x0 + f * (x1 - x0), y0 + f * (y1 - y0)
+            predicted = ((ax - ox) ** 2 + (ay - oy) ** 2) ** 0.5
+            naive = ((nx - ox) ** 2 + (ny - oy) ** 2) ** 0.5
+            self.errors.append((predicted, naive))
+            recorder.record(EV_AIM_ERROR, predicted, naive, 1000 * (t - t0))
+
+    def error_stats(self):
+        """
+        Returns:
+            dict: Median and 95th percentile aim error in pixels, with and
+                without extrapolation, or None before any aim was scored
+        """
+        errors = list(self.errors)
+        if not errors:
+            return None
+        predicted = sorted(e[0] for e in errors)
+        naive = sorted(e[1] for e in errors)
+        p50, p95 = len(errors) // 2, min(len(errors) - 1, int(0.95 * len(errors)))
+        return {
+            'aim_error_p50_px': predicted[p50],
+            'aim_error_p95_px': predicted[p95],
+            'naive_error_p50_px': naive[p50],
+            'naive_error_p95_px': naive[p95],
+        }
+
+
+def _clamp(value, limit):
+    return max(-limit, min(limit, value))
@@ -0,0 +1,291 @@
+import asyncio
+
+import pytest
+
+import utils
+from bot_fsm import BotState, BotStateMachine, FakeClock
+from detection.detector import DetectionResult
+from exploration import Explorer
+from target_motion import TargetTrack
+from timing import AdaptiveTiming
+from zones import ZoneStore
+
+TARGET = utils.class_names[0]
+
+
+class Inputs:
+    """Input sink that records what the bot sent"""
+
+    def __init__(self):
+        self.sent = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.sent.append((name,) + args)
+
+    def count(self, name):
+        return sum(1 for s in self.sent if s[0] == name)
+
+
+class FakeBot:
+    """The parts of BotThread the state machine uses, without capture"""
+
+    def __init__(self, clock, cursor="RED_SWORD"):
+        self.clock = clock
+        self.cursor = cursor
+        self.dets = []
+        self.frame = None
+        self.frame_captured_at = None
+        self.bbox = {'left': 0, 'top': 0, 'width': 640, 'height': 480}
+        self.running = True
+        self.current_target = None
+        self.last_attack_time = 0.0
+        self.attack_count = 0
+        self.target_cursor_state = None
+        self.target_tracking_active = False
+        self.dead_zones = ZoneStore(5.0)
+        self.prohibited_zones = ZoneStore(9.0)
+        self.inputs = Inputs()
+        self.timing = AdaptiveTiming({
+            'click_interval': 0.05, 'post_click_delay': 0.5, 'click_settle': 0.1, 'loot_settle': 0.2,
+        })
+        self.explorer = Explorer(4.0)
+        self.target_track = TargetTrack()
+        self.perceived = asyncio.Event()
+        # Cursor sprite visible in the latest frame, for response probes
+        self.frame_cursor = "NONE"
+        # Picture shift since the capture time of any detection
+        self.camera_shift = (0.0, 0.0)
+
+    def is_in_dead_zone(self, cx, cy):
+        now = self.clock.now()
+        return self.dead_zones.contains(cx, cy, now) or self.prohibited_zones.contains(cx, cy, now)
+
+    def camera_shift_since(self, captured_at):
+        return self.camera_shift
+
+    def start_cursor_tracking(self):
+        self.target_tracking_active = True
+
+    def stop_cursor_tracking(self):
+        self.target_tracking_active = False
+
+    def smooth_move(self, x, y, steps=5, delay=0.002):
+        self.inputs.sent.append(('smooth_move', x, y))
+
+    def aim_point(self, move_time=0.0):
+        return self.current_target.cx, self.current_target.cy
+
+    def cursor_state_in_frame(self, cx, cy):
+        return self.frame_cursor
+
+    async def wait_for_perception(self, timeout):
+        return await self.clock.wait(self.perceived, timeout)
+
+    async def confirm_cursor_state(self, cx, cy):
+        return self.cursor, 0.99, 2
+
+    async def cursor_state(self, cx, cy):
+        return self.cursor
+
+    def explore_direction(self, frame):
+        return None
+
+
+def det(cx=320, cy=240):
+    return DetectionResult(TARGET, cx, cy, 0.9, captured_at=0.0)
+
+
+async def step(fsm, clock, tick=0.01, limit=10.0):
+    """Run one state machine step, advancing the fake clock until it returns"""
+    start = clock.now()
+    task = asyncio.ensure_future(fsm.step())
+    await clock.advance(0)
+    while not task.done():
+        assert clock.now() - start < limit, "step never finished"
+        await clock.advance(tick)
+    return task.result(), clock.now() - start
+
+
+def run(scenario, cursor="RED_SWORD"):
+    async def main():
+        clock = FakeClock()
+        bot = FakeBot(clock, cursor)
+        fsm = BotStateMachine(bot, clock)
+        return await scenario(fsm, bot, clock)
+    return asyncio.run(main())
+
+
+def test_search_acquires_visible_target():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        assert (await step(fsm, clock))[0] is BotState.ACQUIRE
+        assert (await step(fsm, clock))[0] is BotState.ATTACK
+        assert bot.current_target is bot.dets[0]
+        await step(fsm, clock)
+        assert bot.target_tracking_active
+    run(scenario)
+
+
+def test_search_waits_out_the_grace_period_before_exploring():
+    async def scenario(fsm, bot, clock):
+        fsm.last_target_time = clock.now()
+        elapsed = 0.0
+        while fsm.state is BotState.SEARCH:
+            state, took = await step(fsm, clock)
+            elapsed += took
+        assert state is BotState.EXPLORE
+        assert elapsed == pytest.approx(utils.SEARCH_GRACE, abs=0.02)
+    run(scenario)
+
+
+def test_dead_zone_targets_are_skipped():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        bot.dead_zones.add(320, 240, clock.now())
+        assert (await step(fsm, clock))[0] is BotState.EXPLORE
+    run(scenario)
+
+
+def test_attack_clicks_and_keeps_attacking():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        fsm.state = BotState.ACQUIRE
+        await step(fsm, clock)
+        state, took = await step(fsm, clock)
+        assert state is BotState.ATTACK
+        assert bot.inputs.count('click_mouse') == 1
+        assert bot.attack_count == 1
+        assert took == pytest.approx(0.1 + 0.05, abs=0.02)
+        # The next click waits for post_click_delay after the previous one
+        state, took = await step(fsm, clock)
+        assert bot.inputs.count('click_mouse') == 1
+        assert clock.now() - bot.last_attack_time >= 0.5 - 1e-9
+    run(scenario)
+
+
+def test_attack_inputs_are_timed_from_the_detection_frame():
+    async def scenario(fsm, bot, clock):
+        ages = []
+        bot.inputs.click_mouse = lambda button: ages.append(fsm.decision_age())
+        bot.dets = [det()]
+        fsm.state = BotState.ACQUIRE
+        await step(fsm, clock)
+        await clock.advance(0.2)
+        await step(fsm, clock)
+        # The detection was captured at 0.0, the click comes after the
+        # move and cursor confirmation
+        assert len(ages) == 1
+        assert ages[0] == pytest.approx(0.2, abs=0.02)
+    run(scenario)
+
+
+def test_explore_turns_from_memory_are_not_timed():
+    async def scenario(fsm, bot, clock):
+        ages = []
+        bot.inputs.press_mouse = lambda button: ages.append(fsm.decision_age())
+        fsm.state = BotState.EXPLORE
+        await step(fsm, clock)
+        assert ages == [None]
+    run(scenario)
+
+
+def test_prohibited_cursor_marks_the_target_and_searches():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        fsm.state = BotState.ACQUIRE
+        await step(fsm, clock)
+        assert (await step(fsm, clock))[0] is BotState.SEARCH
+        assert bot.current_target is None
+        assert bot.inputs.count('click_mouse') == 0
+        assert bot.is_in_dead_zone(320, 240)
+    run(scenario, cursor="PROHIBITED")
+
+
+def test_zones_follow_the_camera_since_the_detection_frame():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        fsm.state = BotState.ACQUIRE
+        await step(fsm, clock)
+        # The camera turned after the frame the target was detected on
+        bot.camera_shift = (-60.0, 0.0)
+        await step(fsm, clock)
+        assert bot.is_in_dead_zone(260, 240)
+        assert not bot.is_in_dead_zone(320, 240)
+    run(scenario, cursor="PROHIBITED")
+
+
+def test_hand_cursor_loots_then_searches():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        fsm.state = BotState.ACQUIRE
+        await step(fsm, clock)
+        assert (await step(fsm, clock))[0] is BotState.LOOT
+        state, took = await step(fsm, clock)
+        assert state is BotState.SEARCH
+        assert took == pytest.approx(0.2, abs=0.02)
+        assert bot.inputs.count('click_mouse') == 1
+        assert len(bot.dead_zones) == 1
+        assert bot.current_target is None
+    run(scenario, cursor="HAND")
+
+
+def test_vanished_target_is_dropped_after_a_grace_time():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        fsm.state = BotState.ACQUIRE
+        await step(fsm, clock)
+        bot.dets = []
+        elapsed = 0.0
+        while fsm.state is BotState.ATTACK:
+            _, took = await step(fsm, clock)
+            elapsed += took
+        assert fsm.state is BotState.SEARCH
+        assert bot.current_target is None
+        assert elapsed >= 0.5 * 3 - 0.5
+    run(scenario)
+
+
+def test_explore_turns_the_camera_and_returns_to_search():
+    async def scenario(fsm, bot, clock):
+        fsm.state = BotState.EXPLORE
+        state, _ = await step(fsm, clock)
+        assert state is BotState.SEARCH
+        assert bot.inputs.count('move_mouse_rel') > 0
+        assert bot.inputs.count('press_key') == 1
+        assert bot.explorer.heading != 0.0
+    run(scenario)
+
+
+def test_first_move_onto_a_target_probes_the_response_time():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        fsm.state = BotState.ACQUIRE
+        await step(fsm, clock)
+        task = asyncio.ensure_future(fsm.step())
+        await clock.advance(0)
+        assert len(bot.timing.probes) == 1
+        moved_at = bot.timing.probes[0][0]
+        # The sprite shows up in a frame captured 80 ms after the move
+        bot.frame_cursor = "RED_SWORD"
+        bot.timing.on_frame(moved_at + 0.08)
+        assert bot.timing.estimator.samples == 1
+        assert bot.timing.estimator.mean == pytest.approx(0.08)
+        while not task.done():
+            await clock.advance(0.01)
+        # Later attack steps on the same target do not probe
+        await step(fsm, clock)
+        await step(fsm, clock)
+        assert not bot.timing.probes
+        assert bot.timing.estimator.samples == 1
+    run(scenario)
+
+
+def test_no_probe_when_the_cursor_is_already_on_the_target():
+    async def scenario(fsm, bot, clock):
+        bot.dets = [det()]
+        bot.frame_cursor = "RED_SWORD"
+        fsm.state = BotState.ACQUIRE
+        await step(fsm, clock)
+        await step(fsm, clock)
+        assert not bot.timing.probes
+    run(scenario)
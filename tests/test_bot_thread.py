@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+import utils
+from bot_thread import BotThread
+from detection.ground_truth_detector import GroundTruthDetector
+from frame_source import SyntheticFrameSource
+from headless import NullInput
+
+
+class FailingDetector(GroundTruthDetector):
+    """Ground truth detections until the given frame, then an error"""
+
+    def __init__(self, source, fail_at):
+        super().__init__(source, utils.class_names[0])
+        self.fail_at = fail_at
+        self.calls = 0
+
+    def detect(self, frame):
+        self.calls += 1
+        if self.calls > self.fail_at:
+            raise RuntimeError("detector failed")
+        return super().detect(frame)
+
+
+def test_perception_failure_stops_the_bot():
+    source = SyntheticFrameSource(320, 240, seed=1)
+    sink = NullInput()
+    bot = BotThread(None, FailingDetector(source, 20), frame_source=source, inputs=sink)
+    try:
+        start = time.monotonic()
+        with pytest.raises(RuntimeError, match="detector failed"):
+            asyncio.run(asyncio.wait_for(bot.run_async(), 10))
+        assert time.monotonic() - start < 5
+        assert not bot.running
+        assert bot.frame_count == 20
+        assert bot.current_target is None
+    finally:
+        bot.cursor_pool.shutdown()
+
+
+def test_cursor_update_interval_follows_the_response_within_bounds():
+    source = SyntheticFrameSource(320, 240, seed=1)
+    bot = BotThread(None, GroundTruthDetector(source, utils.class_names[0]), frame_source=source, inputs=NullInput())
+    try:
+        timing = bot.timing
+        lo, hi = timing.bounds['cursor_update_interval']
+        assert timing.cursor_update_interval == utils.CURSOR_UPDATE_INTERVAL
+        for _ in range(timing.min_samples):
+            timing.add_sample(1.0)
+        assert timing.cursor_update_interval == hi
+        for _ in range(50):
+            timing.add_sample(0.01)
+        assert lo <= timing.cursor_update_interval < utils.CURSOR_UPDATE_INTERVAL
+    finally:
+        bot.cursor_pool.shutdown()
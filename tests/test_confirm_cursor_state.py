@@ -0,0 +1,53 @@
+import itertools
+
+import pytest
+
+from cursor_detection.cursor_detection import confirm_cursor_state
+
+
+def sampler(states):
+    """Sample callable returning the given states in order"""
+    it = iter(states)
+    return lambda: next(it)
+
+
+def test_consistent_samples_stop_early():
+    state, confidence, samples = confirm_cursor_state(
+        sampler(["RED_SWORD"] * 6), confidence=0.95, accuracy=0.85, max_samples=6
+    )
+    assert state == "RED_SWORD"
+    assert confidence >= 0.95
+    assert samples == 2
+
+
+def test_single_sample_is_not_enough():
+    # One vote at 85% accuracy is below a 95% requirement
+    _, confidence, samples = confirm_cursor_state(
+        sampler(["HAND"] * 6), confidence=0.95, accuracy=0.85, max_samples=6
+    )
+    assert samples > 1
+    assert confidence >= 0.95
+
+
+def test_ambiguous_samples_use_the_budget():
+    states = itertools.cycle(["HAND", "NONE"])
+    state, confidence, samples = confirm_cursor_state(
+        lambda: next(states), confidence=0.95, max_samples=6, ambiguous_delay=0
+    )
+    assert samples == 6
+    assert confidence < 0.95
+    assert state in ("HAND", "NONE")
+
+
+def test_majority_wins_after_a_bad_sample():
+    state, _, samples = confirm_cursor_state(
+        sampler(["NONE", "RED_SWORD", "RED_SWORD", "RED_SWORD"]), max_samples=4, ambiguous_delay=0
+    )
+    assert state == "RED_SWORD"
+    assert samples <= 4
+
+
+@pytest.mark.parametrize("max_samples", [0, -1])
+def test_max_samples_must_be_positive(max_samples):
+    with pytest.raises(ValueError):
+        confirm_cursor_state(sampler([]), max_samples=max_samples)
@@ -0,0 +1,70 @@
+import numpy as np
+
+from cursor_detection.cursor_cache import CursorStateCache
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0.0
+
+    def now(self):
+        return self.time
+
+
+class CountingClassifier:
+    def __init__(self, state="RED_SWORD"):
+        self.state = state
+        self.calls = 0
+
+    def __call__(self, frame, x, y, search_radius):
+        self.calls += 1
+        return self.state
+
+
+def frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (200, 200, 3), dtype=np.uint8)
+
+
+def test_unchanged_roi_is_served_from_cache():
+    clock, classify = Clock(), CountingClassifier()
+    cache = CursorStateCache(clock=clock.now)
+    f = frame()
+    assert cache.classify(f, 100, 100, classify_fn=classify) == "RED_SWORD"
+    assert cache.classify(f, 100, 100, classify_fn=classify) == "RED_SWORD"
+    assert classify.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+
+
+def test_changed_roi_is_reclassified():
+    classify = CountingClassifier()
+    cache = CursorStateCache(clock=Clock().now)
+    cache.classify(frame(0), 100, 100, classify_fn=classify)
+    cache.classify(frame(1), 100, 100, classify_fn=classify)
+    assert classify.calls == 2
+
+
+def test_entries_expire_on_the_given_clock():
+    clock, classify = Clock(), CountingClassifier()
+    cache = CursorStateCache(max_age=0.25, clock=clock.now)
+    f = frame()
+    cache.classify(f, 100, 100, classify_fn=classify)
+    clock.time = 0.2
+    cache.classify(f, 100, 100, classify_fn=classify)
+    assert classify.calls == 1
+    clock.time = 0.5
+    cache.classify(f, 100, 100, classify_fn=classify)
+    assert classify.calls == 2
+
+
+def test_refresh_always_classifies_and_updates_the_entry():
+    classify = CountingClassifier("HAND")
+    cache = CursorStateCache(clock=Clock().now)
+    f = frame()
+    for _ in range(3):
+        assert cache.classify(f, 100, 100, classify_fn=classify, refresh=True) == "HAND"
+    assert classify.calls == 3
+    assert cache.hits == 0
+    # The refreshed entry serves later plain lookups
+    assert cache.classify(f, 100, 100, classify_fn=classify) == "HAND"
+    assert classify.calls == 3
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import cursor_detection.cursor_detection as cd
+from cursor_detection.cursor_dense import PER_ROI_OPTIONS, dense_cursor_states
+from cursor_detection.cursor_detection import detect_cursor_state, load_templates
+from cursor_detection.cursor_synth import paste_sprite, procedural_background
+
+STEP = 50
+RADIUS = 20
+
+
+@pytest.fixture(scope="module")
+def templates():
+    templates = {k: v for k, v in (load_templates() or {}).items() if v is not None}
+    if not templates:
+        pytest.skip("cursor templates not available")
+    return templates
+
+
+@pytest.fixture(scope="module")
+def scene(templates):
+    """Neutral background with every cursor sprite centered on a grid point"""
+    rng = np.random.default_rng(0)
+    frame = np.clip(rng.normal(0, 8, (400, 600, 3)) + (90, 110, 95), 0, 255).astype(np.uint8)
+    for i, (state, sprite) in enumerate(sorted(templates.items())):
+        h, w = sprite.shape[:2]
+        paste_sprite(frame, sprite, STEP * (2 * i + 3) - w // 2, STEP * 3 - h // 2)
+    return frame
+
+
+def per_roi_states(frame):
+    return [
+        (x, y, detect_cursor_state(frame, x, y, RADIUS, **PER_ROI_OPTIONS))
+        for y in range(STEP, frame.shape[0], STEP)
+        for x in range(STEP, frame.shape[1], STEP)
+    ]
+
+
+def test_dense_matches_per_roi(scene, templates):
+    dense = dense_cursor_states(scene, step=STEP, search_radius=RADIUS)
+    assert dense == per_roi_states(scene)
+    assert {state for _, _, state in dense} == set(templates) | {"NONE"}
+
+
+def test_dense_ignores_the_loaded_model(scene, monkeypatch):
+    class Model:
+        def classify(self, roi):
+            return "HAND"
+
+    expected = per_roi_states(scene)
+    monkeypatch.setattr(cd, "cursor_model", Model())
+    assert dense_cursor_states(scene, step=STEP, search_radius=RADIUS) == expected
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_dense_mostly_matches_on_textured_backgrounds(templates, seed):
+    # Colour blobs cut by an ROI edge may be cleaned differently per ROI
+    rng = np.random.default_rng(seed)
+    frame = np.concatenate(
+        [np.concatenate([procedural_background(rng) for _ in range(6)], axis=1) for _ in range(4)]
+    )
+    dense = dense_cursor_states(frame, step=STEP, search_radius=RADIUS)
+    per_roi = per_roi_states(frame)
+    assert np.mean([a == b for a, b in zip(dense, per_roi)]) >= 0.9
@@ -0,0 +1,110 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from cursor_detection.cursor_detection import CURSOR_STATES
+from cursor_detection.cursor_model import CursorModel, batch_features, load_labeled_rois, train_cursor_model
+
+# Sprite stand-ins: a distinct color and shape per state
+SPRITES = {
+    "RED_SWORD": ((30, 30, 220), "line"),
+    "HAND": ((90, 200, 230), "disk"),
+    "PROHIBITED": ((40, 40, 200), "ring"),
+}
+
+
+def synthetic_roi(rng, state, size=100):
+    roi = np.clip(rng.normal(0, 10, (size, size, 3)) + rng.uniform(60, 140, 3), 0, 255).astype(np.uint8)
+    if state == "NONE":
+        return roi
+    color, shape = SPRITES[state]
+    x, y = (int(v) for v in rng.integers(30, 70, 2))
+    if shape == "line":
+        cv2.line(roi, (x - 12, y - 12), (x + 12, y + 12), color, 4)
+    elif shape == "disk":
+        cv2.circle(roi, (x, y), 10, color, -1)
+    else:
+        cv2.circle(roi, (x, y), 11, color, 3)
+        cv2.line(roi, (x - 8, y - 8), (x + 8, y + 8), color, 3)
+    return roi
+
+
+def dataset(count, seed):
+    rng = np.random.default_rng(seed)
+    labels = [CURSOR_STATES[i % len(CURSOR_STATES)] for i in range(count)]
+    return [synthetic_roi(rng, label) for label in labels], labels
+
+
+@pytest.fixture(scope="module")
+def model():
+    rois, labels = dataset(160, seed=0)
+    return train_cursor_model(rois, labels, epochs=200)
+
+
+def test_trained_model_classifies_unseen_rois(model):
+    rois, labels = dataset(80, seed=1)
+    predicted = model.classify_batch(rois)
+    accuracy = np.mean([p == t for p, t in zip(predicted, labels)])
+    assert accuracy >= 0.9
+
+
+def test_classify_batch_matches_single_calls(model):
+    rois, _ = dataset(8, seed=2)
+    assert model.classify_batch(rois) == [model.classify(roi) for roi in rois]
+    assert model.classify_batch([]) == []
+
+
+def test_probabilities_sum_to_one(model):
+    rois, _ = dataset(4, seed=3)
+    proba = model.predict_proba(batch_features(rois))
+    assert proba.shape == (4, len(CURSOR_STATES))
+    assert np.allclose(proba.sum(axis=1), 1.0)
+
+
+def test_save_load_round_trip(model, tmp_path):
+    path = str(tmp_path / "cursor_model.npz")
+    model.save(path)
+    loaded = CursorModel.load(path)
+    assert loaded.classes == model.classes
+    rois, _ = dataset(12, seed=4)
+    assert loaded.classify_batch(rois) == model.classify_batch(rois)
+
+
+def test_load_rejects_other_features(tmp_path):
+    path = str(tmp_path / "old.npz")
+    CursorModel(np.zeros((10, 4)), np.zeros(4), np.zeros(10), np.ones(10)).save(path)
+    with pytest.raises(ValueError):
+        CursorModel.load(path)
+
+
+def write_roi(folder, name, roi):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name)
+    if name.endswith(".npy"):
+        np.save(path, roi)
+    else:
+        cv2.imwrite(path, roi)
+
+
+def test_load_labeled_rois_filters_pipeline_labels(tmp_path):
+    rng = np.random.default_rng(5)
+    root = str(tmp_path)
+    # Hand-corrected: the folder name is the label, whatever the file name says
+    write_roi(os.path.join(root, "corrected", "HAND"), "cursor_roi_NONE_1.png", synthetic_roi(rng, "HAND"))
+    # Pipeline output: the label is what the pipeline detected
+    write_roi(os.path.join(root, "debug"), "cursor_roi_RED_SWORD_2.png", synthetic_roi(rng, "RED_SWORD"))
+    write_roi(os.path.join(root, "debug"), "cursor_roi_BOGUS_3.png", synthetic_roi(rng, "NONE"))
+    write_roi(os.path.join(root, "debug"), "notes.png", synthetic_roi(rng, "NONE"))
+    # Synthetic scenes: file names are ground truth
+    synthetic = os.path.join(root, "synthetic")
+    write_roi(synthetic, "cursor_roi_PROHIBITED_4.npy", synthetic_roi(rng, "PROHIBITED"))
+    with open(os.path.join(synthetic, "labels.csv"), "w") as f:
+        f.write("file,state\ncursor_roi_PROHIBITED_4.npy,PROHIBITED\n")
+
+    _, labels = load_labeled_rois(root)
+    assert sorted(labels) == ["HAND", "PROHIBITED", "RED_SWORD"]
+    rois, labels = load_labeled_rois(root, trusted_only=True)
+    assert sorted(labels) == ["HAND", "PROHIBITED"]
+    assert all(roi.shape == (100, 100, 3) for roi in rois)
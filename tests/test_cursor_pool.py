@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from cursor_detection.cursor_detection import load_templates
+from cursor_detection.cursor_pool import CursorClassifierPool, classify_frame
+from cursor_detection.cursor_synth import paste_sprite
+
+
+@pytest.fixture(scope="module")
+def templates():
+    templates = {k: v for k, v in (load_templates() or {}).items() if v is not None}
+    if not templates:
+        pytest.skip("cursor templates not available")
+    return templates
+
+
+@pytest.fixture(scope="module")
+def frame(templates):
+    """RGB frame with every cursor sprite, one of them against the left edge"""
+    rng = np.random.default_rng(1)
+    frame = np.clip(rng.normal(0, 8, (360, 640, 3)) + (90, 110, 95), 0, 255).astype(np.uint8)
+    for i, sprite in enumerate(templates[k] for k in sorted(templates)):
+        paste_sprite(frame, sprite, 150 * i, 150)
+    return frame[..., ::-1].copy()
+
+
+# Targets and mouse positions: centered, off the mouse, clipped by the edges
+POINTS = [(10, 160, (5, 155)), (160, 160, None), (300, 165, (306, 160)), (630, 5, None), (455, 350, (450, 352))]
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_pool_matches_the_full_frame(frame, workers):
+    pool = CursorClassifierPool(workers)
+    try:
+        for x, y, cursor in POINTS:
+            expected = classify_frame(frame, x, y, rgb=True, cursor=cursor)
+            assert pool.classify(frame, x, y, rgb=True, cursor=cursor) == expected
+            assert pool.submit(frame, x, y, rgb=True, cursor=cursor).result() == expected
+    finally:
+        pool.shutdown()
+
+
+def test_pool_falls_back_in_process_after_shutdown(frame):
+    pool = CursorClassifierPool(1)
+    pool.executor.shutdown(wait=True)
+    try:
+        assert pool.classify(frame, 160, 160, rgb=True) == classify_frame(frame, 160, 160, rgb=True)
+        assert pool.in_process
+    finally:
+        pool.shutdown()
@@ -0,0 +1,144 @@
+import math
+
+import pytest
+
+from detection.detector import DetectionResult
+from exploration import Explorer, HeadingHistogram
+
+WIDTH = 640
+
+
+def shift_for(degrees, fov=90.0, width=WIDTH):
+    """Picture shift in frame pixels for a camera turn of degrees"""
+    focal = width / 2 / math.tan(math.radians(fov / 2))
+    return -focal * math.tan(math.radians(degrees))
+
+
+def det(cx, cy=240):
+    return DetectionResult("mob", cx, cy, 0.9)
+
+
+def turn(explorer, dx, measured_steps):
+    explorer.begin_turn()
+    explorer.rotated(dx)
+    for degrees in measured_steps:
+        explorer.camera_moved(None if degrees is None else shift_for(degrees), WIDTH)
+    return explorer.end_turn()
+
+
+def test_measured_turn_corrects_heading_and_calibration():
+    # 4 px/deg assumed, the game actually turns 1 degree per 5 px
+    explorer = Explorer(4.0)
+    drift = turn(explorer, 200, [10.0] * 4)
+    assert drift == pytest.approx(40.0 - 50.0)
+    assert explorer.heading == pytest.approx(40.0)
+    assert 4.0 < explorer.pixels_per_degree < 5.0
+
+
+def test_calibration_converges():
+    explorer = Explorer(4.0)
+    for _ in range(30):
+        turn(explorer, 200, [20.0, 20.0])
+    assert explorer.pixels_per_degree == pytest.approx(5.0, rel=0.01)
+    assert turn(explorer, 200, [20.0, 20.0]) == pytest.approx(0.0, abs=0.1)
+
+
+def test_unmeasured_turn_keeps_dead_reckoning():
+    explorer = Explorer(4.0)
+    assert turn(explorer, 200, [10.0, None, 10.0]) is None
+    assert turn(explorer, 200, []) is None
+    assert explorer.heading == pytest.approx(100.0)
+    assert explorer.pixels_per_degree == 4.0
+
+
+def test_frames_outside_a_turn_are_ignored():
+    explorer = Explorer(4.0)
+    explorer.camera_moved(shift_for(30.0), WIDTH)
+    explorer.rotated(40)
+    assert not explorer.turning
+    assert explorer.heading == pytest.approx(10.0)
+
+
+def test_targets_still_in_view_are_logged_once():
+    explorer = Explorer(4.0, half_life=1e9)
+    assert explorer.observe([det(100), det(500)], WIDTH, 0.0) == 2
+    # Same targets a little later, one moved a bit
+    assert explorer.observe([det(105), det(500)], WIDTH, 1.0) == 0
+    # After turning right by 10 degrees they appear further left
+    explorer.rotated(40)
+    assert explorer.observe([det(105 - 71), det(500 - 71)], WIDTH, 2.0) == 0
+    assert explorer.histogram.counts.sum() == pytest.approx(2.0)
+
+
+def test_sightings_are_forgotten_after_the_timeout():
+    explorer = Explorer(4.0, half_life=1e9, seen_timeout=5.0)
+    explorer.observe([det(320)], WIDTH, 0.0)
+    assert explorer.observe([det(320)], WIDTH, 6.0) == 1
+    assert explorer.histogram.counts.sum() == pytest.approx(2.0)
+
+
+def test_histogram_decays_with_the_half_life():
+    histogram = HeadingHistogram(bins=36, half_life=10.0)
+    histogram.add(45.0, 0.0, weight=4.0)
+    assert histogram.counts[4] == pytest.approx(4.0)
+    histogram.add(200.0, 10.0)
+    assert histogram.counts[4] == pytest.approx(2.0)
+    assert histogram.counts[20] == pytest.approx(1.0)
+    # Negative and wrapped headings land in the same cells
+    histogram.add(-315.0, 10.0)
+    assert histogram.counts[4] == pytest.approx(3.0)
+
+
+def test_densest_heading_is_smoothed_over_neighbours():
+    histogram = HeadingHistogram(bins=36, half_life=1e9)
+    assert histogram.densest(0.0) is None
+    histogram.add(100.0, 0.0, weight=2.0)
+    histogram.add(115.0, 0.0, weight=2.0)
+    histogram.add(300.0, 0.0, weight=2.5)
+    heading, density = histogram.densest(0.0)
+    # The 100 and 110 cells support each other over the heavier 300 cell
+    assert heading in (105.0, 115.0)
+    assert density == pytest.approx(0.5 * 2 + 0.25 * 2)
+
+
+def test_suggest_turn_towards_the_densest_heading():
+    explorer = Explorer(4.0, half_life=1e9, min_density=0.5)
+    assert explorer.suggest_turn(0.0) is None
+    explorer.histogram.add(185.0, 0.0, weight=2.0)
+    assert explorer.suggest_turn(0.0) == pytest.approx(-175.0)
+    explorer.rotated(4 * 90)
+    assert explorer.suggest_turn(0.0) == pytest.approx(95.0)
+
+
+def test_suggest_turn_ignores_headings_in_view_and_weak_memory():
+    explorer = Explorer(4.0, fov=90.0, half_life=1e9, min_density=0.5)
+    explorer.histogram.add(30.0, 0.0, weight=2.0)
+    assert explorer.suggest_turn(0.0) is None
+    weak = Explorer(4.0, half_life=1e9, min_density=0.5)
+    weak.histogram.add(180.0, 0.0, weight=0.5)
+    assert weak.suggest_turn(0.0) is None
+
+
+def test_searched_weakens_only_the_headings_in_view():
+    explorer = Explorer(4.0, fov=90.0, half_life=1e9)
+    for heading in (0.0, 40.0, 90.0, 320.0):
+        explorer.histogram.add(heading, 0.0, weight=2.0)
+    explorer.searched(0.0, factor=0.5)
+    counts = explorer.histogram.counts
+    assert counts[0] == pytest.approx(1.0)
+    assert counts[4] == pytest.approx(1.0)
+    assert counts[32] == pytest.approx(1.0)
+    assert counts[9] == pytest.approx(2.0)
+
+
+def test_repeated_searches_move_the_suggestion_elsewhere():
+    explorer = Explorer(4.0, fov=90.0, half_life=1e9, min_density=0.5)
+    explorer.histogram.add(0.0, 0.0, weight=4.0)
+    explorer.histogram.add(180.0, 0.0, weight=8.0)
+    explorer.rotated(4 * 180)
+    # The densest heading is in view and empty: the memory there fades
+    # until the next one wins
+    assert explorer.suggest_turn(0.0) is None
+    for _ in range(3):
+        explorer.searched(0.0)
+    assert explorer.suggest_turn(0.0) == pytest.approx(-175.0)
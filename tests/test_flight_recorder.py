@@ -0,0 +1,69 @@
+import pytest
+
+from bot_fsm import state_code
+from cursor_detection.cursor_detection import CURSOR_STATES
+from flight_recorder import FlightRecorder
+
+
+def test_events_come_back_in_order():
+    recorder = FlightRecorder(capacity=8)
+    ev = recorder.register("tick", ("n",))
+    for n in range(3):
+        recorder.record(ev, n)
+    assert [(name, values) for _, name, values in recorder.snapshot()] == [
+        ("tick", {"n": 0.0}), ("tick", {"n": 1.0}), ("tick", {"n": 2.0})
+    ]
+
+
+def test_wrap_around_keeps_the_newest_events_in_order():
+    recorder = FlightRecorder(capacity=4)
+    ev = recorder.register("tick", ("n",))
+    for n in range(10):
+        recorder.record(ev, n)
+    records = recorder.snapshot()
+    assert [values["n"] for _, _, values in records] == [6.0, 7.0, 8.0, 9.0]
+    times = [t for t, _, _ in records]
+    assert times == sorted(times)
+
+
+def test_missing_fields_are_zero_padded():
+    recorder = FlightRecorder(capacity=2)
+    wide = recorder.register("wide", ("a", "b", "c"))
+    narrow = recorder.register("narrow", ("a", "b", "c"))
+    recorder.record(wide, 1, 2, 3)
+    # Reuses the slot of the wide event: stale fields must not leak
+    recorder.record(narrow, 4)
+    recorder.record(narrow, 5)
+    assert recorder.snapshot()[-1][2] == {"a": 5.0, "b": 0.0, "c": 0.0}
+    assert recorder.snapshot()[0][2] == {"a": 4.0, "b": 0.0, "c": 0.0}
+
+
+def test_too_many_fields_are_rejected():
+    recorder = FlightRecorder(num_fields=2)
+    with pytest.raises(ValueError):
+        recorder.register("wide", ("a", "b", "c"))
+
+
+def test_coded_fields_are_decoded():
+    recorder = FlightRecorder()
+    recorder.register_codes("state", CURSOR_STATES)
+    ev = recorder.register("cursor", ("x", "state"))
+    recorder.record(ev, 12, state_code("HAND"))
+    recorder.record(ev, 13, state_code("SOMETHING_ELSE"))
+    first, second = (values for _, _, values in recorder.snapshot())
+    assert first == {"x": 12.0, "state": "HAND"}
+    # Unknown states are kept as their -1 code instead of a wrong label
+    assert state_code("SOMETHING_ELSE") == -1
+    assert second == {"x": 13.0, "state": -1.0}
+
+
+def test_dump_writes_one_line_per_event(tmp_path):
+    recorder = FlightRecorder(capacity=4)
+    recorder.register_codes("state", CURSOR_STATES)
+    ev = recorder.register("cursor", ("x", "state"))
+    recorder.record(ev, 1.5, state_code("NONE"))
+    path = recorder.dump("test", folder=str(tmp_path))
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "# reason: test, events: 1"
+    assert lines[1].endswith(" cursor x=1.5 state=NONE")
@@ -0,0 +1,36 @@
+from headless import NullInput, format_report, percentile
+
+
+def test_null_input_records_the_decision_age():
+    ages = iter([0.05, None, 0.1])
+    sink = NullInput(lambda: next(ages))
+    sink.click_mouse('left')
+    sink.press_key(0x57)
+    sink.move_mouse_rel(10, 0)
+    # Moves that are not actions do not count
+    sink.smooth_move(1, 2)
+    assert sink.actions == 3
+    assert sink.drain_latencies() == [0.05, 0.1]
+    assert sink.drain_latencies() == []
+
+
+def test_null_input_without_latency_tracking():
+    sink = NullInput()
+    sink.click_mouse('left')
+    assert sink.actions == 1
+    assert sink.latencies == []
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(100)), 95) == 95
+
+
+def test_report_columns_line_up():
+    report = format_report({'fps': 30.0, 'cursor_cache_hit_rate': 0.5, 'rss_mb': None, 'frames': 3})
+    lines = report.splitlines()
+    assert lines[0] == "Benchmark:"
+    assert len({line.rindex(' ') for line in lines[1:]}) == 1
+    assert lines[1].endswith(" 30.00")
+    assert lines[3].endswith(" n/a")
@@ -0,0 +1,31 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sampling_profiler import SamplingProfiler
+
+
+def busy(stop):
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def test_bot_executor_threads_are_sampled(tmp_path):
+    stop = threading.Event()
+    profiler = SamplingProfiler(rate=500, folder=str(tmp_path))
+    executors = [ThreadPoolExecutor(1, thread_name_prefix=p) for p in ("CursorCapture", "Capture", "Other")]
+    try:
+        for executor in executors:
+            executor.submit(busy, stop)
+        profiler.start()
+        time.sleep(0.1)
+        path = profiler.stop()
+    finally:
+        stop.set()
+        for executor in executors:
+            executor.shutdown()
+    threads = {stack[0] for stack in profiler.stacks}
+    assert any(t.startswith("CursorCapture") for t in threads)
+    assert any(t.startswith("Capture") for t in threads)
+    assert not any(t.startswith("Other") for t in threads)
+    assert path is not None and path.startswith(str(tmp_path))
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot_fsm import FakeClock
+from bot_thread import BotThread
+from detection.detector import DetectionResult
+from target_motion import TargetTrack
+from utils import AIM_LEAD
+
+DT = 1 / 30
+
+
+def det(cx, cy, t, class_name="mob"):
+    return DetectionResult(class_name, cx, cy, 0.9, captured_at=t)
+
+
+def moving_track(vx=180.0, frames=30, track=None):
+    """Track a target moving right at vx pixels per second"""
+    track = track or TargetTrack()
+    track.reset(det(100, 200, 0.0))
+    for i in range(1, frames + 1):
+        t = i * DT
+        track.update([det(100 + vx * t, 200, t)], t)
+    return track
+
+
+def test_constant_velocity_is_learned_and_extrapolated():
+    track = moving_track()
+    assert track.vx == pytest.approx(180.0, rel=0.01)
+    assert track.vy == pytest.approx(0.0, abs=1e-6)
+    x, y = track.predict(1.0 + 0.1)
+    assert x == pytest.approx(100 + 180 * 1.1, abs=1.0)
+    assert y == pytest.approx(200)
+
+
+def test_extrapolation_is_limited_to_the_horizon():
+    track = moving_track()
+    far = track.predict(1.0 + 10.0)
+    assert far == pytest.approx(track.predict(1.0 + track.max_horizon))
+
+
+def test_update_ignores_other_classes_far_detections_and_old_frames():
+    track = TargetTrack(gate=50)
+    track.reset(det(100, 100, 0.0))
+    assert track.update([det(102, 100, 0.1, "other")], 0.1) is None
+    assert track.update([det(300, 100, 0.1)], 0.1) is None
+    near = det(104, 100, 0.1)
+    assert track.update([det(300, 100, 0.1), near], 0.1) is near
+    assert track.follows(near)
+    assert track.update([det(108, 100, 0.05)], 0.05) is None
+
+
+def test_reset_stops_tracking():
+    track = moving_track(frames=3)
+    assert track.active
+    track.reset()
+    assert not track.active
+    assert track.predict(1.0) is None
+    assert track.aim(1.0) is None
+    assert not track.follows(det(100, 200, 0.0))
+
+
+def test_reset_without_capture_time_does_not_track():
+    track = TargetTrack()
+    track.reset(det(100, 100, None))
+    assert not track.active
+
+
+def test_aims_are_scored_against_the_observed_path():
+    track = moving_track(frames=10)
+    t = 10 * DT
+    # Aim half a frame ahead, then observe the frame after it
+    track.aim(t + DT / 2)
+    track.update([det(100 + 180 * (t + DT), 200, t + DT)], t + DT)
+    stats = track.error_stats()
+    assert stats['aim_error_p50_px'] < 1.0
+    assert stats['naive_error_p50_px'] == pytest.approx(180 * DT / 2, abs=0.5)
+
+
+def test_error_stats_before_any_aim():
+    assert TargetTrack().error_stats() is None
+
+
+def bot(target, width=640, height=480):
+    """The attributes aim_point() reads"""
+    return SimpleNamespace(
+        current_target=target,
+        target_track=TargetTrack(),
+        clock=FakeClock(),
+        bbox={'left': 0, 'top': 0, 'width': width, 'height': height},
+    )
+
+
+def test_aim_point_without_a_track_is_the_detection():
+    b = bot(det(320, 240, None))
+    assert BotThread.aim_point(b, 0.01) == (320, 240)
+
+
+def test_aim_point_leads_a_moving_target():
+    b = bot(det(100, 200, 0.0))
+    moving_track(track=b.target_track)
+    b.clock.time = 1.0
+    x, y = BotThread.aim_point(b, 0.01)
+    assert x == pytest.approx(100 + 180 * (1.0 + 0.01 + AIM_LEAD), abs=2)
+    assert y == 200
+
+
+def test_aim_point_is_clamped_to_the_frame():
+    b = bot(det(630, 460, 0.0), width=640)
+    b.target_track.reset(det(630, 460, 0.0))
+    b.target_track.update([det(636, 466, DT)], DT)
+    b.clock.time = DT + 0.2
+    x, y = BotThread.aim_point(b, 0.01)
+    assert (x, y) == (639, 479)
+
+
+def test_aim_point_after_the_target_was_dropped():
+    b = bot(None)
+    assert BotThread.aim_point(b, 0.01) is None
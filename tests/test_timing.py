@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from timing import AdaptiveTiming, LatencyEstimator, frame_changed, frame_signature
+
+DEFAULTS = {'click_interval': 0.1, 'post_click_delay': 1.0}
+BOUNDS = {'click_interval': (0.05, 0.3), 'post_click_delay': (0.6, 2.0)}
+
+
+def test_estimator_starts_at_the_first_sample():
+    estimator = LatencyEstimator(0.1)
+    estimator.update(0.2)
+    assert estimator.mean == pytest.approx(0.2)
+    assert estimator.deviation == pytest.approx(0.1)
+
+
+def test_estimator_resists_a_single_outlier():
+    estimator = LatencyEstimator(0.1)
+    for _ in range(50):
+        estimator.update(0.1)
+    estimator.update(1.0)
+    assert estimator.mean < 0.25
+
+
+def test_estimator_tracks_a_lasting_change():
+    estimator = LatencyEstimator(0.1)
+    for _ in range(50):
+        estimator.update(0.1)
+    for _ in range(30):
+        estimator.update(0.3)
+    assert estimator.mean == pytest.approx(0.3, abs=0.01)
+
+
+def test_intervals_wait_for_min_samples():
+    timing = AdaptiveTiming(DEFAULTS, BOUNDS, reference_latency=0.1, min_samples=3)
+    timing.add_sample(0.3)
+    timing.add_sample(0.3)
+    assert timing.click_interval == DEFAULTS['click_interval']
+    timing.add_sample(0.3)
+    assert timing.click_interval > DEFAULTS['click_interval']
+
+
+def test_intervals_shift_with_latency_and_stay_in_bounds():
+    timing = AdaptiveTiming(DEFAULTS, BOUNDS, reference_latency=0.1, min_samples=1)
+    for _ in range(50):
+        timing.add_sample(0.05)
+    assert timing.post_click_delay < DEFAULTS['post_click_delay']
+    assert timing.click_interval == pytest.approx(0.05)
+    for _ in range(50):
+        timing.add_sample(5.0)
+    assert timing.click_interval == 0.3
+    assert timing.post_click_delay == 2.0
+
+
+def test_probe_measures_from_input_to_first_frame_showing_the_effect():
+    timing = AdaptiveTiming(DEFAULTS, BOUNDS)
+    visible = []
+    timing.expect(10.0, lambda: bool(visible))
+    timing.on_frame(9.99)      # Captured before the input
+    timing.on_frame(10.03)
+    visible.append(True)
+    timing.on_frame(10.07)
+    assert timing.estimator.samples == 1
+    assert timing.estimator.mean == pytest.approx(0.07)
+    assert not timing.probes
+
+
+def test_probe_gives_up_after_its_timeout():
+    timing = AdaptiveTiming(DEFAULTS, BOUNDS, probe_timeout=0.5)
+    timing.expect(0.0, lambda: False)
+    timing.expect(0.0, lambda: False, timeout=2.0)
+    timing.on_frame(0.6)
+    assert len(timing.probes) == 1
+    timing.on_frame(2.1)
+    assert not timing.probes
+    assert timing.estimator.samples == 0
+
+
+def test_cancel_drops_pending_probes():
+    timing = AdaptiveTiming(DEFAULTS, BOUNDS)
+    timing.expect(0.0, lambda: True)
+    timing.cancel()
+    timing.on_frame(0.1)
+    assert timing.estimator.samples == 0
+
+
+def test_frame_changed():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+    signature = frame_signature(frame)
+    assert not frame_changed(signature, frame)
+    assert frame_changed(signature, np.roll(frame, 200, axis=1))
@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+import pytest
+
+from zones import CameraMotion, ZoneStore
+
+
+def scene(width=960, height=540, seed=0):
+    """Wide textured panorama to cut views from"""
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+    return cv2.resize(noise, (width, height), interpolation=cv2.INTER_LINEAR)
+
+
+def view(panorama, x, y=0, width=640, height=360):
+    return np.ascontiguousarray(panorama[y:y + height, x:x + width])
+
+
+def test_camera_motion_measures_a_turn():
+    panorama = scene()
+    motion = CameraMotion()
+    assert motion.estimate(view(panorama, 160)) is None
+    # Camera turns right: the picture moves left
+    dx, dy = motion.estimate(view(panorama, 200))
+    assert dx == pytest.approx(-40, abs=1)
+    assert dy == pytest.approx(0, abs=1)
+
+
+def test_camera_motion_is_zero_on_a_still_picture():
+    panorama = scene()
+    motion = CameraMotion()
+    motion.estimate(view(panorama, 160))
+    assert motion.estimate(view(panorama, 160)) == (0.0, 0.0)
+
+
+def test_camera_motion_distrusts_an_unrelated_picture():
+    motion = CameraMotion()
+    motion.estimate(view(scene(seed=0), 160))
+    # A cut, flash or loading screen has no clear correlation peak
+    assert motion.estimate(view(scene(seed=1), 160)) is None
+
+
+def test_shift_since_a_capture_time():
+    panorama = scene()
+    motion = CameraMotion()
+    for i, x in enumerate((160, 160, 200, 240)):
+        motion.estimate(view(panorama, x), captured_at=float(i))
+    assert motion.since(3.0) == (0.0, 0.0)
+    assert motion.since(1.0)[0] == pytest.approx(-80, abs=2)
+    assert motion.since(2.5)[0] == pytest.approx(-40, abs=1)
+    assert motion.since(None) == (0.0, 0.0)
+    # Older than the history: from the oldest frame kept
+    assert motion.since(-5.0) == motion.since(0.0)
+
+
+def test_unmeasured_frames_add_no_shift():
+    panorama = scene()
+    motion = CameraMotion(history=8)
+    motion.estimate(view(panorama, 160), captured_at=0.0)
+    motion.estimate(view(scene(seed=1), 160), captured_at=1.0)
+    motion.estimate(view(panorama, 200), captured_at=2.0)
+    # Neither shift through the unrelated frame is measured
+    assert motion.since(0.0) == (0.0, 0.0)
+    assert motion.since(1.0) == (0.0, 0.0)
+
+
+def test_zone_contains_and_expires():
+    zones = ZoneStore(5.0, half_width=50, half_height=30)
+    zones.add(100, 100, 0.0)
+    assert zones.contains(140, 120, 1.0)
+    assert not zones.contains(160, 100, 1.0)
+    assert not zones.contains(100, 140, 1.0)
+    assert not zones.contains(100, 100, 5.0)
+    assert len(zones) == 0
+
+
+def test_zone_shift_moves_and_drops():
+    zones = ZoneStore(5.0)
+    zones.add(100, 100, 0.0)
+    zones.add(600, 100, 0.0)
+    assert zones.shift(-150, 10, 640, 360) == 1
+    assert len(zones) == 1
+    assert zones.contains(450, 110, 0.0)
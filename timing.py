@@ -0,0 +1,154 @@
+"""Adaptive timing: learn how fast the game responds to input"""
+import cv2
+import numpy as np
+
+from flight_recorder import recorder
+
+EV_RESPONSE = recorder.register("response", ("latency", "estimate", "deviation"))
+
+
+class LatencyEstimator:
+    """
+    Online estimate of a latency and its spread.
+
+    Uses the smoothed mean and mean deviation of TCP round-trip timing, so
+    one slow response moves the estimate only a little while a lasting
+    change is tracked within a few samples.
+
+    Args:
+        initial: Estimate before the first sample
+        gain: Weight of a new sample in the mean
+        deviation_gain: Weight of a new sample in the deviation
+    """
+
+    def __init__(self, initial, gain=0.125, deviation_gain=0.25):
+        self.mean = float(initial)
+        self.deviation = 0.0
+        self.samples = 0
+        self.gain = gain
+        self.deviation_gain = deviation_gain
+
+    def update(self, sample):
+        if self.samples == 0:
+            self.mean = sample
+            self.deviation = sample / 2
+        else:
+            self.deviation += self.deviation_gain * (abs(sample - self.mean) - self.deviation)
+            self.mean += self.gain * (sample - self.mean)
+        self.samples += 1
+
+    @property
+    def upper(self):
+        """Latency that responses rarely exceed"""
+        return self.mean + 2 * self.deviation
+
+
+class AdaptiveTiming:
+    """
+    Input timing driven by the measured game response latency.
+
+    Each interval is its configured value, tuned for ``reference_latency``,
+    shifted by how much slower or faster the game currently responds, and
+    clamped to its bounds. Response samples come from probes: after an
+    input, expect() registers a condition that becomes true once its
+    direct effect is visible (the cursor sprite changing under the mouse,
+    the picture moving after a camera drag), and on_frame() checks it
+    against every perceived frame.
+
+    Args:
+        defaults: Interval name -> configured value in seconds
+        bounds: Interval name -> (min, max) in seconds
+        reference_latency: Response latency the configured values assume
+        probe_timeout: Give up on a probe after this many seconds
+        min_samples: Keep the configured values until this many responses
+            were measured, so a single early sample cannot move them
+    """
+
+    def __init__(self, defaults, bounds=None, reference_latency=0.1, probe_timeout=0.5, min_samples=3):
+        self.defaults = dict(defaults)
+        self.bounds = {name: tuple(b) for name, b in (bounds or {}).items()}
+        self.reference_latency = reference_latency
+        self.probe_timeout = probe_timeout
+        self.min_samples = min_samples
+        self.estimator = LatencyEstimator(reference_latency)
+        self.probes = []
+        self.values = {}
+        self._recompute()
+
+    @classmethod
+    def from_config(cls, defaults, cfg):
+        """Build from the ``timing`` section of config.yaml"""
+        cfg = cfg or {}
+        return cls(
+            defaults,
+            bounds=cfg.get('bounds'),
+            reference_latency=cfg.get('reference_latency', 0.1),
+            probe_timeout=cfg.get('probe_timeout', 0.5),
+            min_samples=cfg.get('min_samples', 3)
+        )
+
+    def _recompute(self):
+        measured = self.estimator.samples >= self.min_samples
+        shift = self.estimator.upper - self.reference_latency if measured else 0.0
+        for name, value in self.defaults.items():
+            lo, hi = self.bounds.get(name, (0.0, float('inf')))
+            self.values[name] = min(hi, max(lo, value + shift))
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['values'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def expect(self, sent_at, condition, timeout=None):
+        """
+        Start a response probe.
+
+        Args:
+            sent_at: Clock time the input was sent
+            condition: Callable returning True once the effect is visible
+            timeout: Seconds to wait for the effect, default probe_timeout
+        """
+        self.probes.append((sent_at, condition, timeout or self.probe_timeout))
+
+    def cancel(self):
+        """Drop pending probes, e.g. when the state they watch is gone"""
+        self.probes.clear()
+
+    def on_frame(self, captured_at):
+        """
+        Check pending probes against a freshly perceived frame.
+
+        Args:
+            captured_at: Clock time the frame was captured
+        """
+        if not self.probes:
+            return
+        pending = []
+        for probe in self.probes:
+            sent_at, condition, timeout = probe
+            if captured_at <= sent_at:
+                pending.append(probe)
+            elif condition():
+                self.add_sample(captured_at - sent_at)
+            elif captured_at - sent_at < timeout:
+                pending.append(probe)
+        self.probes = pending
+
+    def add_sample(self, latency):
+        self.estimator.update(latency)
+        self._recompute()
+        recorder.record(EV_RESPONSE, latency, self.estimator.mean, self.estimator.deviation)
+
+
+def frame_signature(frame):
+    """Tiny grayscale thumbnail for cheap whole-frame change checks"""
+    small = frame[::16, ::16]
+    if small.ndim == 3:
+        small = small[..., 1]
+    return cv2.resize(small, (32, 18), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def frame_changed(signature, frame, threshold=8.0):
+    """True when a frame differs visibly from an earlier signature"""
+    return float(np.abs(frame_signature(frame) - signature).mean()) > threshold
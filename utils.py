@@ -1,50 +1,72 @@
 """Configuration and utility functions"""
-import yaml
 import os
-import cv2
-import numpy as np
-import pygetwindow as gw
 
 # Get script directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Load configuration
-with open(os.path.join(SCRIPT_DIR, 'config.yaml'), 'r') as f:
-    CFG = yaml.safe_load(f)
-
-# Configuration constants
-OBSTACLE_THRESHOLD = CFG['obstacle_threshold']
-DEBUG = CFG.get('debug', False)
-DEAD_TIMEOUT = CFG.get('dead_timeout', 5.0)
-CAMERA_ROTATE_TIME = CFG.get('camera_rotate_time', 0.3)
-CLICK_INTERVAL = CFG.get('click_interval', 0.4)
-POST_CLICK_DELAY = CFG.get('post_click_delay', 1.1)
-CURSOR_UPDATE_INTERVAL = CFG.get('cursor_update_interval', 0.05)
-
-# Model configuration
-weights_path = os.path.join(SCRIPT_DIR, 'data', 'models', CFG['model_filename'])
-class_names = CFG['classes']
-
-
-def detect_obstacle_direction(frame):
-    """Detect obstacle direction from bottom of frame"""
-    h, w = frame.shape[:2]
-    if h < 10: 
-        return None
-    
-    seg = frame[h-10:h]
-    third = w // 3
-    left = seg[:, :third].mean()
-    mid = seg[:, third:2*third].mean()
-    right = seg[:, 2*third:].mean()
-    
-    if mid < OBSTACLE_THRESHOLD:
-        return 'left' if left > right else 'right'
-    return None
+# Configuration constants: name -> (config key, default)
+# A default of None means the key is required
+_CONFIG_CONSTANTS = {
+    'OBSTACLE_THRESHOLD': ('obstacle_threshold', None),
+    'DEBUG': ('debug', False),
+    'DEAD_TIMEOUT': ('dead_timeout', 5.0),
+    'CAMERA_ROTATE_TIME': ('camera_rotate_time', 0.3),
+    'CLICK_INTERVAL': ('click_interval', 0.4),
+    'POST_CLICK_DELAY': ('post_click_delay', 1.1),
+    'SEARCH_GRACE': ('search_grace', 1.0),
+    'NAV_PIXELS_PER_DEGREE': ('nav_pixels_per_degree', 4.0),
+    'NAV_MIN_CONFIDENCE': ('nav_min_confidence', 0.5),
+    'CAMERA_FOV': ('camera_fov', 90.0),
+    'EXPLORE_HALF_LIFE': ('explore_half_life', 300.0),
+    'AIM_LEAD': ('aim_lead', 0.03),
+    'CURSOR_UPDATE_INTERVAL': ('cursor_update_interval', 0.05),
+    'CURSOR_WORKERS': ('cursor_workers', 0),
+    'CURSOR_CONFIRM_CONFIDENCE': ('cursor_confirm_confidence', 0.95),
+    'CURSOR_SAMPLE_ACCURACY': ('cursor_sample_accuracy', 0.85),
+    'CURSOR_MAX_SAMPLES': ('cursor_max_samples', 6),
+    'CURSOR_CACHE_THRESHOLD': ('cursor_cache_threshold', 12),
+    'CURSOR_CACHE_MAX_AGE': ('cursor_cache_max_age', 0.25),
+    'CURSOR_MODEL': ('cursor_model', None),
+    'CURSOR_TEMPLATE_MATCHING': ('cursor_template_matching', True),
+    'PROFILER_RATE': ('profiler_rate', 100),
+    'PROFILER_FORMAT': ('profiler_format', 'collapsed'),
+}
+
+_cfg = None
+
+
+def load_config():
+    """Load config.yaml on first use and cache it"""
+    global _cfg
+    if _cfg is None:
+        import yaml
+        with open(os.path.join(SCRIPT_DIR, 'config.yaml'), 'r') as f:
+            _cfg = yaml.safe_load(f)
+    return _cfg
+
+
+def __getattr__(name):
+    """Resolve configuration constants lazily so importing utils stays cheap"""
+    if name == 'CFG':
+        value = load_config()
+    elif name in _CONFIG_CONSTANTS:
+        key, default = _CONFIG_CONSTANTS[name]
+        cfg = load_config()
+        value = cfg[key] if default is None else cfg.get(key, default)
+    elif name == 'weights_path':
+        # Model configuration
+        value = os.path.join(SCRIPT_DIR, 'data', 'models', load_config()['model_filename'])
+    elif name == 'class_names':
+        value = load_config()['classes']
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
 
 def choose_window():
     """Allow user to choose a window from all available windows"""
+    import pygetwindow as gw
     titles = [w for w in gw.getAllTitles() if w.strip()]
     print("\nВыберите окно:")
     for i, t in enumerate(titles): 
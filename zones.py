@@ -0,0 +1,165 @@
+"""Screen-space zones that follow the camera"""
+from collections import deque
+
+import cv2
+import numpy as np
+
+from flight_recorder import recorder
+
+EV_CAMERA_MOTION = recorder.register("camera_motion", ("dx", "dy", "response"))
+
+
+def _dft_size(n):
+    """Largest even n' <= n that the DFT handles quickly"""
+    # phaseCorrelate is off by half a pixel along odd transform sizes
+    while n > 2 and (n % 2 or cv2.getOptimalDFTSize(n) != n):
+        n -= 1
+    return n
+
+
+class CameraMotion:
+    """
+    Global shift of the picture between consecutive frames.
+
+    Phase correlation on a subsampled grayscale copy of each frame gives
+    the translation caused by camera turns and sideways movement. The
+    shifts are summed per capture time, so since() can bring a detection
+    from an older frame to the latest one.
+
+    Args:
+        stride: Subsampling step of the frame
+        min_response: Phase correlation peak below which the shift is not
+            trusted (zoom from walking forward, flashes, loading screens)
+        history: Number of frames since() can look back
+    """
+
+    def __init__(self, stride=8, min_response=0.1, history=256):
+        self.stride = stride
+        self.min_response = min_response
+        self._previous = None
+        self._window = None
+        # (captured_at, total dx, total dy) per estimated frame
+        self._totals = deque(maxlen=history)
+
+    def since(self, captured_at):
+        """
+        Picture shift from the frame captured at captured_at to the latest one.
+
+        Frames older than the history count from the oldest frame kept.
+
+        Returns:
+            tuple: (dx, dy) in frame pixels
+        """
+        if captured_at is None or not self._totals:
+            return 0.0, 0.0
+        _, x1, y1 = self._totals[-1]
+        x0, y0 = x1, y1
+        for t, x, y in reversed(self._totals):
+            x0, y0 = x, y
+            if t <= captured_at:
+                break
+        return x1 - x0, y1 - y0
+
+    def estimate(self, frame, captured_at=None):
+        """
+        Estimate the shift from the previous frame to this one.
+
+        Args:
+            frame: Newly captured frame
+            captured_at: Capture time of the frame, to add the shift to the
+                history used by since()
+
+        Returns:
+            tuple: (dx, dy) in frame pixels, positive when the picture moved
+                right/down, or None when unknown or not trusted
+        """
+        small = frame[::self.stride, ::self.stride]
+        if small.ndim == 3:
+            small = small[..., 1]
+        h, w = _dft_size(small.shape[0]), _dft_size(small.shape[1])
+        top, left = (small.shape[0] - h) // 2, (small.shape[1] - w) // 2
+        current = small[top:top + h, left:left + w].astype(np.float32)
+        previous, self._previous = self._previous, current
+        motion = None
+        if previous is not None and previous.shape == current.shape:
+            motion = self._correlate(previous, current)
+        if captured_at is not None:
+            _, x, y = self._totals[-1] if self._totals else (None, 0.0, 0.0)
+            if motion is not None:
+                x, y = x + motion[0], y + motion[1]
+            self._totals.append((captured_at, x, y))
+        return motion
+
+    def _correlate(self, previous, current):
+        """Shift between two prepared frames, or None when the peak is too weak"""
+        if self._window is None or self._window.shape != current.shape:
+            self._window = cv2.createHanningWindow(current.shape[::-1], cv2.CV_32F)
+        (dx, dy), response = cv2.phaseCorrelate(previous, current, self._window)
+        if response < self.min_response:
+            return None
+
+        # Sub-sample shifts are mostly estimation noise; ignoring them keeps
+        # zones from drifting while the camera is still
+        dx = dx * self.stride if abs(dx) >= 0.5 else 0.0
+        dy = dy * self.stride if abs(dy) >= 0.5 else 0.0
+        if dx or dy:
+            recorder.record(EV_CAMERA_MOTION, dx, dy, response)
+        return dx, dy
+
+
+class ZoneStore:
+    """
+    Expiring zones in screen coordinates.
+
+    Zones mark targets to skip (corpses, unattackable mobs). shift() moves
+    them with the camera so they stay on the same object, and drops the
+    ones that left the view.
+
+    Args:
+        timeout: Seconds a zone lives
+        half_width: Horizontal distance within which a point is in a zone
+        half_height: Vertical distance within which a point is in a zone
+    """
+
+    def __init__(self, timeout, half_width=50, half_height=30):
+        self.timeout = timeout
+        self.half_width = half_width
+        self.half_height = half_height
+        # One (x, y, created) row per zone
+        self.zones = np.empty((0, 3), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.zones)
+
+    def add(self, x, y, now):
+        self.zones = np.vstack([self.zones, (x, y, now)])
+
+    def expire(self, now):
+        if len(self.zones):
+            self.zones = self.zones[now - self.zones[:, 2] < self.timeout]
+
+    def contains(self, x, y, now):
+        """Whether (x, y) lies in a live zone"""
+        self.expire(now)
+        if not len(self.zones):
+            return False
+        inside = ((np.abs(self.zones[:, 0] - x) < self.half_width)
+                  & (np.abs(self.zones[:, 1] - y) < self.half_height))
+        return bool(inside.any())
+
+    def shift(self, dx, dy, width, height):
+        """
+        Move all zones by (dx, dy) and drop those outside the view.
+
+        Returns:
+            int: Number of zones dropped
+        """
+        if not len(self.zones):
+            return 0
+        self.zones[:, 0] += dx
+        self.zones[:, 1] += dy
+        visible = ((self.zones[:, 0] >= 0) & (self.zones[:, 0] < width)
+                   & (self.zones[:, 1] >= 0) & (self.zones[:, 1] < height))
+        dropped = len(self.zones) - int(np.count_nonzero(visible))
+        self.zones = self.zones[visible]
+        return dropped